@@ -1,8 +1,10 @@
 """Action representation for HearthstoneOne AI."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum, auto
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Iterable
+
+import numpy as np
 
 
 class ActionType(Enum):
@@ -119,6 +121,14 @@ class Action:
         
         Total: ~175 actions (simplified, actual may vary)
         """
+        index = _INDEX_BY_KEY.get(
+            (self.action_type, self.card_index, self.attacker_index, self.target_index, self.target_is_friendly))
+        if index is None:
+            index = self._compute_index()
+        return index
+    
+    def _compute_index(self) -> int:
+        """Index by arithmetic, for actions outside the prototype table."""
         if self.action_type == ActionType.END_TURN:
             return 0
         
@@ -162,8 +172,24 @@ class Action:
         """
         Convert an integer index back to an Action.
         
-        This is the inverse of to_index().
+        This is the inverse of to_index(). Returns the shared, immutable
+        prototype of that index (END_TURN for out-of-range indices); build
+        a new Action to get a modifiable one.
         """
+        if 0 <= index < ACTION_SPACE_SIZE:
+            return ACTION_TABLE[index]
+        return ACTION_TABLE[0]
+    
+    @staticmethod
+    def decode_many(indices: Iterable[int]) -> np.ndarray:
+        """Prototypes of many indices at once, as an object array (out-of-range -> END_TURN)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        indices = np.where((indices >= 0) & (indices < ACTION_SPACE_SIZE), indices, 0)
+        return _ACTION_ARRAY[indices]
+    
+    @classmethod
+    def _decode(cls, index: int) -> "Action":
+        """Build a new Action for an index (used to fill the prototype table)."""
         if index == 0:
             return cls.end_turn()
         
@@ -214,6 +240,12 @@ class Action:
             "position": self.position,
         }
     
+    def __eq__(self, other: object) -> bool:
+        # Class-insensitive, so prototypes equal matching Action instances
+        if not isinstance(other, Action):
+            return NotImplemented
+        return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(Action))
+    
     def __repr__(self) -> str:
         if self.action_type == ActionType.END_TURN:
             return "Action(END_TURN)"
@@ -232,3 +264,40 @@ class Action:
 
 # Action space constants
 ACTION_SPACE_SIZE = 175  # Total number of possible action indices
+
+
+class _SharedAction(Action):
+    """Immutable Action prototype shared by every from_index caller."""
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Action prototypes from from_index are shared and immutable")
+    
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Action prototypes from from_index are shared and immutable")
+    
+    def to_index(self, max_hand: int = 10, max_board: int = 7) -> int:
+        return self._index
+
+
+def _build_action_table() -> List[Action]:
+    table = []
+    for index in range(ACTION_SPACE_SIZE):
+        action = Action._decode(index)
+        action.__class__ = _SharedAction
+        object.__setattr__(action, '_index', index)
+        table.append(action)
+    return table
+
+
+# All ACTION_SPACE_SIZE prototypes, built once at import
+ACTION_TABLE: List[Action] = _build_action_table()
+_ACTION_ARRAY = np.empty(ACTION_SPACE_SIZE, dtype=object)
+_ACTION_ARRAY[:] = ACTION_TABLE
+# (type, card, attacker, target, friendly) -> index, so to_index is one lookup
+_INDEX_BY_KEY: Dict[tuple, int] = {}
+for _action in ACTION_TABLE:
+    _INDEX_BY_KEY.setdefault(
+        (_action.action_type, _action.card_index, _action.attacker_index,
+         _action.target_index, _action.target_is_friendly),
+        _action._compute_index())
+del _action
@@ -1,5 +1,6 @@
 import numpy as np
 import torch
+from typing import List, Optional
 from .game_state import GameState
 from .actions import ACTION_SPACE_SIZE
 
@@ -25,73 +26,89 @@ class FeatureEncoder:
         # Note: This is a simplified dense representation. 
         # A Transformer would take a sequence of cards.
         
+        # Offsets of each zone in the flat vector
+        self._hand_offset = self.scalar_dim
+        self._opp_hand_offset = self._hand_offset + self.max_hand * self.card_dim
+        self._board_offset = self._opp_hand_offset + self.max_hand * self.card_dim
+        self._opp_board_offset = self._board_offset + self.max_board * self.card_dim
+        
     def encode(self, state: GameState) -> torch.Tensor:
         """Encodes state to tensor."""
-        # 1. Scalars
-        scalars = [
-            state.friendly_player.mana,
-            state.friendly_player.max_mana,
-            state.friendly_player.hero.health,
-            state.enemy_player.hero.health,
-            state.friendly_player.deck_size,
-            state.enemy_player.deck_size,
-            len(state.friendly_player.hand),
-            len(state.enemy_player.hand), # Note: enemy hand is list of unknowns usually, but length is known
-            state.friendly_player.fatigue,
-            state.enemy_player.fatigue,
-        ]
-        
-        # 2. Hand Cards (My hand only - Opponent hand is hidden/unknown mostly)
-        # For simplicity in this version, we zero-pad opponent hand features or use known info if available
-        # Ideally we mask unknown information.
-        
-        hand_features = []
-        # Clamp to max_hand to prevent dimension overflow
-        hand_to_encode = state.friendly_player.hand[:self.max_hand]
-        for card in hand_to_encode:
-            hand_features.extend(self._encode_card(card))
-        # Pad remaining slots
-        padding = [0] * self.card_dim * (self.max_hand - len(hand_to_encode))
-        hand_features.extend(padding)
-        
-        # Opponent hand (Placeholder/Unknown)
-        opp_hand_features = [0] * self.card_dim * self.max_hand 
+        # A row of a one-state batch: writes straight into a float32 array
+        # without building Python lists. Callers (e.g. the data collector)
+        # keep the result, so every call gets its own storage.
+        return self.encode_batch([state])[0]
+    
+    def encode_batch(self, states: List[GameState], out: Optional[np.ndarray] = None) -> torch.Tensor:
+        """
+        Encodes several states into one (B, input_dim) float32 tensor.
         
-        # 3. Board Minions (clamp to max_board)
-        board_features = []
-        board_to_encode = state.friendly_player.board[:self.max_board]
-        for minion in board_to_encode:
-            board_features.extend(self._encode_card(minion))
-        padding = [0] * self.card_dim * (self.max_board - len(board_to_encode))
-        board_features.extend(padding)
+        Args:
+            states: GameStates to encode
+            out: Optional preallocated float32 array with at least B rows and
+                input_dim columns, reused between calls (e.g. one per MCTS batch).
+                The returned tensor shares its memory.
+        """
+        count = len(states)
+        if out is None:
+            buf = np.zeros((count, self.input_dim), dtype=np.float32)
+        else:
+            buf = out[:count]
+            buf.fill(0.0)
         
-        opp_board_features = []
-        opp_board_to_encode = state.enemy_player.board[:self.max_board]
-        for minion in opp_board_to_encode:
-            opp_board_features.extend(self._encode_card(minion))
-        padding = [0] * self.card_dim * (self.max_board - len(opp_board_to_encode))
-        opp_board_features.extend(padding)
+        # Per-zone views shaped (B, slots, card_dim)
+        hand = buf[:, self._hand_offset:self._opp_hand_offset].reshape(count, self.max_hand, self.card_dim)
+        board = buf[:, self._board_offset:self._opp_board_offset].reshape(count, self.max_board, self.card_dim)
+        opp_board = buf[:, self._opp_board_offset:].reshape(count, self.max_board, self.card_dim)
         
-        # Combine
-        full_vector = scalars + hand_features + opp_hand_features + board_features + opp_board_features
+        for row, state in enumerate(states):
+            friendly = state.friendly_player
+            enemy = state.enemy_player
+            
+            # 1. Scalars
+            buf[row, :self.scalar_dim] = (
+                friendly.mana,
+                friendly.max_mana,
+                friendly.hero.health,
+                enemy.hero.health,
+                friendly.deck_size,
+                enemy.deck_size,
+                len(friendly.hand),
+                len(enemy.hand), # Note: enemy hand is list of unknowns usually, but length is known
+                friendly.fatigue,
+                enemy.fatigue,
+            )
+            
+            # 2. Hand Cards (My hand only - Opponent hand is hidden/unknown,
+            # its slots stay zero). Clamped to max_hand / max_board.
+            cards = friendly.hand[:self.max_hand]
+            if cards:
+                hand[row, :len(cards), :3] = [self._card_stats(c) for c in cards]
+            
+            # 3. Board Minions
+            cards = friendly.board[:self.max_board]
+            if cards:
+                board[row, :len(cards), :3] = [self._card_stats(c) for c in cards]
+            cards = enemy.board[:self.max_board]
+            if cards:
+                opp_board[row, :len(cards), :3] = [self._card_stats(c) for c in cards]
         
-        return torch.tensor(full_vector, dtype=torch.float32)
+        return torch.from_numpy(buf)
+
+    @staticmethod
+    def _card_stats(card_data) -> tuple:
+        """Cost, attack and health of a card (0 when missing)."""
+        return (
+            getattr(card_data, 'cost', 0),
+            getattr(card_data, 'attack', 0),
+            getattr(card_data, 'health', 0),
+        )
 
     def _encode_card(self, card_data) -> list:
         """Helper to encode a single card."""
-        # This takes a dictionary or object relative to game_state.py structures
-        # Looking at game_state.py, hand/board are lists of dicts or objects?
-        # game_wrapper.py converts them.
-        
         # Assuming card_data is a dictionary or object with attributes:
         # cost, attack, health, type, etc.
-        
-        # Safe access
-        cost = getattr(card_data, 'cost', 0)
-        attack = getattr(card_data, 'attack', 0)
-        health = getattr(card_data, 'health', 0)
-        
-        features = [cost, attack, health]
+        features = list(self._card_stats(card_data))
         
         # Placeholder for one-hot encoding types/keywords
         # Fill rest to card_dim
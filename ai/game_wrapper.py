@@ -8,15 +8,14 @@ designed for both training (self-play) and inference.
 from typing import List, Optional, Tuple, Any, Dict
 import random
 
-from typing import List, Optional, Tuple, Any, Dict
-import random
+import numpy as np
 
 from .game_state import GameState
 from .actions import Action, ActionType, ACTION_SPACE_SIZE
 from .card import CardInstance
 from .mulligan_policy import MulliganPolicy, MulliganEncoder
 
-from simulator import Game, Player, CardDatabase, create_card, Hero, CardType, CardData
+from simulator import Game, GameConfig, Player, CardDatabase, create_card, Hero, CardType, CardData
 
 
 # Default decks for testing (proper 30-card decks)
@@ -29,8 +28,10 @@ BASIC_WARRIOR_DECK = BASIC_DECKS["basic_warrior"]
 class HearthstoneGame:
     """Wrapper around Universal Simulator for RL-style game interface."""
     
-    def __init__(self, perspective: int = 1, mulligan_policy: Optional[MulliganPolicy] = None):
+    def __init__(self, perspective: int = 1, mulligan_policy: Optional[MulliganPolicy] = None,
+                 config: Optional[GameConfig] = None):
         self.perspective = perspective
+        self.config = config  # Passed to every Game (e.g. GameConfig.headless())
         self._game: Optional[Game] = None
         self._step_count = 0
         self._max_steps = 200
@@ -147,7 +148,7 @@ class HearthstoneGame:
         p1.hero.controller = p1
         p2.hero.controller = p2
         
-        self._game = Game()
+        self._game = Game(self.config)
         self._game.setup(p1, p2)
         
         # Add decks
@@ -274,6 +275,158 @@ class HearthstoneGame:
         
         return actions
     
+    def legal_mask(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Boolean mask of legal action indices (same as get_valid_action_mask).
+        
+        Writes the indices straight into the mask without building Action
+        objects; use action_for_index to get the Action for a chosen index.
+        
+        Args:
+            out: Optional preallocated bool array of ACTION_SPACE_SIZE to fill
+        """
+        if out is None:
+            mask = np.zeros(ACTION_SPACE_SIZE, dtype=bool)
+        else:
+            mask = out
+            mask.fill(False)
+        if self.is_game_over or not self.is_my_turn:
+            return mask
+        
+        player = self.current_player
+        opponent = player.opponent
+        target_handlers = player.game._target_handlers if player.game else {}
+        
+        # 1. Playable cards. Without a custom target handler every character
+        # is a target, so the offsets only depend on the boards: heroes -> 8,
+        # friendly minions -> 9, enemy minions -> 1 + position
+        base_offsets = None
+        for i, card in enumerate(player.hand):
+            if not player.can_play_card(card):
+                continue
+            row = 11 + i * 10
+            if card.card_id in target_handlers:
+                targets = player.get_valid_targets(card)
+                offsets = [self._play_target_offset(t, player) for t in targets]
+            else:
+                if base_offsets is None:
+                    base_offsets = []
+                    if player.hero or (opponent and opponent.hero):
+                        base_offsets.append(8)
+                    if player.board:
+                        base_offsets.append(9)
+                    if opponent:
+                        base_offsets.extend(range(1, len(opponent.board) + 1))
+                offsets = base_offsets
+            if offsets:
+                for offset in offsets:
+                    mask[row + offset] = True
+            else:
+                mask[row] = True
+        
+        # 2. Attacks: enemy hero -> 0, enemy minions -> 1 + position. The
+        # targets are the same for every attacker, except that rush minions
+        # can't attack the hero on their first turn
+        shared_offsets = None
+        attackers = [(i, m) for i, m in enumerate(player.board) if m.can_attack()]
+        if player.hero and player.hero.can_attack():
+            attackers.append((-1, player.hero))
+        for i, attacker in attackers:
+            if attacker.rush and attacker.exhausted:
+                offsets = [self._attack_target_offset(t) for t in player.get_valid_attack_targets(attacker)]
+            else:
+                if shared_offsets is None:
+                    shared_offsets = [self._attack_target_offset(t)
+                                      for t in player.get_valid_attack_targets(attacker)]
+                offsets = shared_offsets
+            row = 111 + (i + 1) * 8
+            for offset in offsets:
+                mask[row + offset] = True
+        
+        # 3. Hero power, 4. End turn
+        if player.hero_power and player.hero_power.can_use():
+            mask[1] = True
+        mask[0] = True
+        return mask
+    
+    def action_for_index(self, index: int) -> Optional[Action]:
+        """
+        The executable Action for an action index, or None if it is not legal.
+        
+        When several legal actions share an index, returns the one that
+        get_valid_actions lists first.
+        """
+        if self.is_game_over or not self.is_my_turn:
+            return None
+        player = self.current_player
+        
+        if index == 0:
+            action = Action.end_turn()
+            action._sim_action = ("end_turn", None, None)
+            return action
+        
+        if index == 1:
+            if player.hero_power and player.hero_power.can_use():
+                action = Action.hero_power()
+                action._sim_action = ("hero_power", player.hero_power, None)
+                return action
+            return None
+        
+        if 11 <= index <= 110:
+            card_idx, offset = divmod(index - 11, 10)
+            if card_idx >= len(player.hand):
+                return None
+            card = player.hand[card_idx]
+            if not player.can_play_card(card):
+                return None
+            targets = player.get_valid_targets(card)
+            if not targets:
+                if offset != 0:
+                    return None
+                action = Action.play_card(card_idx)
+                action._sim_action = ("play", card, None)
+                return action
+            for target in targets:
+                if self._play_target_offset(target, player) == offset:
+                    is_friendly = target.controller == player
+                    action = Action.play_card(card_idx, self._get_entity_index(target, is_friendly), is_friendly)
+                    action._sim_action = ("play", card, target)
+                    return action
+            return None
+        
+        if 111 <= index < ACTION_SPACE_SIZE:
+            attacker_idx, offset = divmod(index - 111, 8)
+            attacker_idx -= 1
+            if attacker_idx == -1:
+                attacker = player.hero
+            elif attacker_idx < len(player.board):
+                attacker = player.board[attacker_idx]
+            else:
+                return None
+            if attacker is None or not attacker.can_attack():
+                return None
+            for target in player.get_valid_attack_targets(attacker):
+                if self._attack_target_offset(target) == offset:
+                    is_hero = target.card_type == CardType.HERO
+                    action = Action.attack(attacker_idx, -1 if is_hero else self._get_minion_index(target))
+                    action._sim_action = ("attack", attacker, target)
+                    return action
+        return None
+    
+    def _play_target_offset(self, target, player: Player) -> int:
+        """Target slot of a PLAY_CARD index (see Action.to_index)."""
+        if target.card_type == CardType.HERO:
+            return 8
+        if target.controller == player:
+            return 9
+        return 1 + self._get_minion_index(target)
+    
+    def _attack_target_offset(self, target) -> int:
+        """Target slot of an ATTACK index (see Action.to_index)."""
+        if target.card_type == CardType.HERO:
+            return 0
+        return 1 + self._get_minion_index(target)
+    
     def _get_entity_index(self, entity, is_friendly: bool) -> int:
         """Get the index of an entity (minion or hero)."""
         if entity.card_type == CardType.HERO:
@@ -297,17 +450,7 @@ class HearthstoneGame:
             return self.get_state(), 0.0, True, {"error": "max_steps_reached"}
         
         try:
-            op_type, entity, target = getattr(action, '_sim_action', (None, None, None))
-            
-            if action.action_type == ActionType.END_TURN:
-                self.game.end_turn()
-            elif op_type == "play":
-                self.game.play_card(entity, target=target)
-            elif op_type == "attack":
-                self.game.attack(entity, target)
-            elif op_type == "hero_power":
-                self.game.use_hero_power(target=target)
-            elif not op_type:
+            if not self.execute(action):
                 # Fallback: find action matching index
                 for va in self.get_valid_actions():
                     if va.to_index() == action.to_index():
@@ -326,6 +469,42 @@ class HearthstoneGame:
                 
         return self.get_state(), reward, done, info
     
+    def execute(self, action: Action) -> bool:
+        """
+        Run an action on the simulator, without building the next state.
+        
+        Returns False if the action is not bound to simulator entities
+        (i.e. not produced by get_valid_actions) and nothing was done.
+        """
+        op_type, entity, target = getattr(action, '_sim_action', (None, None, None))
+        
+        if action.action_type == ActionType.END_TURN:
+            self.game.end_turn()
+        elif op_type == "play":
+            self.game.play_card(entity, target=target)
+        elif op_type == "attack":
+            self.game.attack(entity, target)
+        elif op_type == "hero_power":
+            self.game.use_hero_power(target=target)
+        elif not op_type:
+            return False
+        return True
+    
+    def execute_index(self, index: int) -> bool:
+        """
+        Run the action of an index for the player to move (either side),
+        exactly as MCTS simulates it: action_for_index, then execute.
+        
+        Returns False if the index is not legal and nothing was done.
+        """
+        perspective = self.perspective
+        self.perspective = 1 if self.game.current_player is self.game.players[0] else 2
+        try:
+            action = self.action_for_index(index)
+            return action is not None and self.execute(action)
+        finally:
+            self.perspective = perspective
+    
     def get_valid_action_mask(self) -> List[int]:
         """
         Get a binary mask of valid actions.
@@ -350,7 +529,7 @@ class HearthstoneGame:
         """
         # TODO: Implement proper game cloning for MCTS
         import copy
-        new_game = HearthstoneGame(self.perspective)
+        new_game = HearthstoneGame(self.perspective, config=self.config)
         new_game._game = self._game  # Shallow copy - needs improvement
         new_game._step_count = self._step_count
         return new_game
@@ -2,9 +2,11 @@ import math
 import numpy as np
 import torch
 import copy
+from collections import OrderedDict
 from typing import List, Dict, Tuple, Optional
 
 from .device import get_best_device
+from simulator.zobrist import game_hash
 
 
 class MCTSNode:
@@ -20,24 +22,129 @@ class MCTSNode:
         self.value_sum = 0.0
         self.prior_prob = 0.0 # From Policy Head
         
+        # Transposition key (Zobrist hash of state), set on expansion
+        self.key = None
+        # Ply parity, so shared statistics keep a consistent sign
+        self.parity = 0 if parent is None else 1 - parent.parity
+        
     @property
     def value(self):
         if self.visit_count == 0:
             return 0
         return self.value_sum / self.visit_count
 
+
+class TranspositionEntry:
+    """Cached evaluation of one position, plus optional pooled statistics."""
+    
+    __slots__ = ('priors', 'value', 'stats')
+    
+    def __init__(self, priors: Dict[int, float], value: float):
+        self.priors = priors  # valid action_idx -> prior probability
+        self.value = value
+        self.stats = {}  # parity -> [visit_count, value_sum]
+
+
+class TranspositionTable:
+    """
+    Bounded LRU table of leaf evaluations keyed by Zobrist position hash.
+    
+    Different action orders within a turn often reach the same position;
+    with a table, MCTS evaluates that position once and reuses the policy
+    priors and value for every transposed node. With share_stats, backed up
+    visits are also pooled per position and seed the statistics of newly
+    expanded transposed nodes.
+    
+    A table can be shared between searches (e.g. through an MCTSSession),
+    but must be cleared when the model weights change.
+    """
+    
+    def __init__(self, capacity: int = 100000, share_stats: bool = False):
+        self.capacity = capacity
+        self.share_stats = share_stats
+        self._entries: "OrderedDict[int, TranspositionEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def lookup(self, key: int) -> Optional[TranspositionEntry]:
+        """Return the entry for a position (counted as hit or miss)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+    
+    def store(self, key: int, priors: Dict[int, float], value: float) -> TranspositionEntry:
+        """Insert an evaluation, evicting the least recently used entries."""
+        entry = TranspositionEntry(priors, value)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return entry
+    
+    def record(self, key: int, parity: int, value: float):
+        """Pool one backed up value for a position (share_stats only)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stats = entry.stats.setdefault(parity, [0, 0.0])
+            stats[0] += 1
+            stats[1] += value
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the table."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+    
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 class MCTS:
     """
     Monte Carlo Tree Search implementation guided by Neural Network.
     Supports CUDA, MPS (Metal on macOS), and CPU.
     """
     
-    def __init__(self, model, encoder, game_env, c_puct=1.0, num_simulations=50, device=None):
+    def __init__(self, model, encoder, game_env, c_puct=1.0, num_simulations=50, device=None,
+                 batch_size=1, virtual_loss=1.0, transpositions=None):
+        """
+        Args:
+            batch_size: Leaves collected per network call. With batch_size > 1,
+                each iteration selects up to batch_size leaves (virtual loss
+                steers later selections away from pending paths), evaluates
+                them in one forward pass, then backs all of them up.
+            virtual_loss: Value temporarily charged to each node on a pending
+                path, from the perspective of the player choosing it.
+            transpositions: Optional TranspositionTable; transposed nodes then
+                share one network evaluation (see table.hit_rate).
+        """
         self.model = model
         self.encoder = encoder
         self.game_env = game_env # Reference for cloning
         self.c_puct = c_puct
         self.num_simulations = num_simulations
+        self.batch_size = max(1, int(batch_size))
+        self.virtual_loss = virtual_loss
+        self.transpositions = transpositions
+        self._encode_buffer = None  # Reused (batch, input_dim) encoder output
         
         # Use model's device if not specified (ensures tensor-model alignment)
         if device is not None:
@@ -54,17 +161,51 @@ class MCTS:
         Run MCTS simulations starting from root_state.
         Returns action probabilities (pi vector).
         """
-        root = MCTSNode(root_state)
+        return self.search_node(MCTSNode(root_state))
+
+    def search_node(self, root: MCTSNode) -> List[float]:
+        """
+        Run MCTS simulations from an existing (possibly already searched) root.
+        Statistics accumulate on top of the visits the tree already holds.
+        Returns action probabilities (pi vector).
+        """
+        # Inference mode once per search, not per expansion
+        self.model.eval()
         
         # Expand root immediately
-        self._expand(root)
+        if not root.is_expanded:
+            self._expand(root)
         
-        for _ in range(self.num_simulations):
-            node = root
+        if self.batch_size > 1:
+            self._run_batched(root)
+        else:
+            self._run_sequential(root)
             
+        # Return visit counts normalized
+        counts = np.zeros(self.model.action_dim)
+        for action_idx, child in root.children.items():
+            if action_idx < len(counts):
+                counts[action_idx] = child.visit_count
+        
+        # Normalize to probability distribution
+        if counts.sum() > 0:
+            return counts / counts.sum()
+        else:
+            # Fallback uniform
+            return np.ones(self.model.action_dim) / self.model.action_dim
+
+    def _select_leaf(self, root: MCTSNode) -> MCTSNode:
+        """Follow PUCT from the root down to an unexpanded (or terminal) node."""
+        node = root
+        while node.is_expanded and len(node.children) > 0:
+            node = self._select_child(node)
+        return node
+
+    def _run_sequential(self, root: MCTSNode):
+        """One leaf per simulation, evaluated with a batch of 1."""
+        for _ in range(self.num_simulations):
             # 1. Selection
-            while node.is_expanded and len(node.children) > 0:
-                node = self._select_child(node)
+            node = self._select_leaf(root)
             
             # 2. Expansion & Expansion Evaluation
             if not node.is_expanded: # Only expand if not terminal (heuristic)
@@ -80,19 +221,46 @@ class MCTS:
             
             # 3. Backpropagation (Backup)
             self._backpropagate(node, value)
+
+    def _run_batched(self, root: MCTSNode):
+        """Collect up to batch_size leaves per network call using virtual loss."""
+        done = 0
+        while done < self.num_simulations:
+            leaves = []
+            while len(leaves) < self.batch_size and done < self.num_simulations:
+                node = self._select_leaf(root)
+                if node.is_expanded:
+                    # Terminal: nothing to evaluate
+                    self._backpropagate(node, 0)
+                    done += 1
+                    continue
+                if any(node is leaf for leaf in leaves):
+                    # Virtual loss could not divert selection: evaluate what we have
+                    break
+                self._add_virtual_loss(node, 1)
+                leaves.append(node)
+                done += 1
             
-        # Return visit counts normalized
-        counts = np.zeros(self.model.action_dim)
-        for action_idx, child in root.children.items():
-            if action_idx < len(counts):
-                counts[action_idx] = child.visit_count
+            if not leaves:
+                continue
+            
+            values = self._expand_batch(leaves)
+            for node, value in zip(leaves, values):
+                self._add_virtual_loss(node, -1)
+                self._backpropagate(node, value)
+
+    def _add_virtual_loss(self, node: MCTSNode, sign: int):
+        """Charge (sign=1) or refund (sign=-1) a pending visit along the path.
         
-        # Normalize to probability distribution
-        if counts.sum() > 0:
-            return counts / counts.sum()
-        else:
-            # Fallback uniform
-            return np.ones(self.model.action_dim) / self.model.action_dim
+        Parents rate a child by -child.value, so adding to value_sum makes
+        every node on the path look worse to the player selecting it.
+        """
+        loss = sign * self.virtual_loss
+        current = node
+        while current is not None:
+            current.visit_count += sign
+            current.value_sum += loss
+            current = current.parent
 
     def _select_child(self, node: MCTSNode) -> MCTSNode:
         """Select child using PUCT algorithm."""
@@ -130,70 +298,111 @@ class MCTS:
         Expand leaf node using NN prediction.
         Returns: Value of the state (Leaf evaluation).
         """
-        # Encode state
-        if node.state is None:
-            # Should recreate state based on parent + action?
-            # Or traverse?
-            # For simplicity, we assume node.state is populated on creation
-            # OR we populate it here if it's None (lazy eval).
-            if node.parent:
-                node.state = self._apply_action(node.parent.state, node.action_idx)
-        
-        # Simpler approach: node.game_copy object.
-        game_copy = node.state # Let's assume MCTSNode holds the Wrapper/Game as 'state'
-        
-        # Get valid actions indices
-        # We need to bridge 'Action' objects to 'Indices'
-        from .game_wrapper import HearthstoneGame
-        wrapper = HearthstoneGame()
-        wrapper._game = game_copy # Inject the clone
+        return self._expand_batch([node])[0]
 
-        # Now we have a valid GameState from the wrapper
-        tensor = self.encoder.encode(wrapper.get_state()).unsqueeze(0)  # Batch dim
-        tensor = tensor.to(self.device)  # Move to best device (MPS/CUDA/CPU)
-        
-        # Predict
-        self.model.eval()
-        with torch.no_grad():
-            policy_probs, value = self.model(tensor)
-            
-        value = value.item()
-        
-        # Mask invalid actions
-        # Get valid actions for this state
-        # We need a wrapper instance attached to this state/game clone?
-        # The GameState object is static data. We need to query the Simulator.
-        # Ideally node.state holds the Simulator Clone?
-        # Let's fix MCTSNode to hold the wrapper/simulator if feasible.
-        # REFACTOR: node.state should probably be the Wrapper (HearthstoneGame) instance itself
-        # to allow querying actions easily. Or we maintain GameState + clone separately.
-        
+    def _expand_batch(self, nodes: List[MCTSNode]) -> List[float]:
+        """
+        Expand leaf nodes with a single NN forward pass.
+        Positions found in the transposition table (or repeated within the
+        batch) are not sent to the network.
+        Returns: Value of each state (Leaf evaluation), in order.
+        """
+        from .game_wrapper import HearthstoneGame
         
-        # Simpler approach: node.game_copy object.
-        # game_copy = node.state # Already done above
+        table = self.transpositions
+        entries: List[Optional[TranspositionEntry]] = [None] * len(nodes)
         
-        # Get valid actions indices
-        # We need to bridge 'Action' objects to 'Indices'
-        # wrapper = HearthstoneGame() # Already done above
-        # wrapper._game = game_copy # Inject the clone
+        # Positions to evaluate: (key, encoded state, valid indices, node slots)
+        pending = []
+        pending_by_key = {}
+        for i, node in enumerate(nodes):
+            # Encode state
+            if node.state is None:
+                # Lazy state creation: children are created without a state
+                # and get it from parent + action on first expansion
+                if node.parent:
+                    node.state = self._apply_action(node.parent.state, node.action_idx)
+            
+            if table is not None:
+                node.key = game_hash(node.state)
+                if node.key in pending_by_key:
+                    pending[pending_by_key[node.key]][3].append(i)
+                    continue
+                entries[i] = table.lookup(node.key)
+                if entries[i] is not None:
+                    continue
+            
+            # node.state holds the simulator Game; bridge it through the
+            # wrapper to get a GameState and the valid action indices
+            wrapper = HearthstoneGame()
+            wrapper._game = node.state # Inject the clone
+            
+            valid_indices = np.flatnonzero(wrapper.legal_mask()).tolist()
+            if not valid_indices: 
+                valid_indices = [0] # End turn fallback
+            
+            if node.key is not None:
+                pending_by_key[node.key] = len(pending)
+            pending.append((node.key, wrapper.get_state(), valid_indices, [i]))
         
-        valid_actions_objs = wrapper.get_valid_actions()
-        valid_indices = [a.to_index() for a in valid_actions_objs]
-        if not valid_indices: 
-            valid_indices = [0] # End turn fallback
+        if pending:
+            states = [item[1] for item in pending]
+            
+            # Predict (one forward pass for the whole batch)
+            with torch.no_grad():
+                if hasattr(self.encoder, 'encode_batch'):
+                    # Write the batch straight into a reused buffer
+                    if self._encode_buffer is None or len(self._encode_buffer) < len(states):
+                        self._encode_buffer = np.zeros(
+                            (max(self.batch_size, len(states)), self.encoder.input_dim), dtype=np.float32)
+                    tensor = self.encoder.encode_batch(states, out=self._encode_buffer).to(self.device)
+                    policy_probs, values = self.model(tensor)
+                elif hasattr(self.encoder, 'encode_many'):
+                    # Sequence encoders return (ids, features, mask) batches
+                    inputs = [t.to(self.device) for t in self.encoder.encode_many(states)]
+                    policy_probs, values = self.model(*inputs)
+                else:
+                    encoded = [self.encoder.encode(state) for state in states]
+                    if isinstance(encoded[0], tuple):
+                        # Sequence encoders return (ids, features, mask)
+                        inputs = [torch.stack(parts).to(self.device) for parts in zip(*encoded)]
+                        policy_probs, values = self.model(*inputs)
+                    else:
+                        tensor = torch.stack(encoded).to(self.device)
+                        policy_probs, values = self.model(tensor)
+            
+            policy_probs = policy_probs.cpu().numpy()
+            values = values.view(-1).cpu().tolist()
             
-        node.is_expanded = True
+            for (key, _, valid_indices, slots), probs, value in zip(pending, policy_probs, values):
+                priors = {idx: float(probs[idx]) for idx in valid_indices}
+                if table is not None:
+                    entry = table.store(key, priors, value)
+                else:
+                    entry = TranspositionEntry(priors, value)
+                for i in slots:
+                    entries[i] = entry
         
-        # Create children
-        for idx in valid_indices:
-             if idx not in node.children:
-                 # Lazy state creation: Pass None, create on traversal
-                 # But we need to keep the PARENT alive to clone from
-                 child = MCTSNode(state=None, parent=node, action_idx=idx)
-                 child.prior_prob = policy_probs[0][idx].item()
-                 node.children[idx] = child
+        share_stats = table is not None and table.share_stats
+        for node, entry in zip(nodes, entries):
+            node.is_expanded = True
+            
+            # Create children
+            for idx, prior in entry.priors.items():
+                 if idx not in node.children:
+                     # Lazy state creation: Pass None, create on traversal
+                     # But we need to keep the PARENT alive to clone from
+                     child = MCTSNode(state=None, parent=node, action_idx=idx)
+                     child.prior_prob = prior
+                     node.children[idx] = child
+            
+            if share_stats and node.visit_count == 0:
+                # Warm start from visits pooled by transposed nodes
+                stats = entry.stats.get(node.parity)
+                if stats:
+                    node.visit_count, node.value_sum = stats[0], stats[1]
         
-        return value
+        return [entry.value for entry in entries]
 
     def _apply_action(self, parent_game, action_idx):
         """
@@ -202,45 +411,14 @@ class MCTS:
         # Clone parent game first
         new_game = parent_game.clone()
         
-        # To execute the action, we need to decode the index
-        # We need access to Action class
-        from .actions import Action
-        action_obj = Action.from_index(action_idx)
-        
-        # Execute on new_game using wrapper logic
-        # We can reuse HearthstoneGame helper methods if we had them exposed statically
-        # Or instantiate a temporary wrapper
+        # Resolve the index to the player's entities on the clone: only the
+        # chosen Action is built
         from .game_wrapper import HearthstoneGame
         wrapper = HearthstoneGame()
         wrapper._game = new_game
         
-        # Perform action
-        player = wrapper.current_player
-        
-        # Execute based on type
-        # NOTE: logic duplicated from game.py or self_play.py?
-        # Ideally wrapper has `step(action)`
-        
         try:
-            if action_obj.action_type.name == "END_TURN":
-                new_game.end_turn()
-            elif action_obj.action_type.name == "PLAY_CARD":
-                # Need to map index to hand card
-                # Card indices might shift if hand changes? 
-                # MCTS assumes static snapshot so indices are valid for THIS state.
-                if action_obj.card_index < len(player.hand):
-                    card = player.hand[action_obj.card_index]
-                    target = None
-                    # Resolve target index
-                    if action_obj.target_index is not None:
-                         # 0-7: Minions (offset logic from Action.to_index)
-                         pass # TODO: target resolution
-                    new_game.play_card(card, target) # Simplified
-            elif action_obj.action_type.name == "ATTACK":
-                pass # TODO: attack resolution
-            elif action_obj.action_type.name == "HERO_POWER":
-                new_game.use_hero_power()
-                
+            wrapper.execute_index(action_idx)
         except Exception:
             pass # Invalid move in simulation?
             
@@ -248,9 +426,87 @@ class MCTS:
 
     def _backpropagate(self, node: MCTSNode, value: float):
         """Update node stats up to root."""
+        table = self.transpositions
+        share_stats = table is not None and table.share_stats
         current = node
         while current is not None:
             current.visit_count += 1
             current.value_sum += value
+            if share_stats and current.key is not None:
+                table.record(current.key, current.parity, value)
             current = current.parent
             value = -value # Switch perspective for opponent
+
+
+class MCTSSession:
+    """
+    Keeps one MCTS tree across the moves of a game.
+    
+    After a move is played, advance() promotes the matching child to be the
+    new root, keeping its visit counts, values and cached states, so the
+    next search builds on the statistics gathered by earlier searches.
+    
+    The kept subtree is only valid if the real move reached the position
+    the tree simulated (same target, same random outcome): the child's
+    position hash is checked against the real game and the tree is reset
+    on a mismatch. Play moves with env.execute_index so that the real game
+    runs the same action as the simulation.
+    
+    Usage:
+        session = MCTSSession(MCTS(model, encoder, game, num_simulations=50))
+        while not done:
+            probs = session.search(env.game.clone())
+            action_idx = ...
+            env.execute_index(action_idx)
+            session.advance(action_idx, env.game)
+    """
+    
+    def __init__(self, mcts: MCTS):
+        self.mcts = mcts
+        self.root: Optional[MCTSNode] = None
+        self.reused = 0  # Number of moves whose subtree was kept
+        
+    def search(self, root_state) -> List[float]:
+        """
+        Search from root_state, reusing the current subtree if there is one.
+        Returns action probabilities (pi vector).
+        """
+        if self.root is not None and game_hash(self.root.state) != game_hash(root_state):
+            # The tree was built for another position
+            self.reset()
+        if self.root is None:
+            self.root = MCTSNode(root_state)
+        else:
+            # Search from the real position; descendants keep their cached
+            # states and unexpanded children are created from this one
+            self.root.state = root_state
+        return self.mcts.search_node(self.root)
+    
+    def advance(self, action_idx: int, real_state=None) -> bool:
+        """
+        Promote the child reached by action_idx (played by either side) to root.
+        
+        Args:
+            action_idx: Move played
+            real_state: Game after the move; the tree is reset if the child
+                holds a different position
+        
+        Returns True if its subtree was reused, False if the tree was reset.
+        """
+        child = self.root.children.get(action_idx) if self.root is not None else None
+        if child is None or not child.is_expanded:
+            self.root = None
+            return False
+        if real_state is not None and game_hash(child.state) != game_hash(real_state):
+            self.root = None
+            return False
+        
+        # Detach so the rest of the old tree can be freed
+        child.parent = None
+        self.root = child
+        self.reused += 1
+        return True
+    
+    def reset(self):
+        """Drop the tree (e.g. at the start of a new game)."""
+        self.root = None
@@ -184,7 +184,7 @@ class PlayerState:
             overload_next=sim_player.overload_next_turn,
             hand=hand,
             board=board,
-            deck_size=len(sim_player.deck),
+            deck_size=sim_player.deck_size,
             fatigue=sim_player.fatigue_counter,
             weapon=weapon,
             hero_power=hero_power,
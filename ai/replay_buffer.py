@@ -9,63 +9,328 @@ Follows the AlphaZero pattern:
     - Value: Final game outcome (+1 for win, -1 for loss)
 """
 
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
 import numpy as np
 import torch
-from typing import List, Tuple, Deque
-from collections import deque
-import random
+from typing import List, Optional, Tuple
+
 
 class ReplayBuffer:
-    """Fixed-size buffer to store experience tuples."""
-    
-    def __init__(self, capacity: int = 10000):
+    """
+    Fixed-size ring buffer of (state, policy, value) samples.
+
+    Samples are stored as preallocated arrays (states[capacity, input_dim],
+    policies[capacity, action_dim], values[capacity]), so adding is a row
+    write and sampling a fancy-index gather. Once full, the oldest samples
+    are overwritten.
+
+    With `path`, the arrays are memory-mapped .npy files in that directory
+    (plus a meta.json with the fill level), so the buffer can be larger
+    than RAM and is reopened as it was after a restart.
+
+    With `prioritized`, samples are drawn with probability proportional to
+    priority ** alpha; new samples get the highest priority seen so far and
+    `update_priorities` sets them from the training loss. The importance
+    sampling weights returned with each batch ((N * P(i)) ** -beta, scaled
+    so the largest is 1) correct the loss for the skewed sampling.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        input_dim: Optional[int] = None,
+        action_dim: Optional[int] = None,
+        prioritized: bool = False,
+        alpha: float = 0.6,
+        path: Optional[str] = None,
+        beta: float = 0.4,
+    ):
+        """
+        Args:
+            capacity: Maximum number of samples
+            input_dim: State size (default: taken from the first sample)
+            action_dim: Policy size (default: taken from the first sample)
+            prioritized: Sample by priority instead of uniformly
+            alpha: Priority exponent (0 = uniform)
+            path: Directory for disk-backed (memmap) storage
+            beta: Default importance sampling exponent (1 = full correction)
+        """
         self.capacity = capacity
-        # We store tuples of (state_tensor, policy_probs, value_outcome)
-        self.buffer: Deque[Tuple[torch.Tensor, np.ndarray, float]] = deque(maxlen=capacity)
-        
+        self.input_dim = input_dim
+        self.action_dim = action_dim
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.path = path
+
+        self.states: Optional[np.ndarray] = None
+        self.policies: Optional[np.ndarray] = None
+        self.values: Optional[np.ndarray] = None
+        self.priorities: Optional[np.ndarray] = None
+        self._size = 0
+        self._pos = 0
+        self._max_priority = 1.0
+        self._rng = np.random.default_rng()
+
+        if path and os.path.exists(os.path.join(path, self.META_FILE)):
+            self._open()
+        elif input_dim is not None and action_dim is not None:
+            self._allocate(input_dim, action_dim)
+
+    def _array(self, name: str, shape: Tuple[int, ...], fill: float = 0.0) -> np.ndarray:
+        """A zero-filled (or `fill`-filled) float32 array, in RAM or as a new memmap."""
+        if self.path is None:
+            return np.full(shape, fill, dtype=np.float32)
+        os.makedirs(self.path, exist_ok=True)
+        array = np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"),
+                                          mode='w+', dtype=np.float32, shape=shape)
+        if fill:
+            array[:] = fill
+        return array
+
+    def _allocate(self, input_dim: int, action_dim: int):
+        self.input_dim = input_dim
+        self.action_dim = action_dim
+        self.states = self._array("states", (self.capacity, input_dim))
+        self.policies = self._array("policies", (self.capacity, action_dim))
+        self.values = self._array("values", (self.capacity,))
+        self.priorities = self._array("priorities", (self.capacity,), fill=1.0)
+        self.flush()
+
+    def _open(self):
+        """Reopen the memmap files of an existing disk-backed buffer."""
+        with open(os.path.join(self.path, self.META_FILE)) as f:
+            meta = json.load(f)
+        self.capacity = meta["capacity"]
+        self.input_dim = meta["input_dim"]
+        self.action_dim = meta["action_dim"]
+        self._size = meta["size"]
+        self._pos = meta["pos"]
+        self._max_priority = meta.get("max_priority", 1.0)
+        for name in ("states", "policies", "values", "priorities"):
+            setattr(self, name, np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r+'))
+
+    def flush(self):
+        """Write memmapped arrays and the fill level to disk (no-op in RAM)."""
+        if self.path is None or self.states is None:
+            return
+        for array in (self.states, self.policies, self.values, self.priorities):
+            array.flush()
+        meta = {
+            "capacity": self.capacity,
+            "input_dim": self.input_dim,
+            "action_dim": self.action_dim,
+            "size": self._size,
+            "pos": self._pos,
+            "max_priority": self._max_priority,
+        }
+        tmp_path = os.path.join(self.path, self.META_FILE + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, self.META_FILE))
+
     def add(self, state: torch.Tensor, policy_probs: np.ndarray, value: float):
         """Add a single step to the buffer."""
-        # Ensure state is detached/cpu if it came from GPU
-        if isinstance(state, torch.Tensor):
-            state = state.detach().cpu()
-            
-        self.buffer.append((state, policy_probs, value))
-        
+        self.add_batch([state], [policy_probs], [value])
+
+    def add_batch(self, states, policies, values):
+        """Add several steps at once (sequences of states, policies and values)."""
+        states = np.stack([_as_row(s) for s in states])
+        policies = np.stack([_as_row(p) for p in policies])
+        values = np.asarray(values, dtype=np.float32)
+        if self.states is None:
+            self._allocate(states.shape[1], policies.shape[1])
+
+        n = len(states)
+        if n > self.capacity:
+            # Only the newest `capacity` samples would survive anyway
+            states, policies, values = states[-self.capacity:], policies[-self.capacity:], values[-self.capacity:]
+            n = self.capacity
+        idx = (self._pos + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.policies[idx] = policies
+        self.values[idx] = values
+        self.priorities[idx] = self._max_priority
+
+        self._pos = (self._pos + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
     def add_game(self, trajectory: List[Tuple[torch.Tensor, np.ndarray, int]], winner_id: int):
         """
         Add a full game trajectory to the buffer using the final outcome.
-        
+
         Args:
             trajectory: List of (state, policy_probs, player_id)
             winner_id: The ID of the winning player (1 or 2). 0 for draw.
         """
-        for state, probs, current_player in trajectory:
-            if winner_id == 0:
-                value = 0.0
-            elif winner_id == current_player:
-                value = 1.0
-            else:
-                value = -1.0
-                
-            self.add(state, probs, value)
-            
+        if not trajectory:
+            return
+        states, policies, players = zip(*trajectory)
+        if winner_id == 0:
+            values = np.zeros(len(players), dtype=np.float32)
+        else:
+            values = np.where(np.asarray(players) == winner_id, 1.0, -1.0).astype(np.float32)
+        self.add_batch(states, policies, values)
+        self.flush()
+
+    def sample_indices(self, batch_size: int, beta: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Indices of a batch (uniform without replacement, or by priority) and
+        their importance sampling weights (all 1 when uniform).
+        
+        Args:
+            batch_size: Number of samples
+            beta: Importance sampling exponent (default: self.beta)
+        """
+        size = self._size
+        batch_size = min(size, batch_size)
+        if not self.prioritized:
+            return self._rng.choice(size, batch_size, replace=False), np.ones(batch_size, dtype=np.float32)
+        probs = self.priorities[:size].astype(np.float64) ** self.alpha
+        probs /= probs.sum()
+        indices = self._rng.choice(size, batch_size, p=probs)
+        weights = (size * probs[indices]) ** -(self.beta if beta is None else beta)
+        return indices, (weights / weights.max()).astype(np.float32)
+
+    def get_batch(self, indices: np.ndarray) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """(states, policies, values) tensors of the given indices."""
+        state_batch = torch.from_numpy(self.states[indices])
+        policy_batch = torch.from_numpy(self.policies[indices])
+        value_batch = torch.from_numpy(self.values[indices]).unsqueeze(1)
+        return state_batch, policy_batch, value_batch
+
     def sample(self, batch_size: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """
         Sample a batch of training data.
-        
+
         Returns:
             (states, policies, values) stacked as tensors.
         """
-        batch = random.sample(self.buffer, min(len(self.buffer), batch_size))
-        
-        states, policies, values = zip(*batch)
-        
-        # Stack into tensors
-        state_batch = torch.stack(states)
-        policy_batch = torch.tensor(np.stack(policies), dtype=torch.float32)
-        value_batch = torch.tensor(values, dtype=torch.float32).unsqueeze(1)
-        
-        return state_batch, policy_batch, value_batch
-    
+        return self.get_batch(self.sample_indices(batch_size)[0])
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray):
+        """Set the priorities of sampled indices (e.g. to their training loss)."""
+        priorities = np.maximum(np.asarray(priorities, dtype=np.float32), 1e-6)
+        self.priorities[indices] = priorities
+        self._max_priority = max(self._max_priority, float(priorities.max()))
+
     def __len__(self) -> int:
-        return len(self.buffer)
+        return self._size
+
+
+class SharedReplayBuffer(ReplayBuffer):
+    """
+    ReplayBuffer shared between processes: actors add games while a learner
+    samples from it.
+
+    The arrays are memory-mapped files (in /dev/shm unless `path` is given)
+    mapped by every process holding the buffer, the fill level and write
+    position live in shared memory, and adds, samples and priority updates
+    take one shared lock. Pass the buffer to worker processes as a Process
+    argument; they reopen the files.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        input_dim: int,
+        action_dim: int,
+        prioritized: bool = False,
+        alpha: float = 0.6,
+        path: Optional[str] = None,
+        beta: float = 0.4,
+        ctx=None,
+    ):
+        """
+        Args:
+            capacity, input_dim, action_dim, prioritized, alpha, beta: As ReplayBuffer
+            path: Directory for the memmap files (default: a temporary one
+                in /dev/shm, removed by close())
+            ctx: multiprocessing context the worker processes are started with
+        """
+        ctx = ctx or multiprocessing.get_context()
+        self._lock = ctx.RLock()
+        self._counters = ctx.Array('d', 3, lock=False)  # size, pos, max_priority
+        self._owns_path = path is None
+        if path is None:
+            shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            path = tempfile.mkdtemp(prefix="replay_", dir=shm_dir)
+        super().__init__(capacity, input_dim, action_dim, prioritized, alpha, path, beta)
+
+    # Fill level, write position and max priority, as seen by every process
+
+    @property
+    def _size(self) -> int:
+        return int(self._counters[0])
+
+    @_size.setter
+    def _size(self, value: int):
+        self._counters[0] = value
+
+    @property
+    def _pos(self) -> int:
+        return int(self._counters[1])
+
+    @_pos.setter
+    def _pos(self, value: int):
+        self._counters[1] = value
+
+    @property
+    def _max_priority(self) -> float:
+        return self._counters[2]
+
+    @_max_priority.setter
+    def _max_priority(self, value: float):
+        self._counters[2] = value
+
+    def add_batch(self, states, policies, values):
+        with self._lock:
+            super().add_batch(states, policies, values)
+
+    def sample_indices(self, batch_size: int, beta: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            return super().sample_indices(batch_size, beta)
+
+    def get_batch(self, indices: np.ndarray) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        with self._lock:
+            return super().get_batch(indices)
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray):
+        with self._lock:
+            super().update_priorities(indices, priorities)
+
+    def flush(self):
+        with self._lock:
+            super().flush()
+
+    def close(self):
+        """Remove the temporary memmap files (in the process that created the buffer)."""
+        if self._owns_path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._owns_path = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("states", "policies", "values", "priorities", "_rng"):
+            state.pop(name, None)
+        state["_owns_path"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._rng = np.random.default_rng()
+        for name in ("states", "policies", "values", "priorities"):
+            setattr(self, name, np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r+'))
+
+
+def _as_row(value) -> np.ndarray:
+    """A state or policy (tensor or array) as a flat float32 array."""
+    if isinstance(value, torch.Tensor):
+        value = value.detach().cpu().numpy()
+    return np.asarray(value, dtype=np.float32).reshape(-1)
@@ -9,6 +9,7 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import math
+import numpy as np
 from typing import Optional, Tuple
 
 
@@ -227,13 +228,83 @@ class SequenceEncoder:
     - card_ids: [seq_len] tensor of card ID indices
     - card_features: [seq_len, 11] tensor of card features
     - attention_mask: [seq_len] tensor of valid positions
+    
+    Static per-card data (vocabulary id, card type one-hot) lives in a row
+    table built once per card; encoding gathers those rows with NumPy and
+    only writes the dynamic stats, zone and controller.
     """
     
+    NUM_FEATURES = 11
+    
     def __init__(self, card_to_id: dict = None):
         # Card ID vocabulary (can be loaded from CardDatabase)
         self.card_to_id = card_to_id or {}
         self.unknown_id = 1  # Reserve 0 for padding
         
+        # Card row table: (card_id, card_type) -> row. Row 0 is padding.
+        self._row_index = {}
+        self._row_ids = [0]
+        self._row_types = [-1]
+        self._table_ids = None  # np arrays, rebuilt when rows are added
+        self._table_static = None
+        
+        # Sequence layout: friendly board, friendly hand, enemy board
+        self.seq_len = MAX_BOARD_SIZE + MAX_HAND_SIZE + MAX_BOARD_SIZE
+        self._hand_start = MAX_BOARD_SIZE
+        self._enemy_start = MAX_BOARD_SIZE + MAX_HAND_SIZE
+        
+        # Zone one-hot [hand, board, graveyard] and controller of each slot
+        self._slot_template = np.zeros((self.seq_len, 4), dtype=np.float32)
+        self._slot_template[:self._hand_start] = (0, 1, 0, 1)
+        self._slot_template[self._hand_start:self._enemy_start] = (1, 0, 0, 1)
+        self._slot_template[self._enemy_start:] = (0, 1, 0, 0)
+        self._stat_caps = np.array([10.0, 12.0, 12.0])
+    
+    def load_card_table(self, cards) -> None:
+        """
+        Precompute rows for a set of cards (e.g. CardDatabase.get_collectible_cards()).
+        
+        Cards seen later during encoding are added on first use.
+        """
+        from simulator.enums import CardType as SimCardType
+        type_index = {
+            SimCardType.MINION: 0,
+            SimCardType.SPELL: 1,
+            SimCardType.WEAPON: 2,
+            SimCardType.HERO: 3,
+        }
+        for card in cards:
+            self._add_row(card.card_id, type_index.get(card.card_type, 0))
+    
+    def _add_row(self, card_id: str, card_type) -> int:
+        key = (card_id, card_type)
+        row = self._row_index.get(key)
+        if row is None:
+            row = len(self._row_ids)
+            self._row_index[key] = row
+            self._row_ids.append(self.card_to_id.get(card_id, self.unknown_id))
+            self._row_types.append(card_type if isinstance(card_type, int) and 0 <= card_type < 4 else -1)
+            self._table_ids = None
+        return row
+    
+    def _card_row(self, card) -> int:
+        """Row of a card in the table, adding it on first use."""
+        card_id = getattr(card, 'card_id', '') or getattr(card, 'id', '')
+        card_type = getattr(card, 'card_type', 0)
+        row = self._row_index.get((card_id, card_type))
+        if row is None:
+            row = self._add_row(card_id, card_type)
+        return row
+    
+    def _build_table(self):
+        rows = len(self._row_ids)
+        self._table_ids = np.array(self._row_ids, dtype=np.int64)
+        static = np.zeros((rows, self.NUM_FEATURES), dtype=np.float32)
+        types = np.array(self._row_types)
+        typed = np.nonzero(types >= 0)[0]
+        static[typed, 3 + types[typed]] = 1.0
+        self._table_static = static
+    
     def encode(self, game_state) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """
         Encode a GameState into transformer inputs.
@@ -243,71 +314,58 @@ class SequenceEncoder:
             card_features: [seq_len, 11] tensor
             attention_mask: [seq_len] tensor
         """
-        card_ids = []
-        card_features = []
-        
-        # Friendly board
-        for minion in game_state.friendly_player.board[:MAX_BOARD_SIZE]:
-            cid, feat = self._encode_card(minion, zone=1, controller=1)
-            card_ids.append(cid)
-            card_features.append(feat)
-        
-        # Pad friendly board
-        for _ in range(MAX_BOARD_SIZE - len(game_state.friendly_player.board)):
-            card_ids.append(0)
-            card_features.append([0] * 11)
-        
-        # Friendly hand
-        for card in game_state.friendly_player.hand[:MAX_HAND_SIZE]:
-            cid, feat = self._encode_card(card, zone=0, controller=1)
-            card_ids.append(cid)
-            card_features.append(feat)
-        
-        # Pad hand
-        for _ in range(MAX_HAND_SIZE - len(game_state.friendly_player.hand)):
-            card_ids.append(0)
-            card_features.append([0] * 11)
-        
-        # Enemy board
-        for minion in game_state.enemy_player.board[:MAX_BOARD_SIZE]:
-            cid, feat = self._encode_card(minion, zone=1, controller=0)
-            card_ids.append(cid)
-            card_features.append(feat)
-        
-        # Pad enemy board
-        for _ in range(MAX_BOARD_SIZE - len(game_state.enemy_player.board)):
-            card_ids.append(0)
-            card_features.append([0] * 11)
-        
-        # Create tensors
-        card_ids_tensor = torch.tensor(card_ids, dtype=torch.long)
-        card_features_tensor = torch.tensor(card_features, dtype=torch.float32)
-        attention_mask = (card_ids_tensor != 0)
-        
-        return card_ids_tensor, card_features_tensor, attention_mask
+        card_ids, card_features, attention_mask = self.encode_many([game_state])
+        return card_ids[0], card_features[0], attention_mask[0]
     
-    def _encode_card(self, card, zone: int, controller: int) -> Tuple[int, list]:
-        """Encode a single card."""
-        # Get card ID
-        card_id_str = getattr(card, 'card_id', '') or getattr(card, 'id', '')
-        card_id = self.card_to_id.get(card_id_str, self.unknown_id)
-        
-        # Get stats (normalized)
-        cost = min(getattr(card, 'cost', 0), 10) / 10.0
-        attack = min(getattr(card, 'attack', 0), 12) / 12.0
-        health = min(getattr(card, 'health', 0), 12) / 12.0
-        
-        # Card type one-hot [minion, spell, weapon, hero]
-        card_type = getattr(card, 'card_type', 0)
-        type_onehot = [0, 0, 0, 0]
-        if isinstance(card_type, int) and 0 <= card_type < 4:
-            type_onehot[card_type] = 1
+    def encode_many(self, game_states, out: Optional[np.ndarray] = None
+                    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Encode several GameStates at once.
+        
+        Args:
+            game_states: States to encode
+            out: Optional float32 array of shape [>= batch, seq_len, 11] to
+                write card features into (the returned tensor shares it)
         
-        # Zone one-hot [hand, board, graveyard]
-        zone_onehot = [0, 0, 0]
-        if 0 <= zone < 3:
-            zone_onehot[zone] = 1
+        Returns:
+            card_ids: [batch, seq_len] tensor
+            card_features: [batch, seq_len, 11] tensor
+            attention_mask: [batch, seq_len] tensor
+        """
+        count = len(game_states)
+        rows = np.zeros((count, self.seq_len), dtype=np.int64)
+        stats = np.zeros((count, self.seq_len, 3))
+        
+        card_row = self._card_row
+        zones = (
+            (0, MAX_BOARD_SIZE, lambda s: s.friendly_player.board),
+            (self._hand_start, MAX_HAND_SIZE, lambda s: s.friendly_player.hand),
+            (self._enemy_start, MAX_BOARD_SIZE, lambda s: s.enemy_player.board),
+        )
+        for b, game_state in enumerate(game_states):
+            for start, size, get_cards in zones:
+                cards = get_cards(game_state)[:size]
+                if not cards:
+                    continue
+                end = start + len(cards)
+                rows[b, start:end] = [card_row(c) for c in cards]
+                stats[b, start:end] = [
+                    (getattr(c, 'cost', 0), getattr(c, 'attack', 0), getattr(c, 'health', 0))
+                    for c in cards
+                ]
+        
+        if self._table_ids is None:
+            self._build_table()
+        
+        card_ids = self._table_ids[rows]
+        if out is None:
+            features = self._table_static[rows]
+        else:
+            features = np.take(self._table_static, rows, axis=0, out=out[:count])
         
-        features = [cost, attack, health] + type_onehot + zone_onehot + [controller]
+        # Dynamic stats (normalized), then zone and controller of filled slots
+        features[:, :, :3] = np.minimum(stats, self._stat_caps) / self._stat_caps
+        valid = card_ids != 0
+        features[:, :, 7:] = self._slot_template * valid[:, :, None]
         
-        return card_id, features
+        return torch.from_numpy(card_ids), torch.from_numpy(features), torch.from_numpy(valid)
@@ -0,0 +1,132 @@
+"""
+Vectorized environment for HearthstoneOne AI.
+
+Steps N games in lockstep so that self-play, arena matches or data
+collection can evaluate every game's position in one batched forward pass
+per tick instead of one network call per game.
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from .actions import Action, ACTION_SPACE_SIZE
+from .encoder import FeatureEncoder
+from .game_wrapper import HearthstoneGame
+from simulator import GameConfig
+
+
+class VecHearthstoneEnv:
+    """
+    N HearthstoneGame instances advanced together.
+
+    Every observation is from the point of view of the player to move in
+    that game (see `current_players`). Observations and legal-action masks
+    are written into preallocated arrays that are reused between ticks, so
+    copy them if they need to outlive the next call.
+
+    Finished games are reset automatically: the arrays returned by `step`
+    then describe the first position of the new game, and the result of
+    the finished one is in that game's info dict.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        encoder: Optional[FeatureEncoder] = None,
+        config: Optional[GameConfig] = None,
+        reset_kwargs: Optional[Dict[str, Any]] = None,
+        max_steps: int = 200,
+    ):
+        """
+        Args:
+            num_envs: Number of games
+            encoder: Encoder with `encode_batch(states, out)` (FeatureEncoder)
+                or `encode_many(states)` (SequenceEncoder)
+            config: GameConfig of every game (default: GameConfig.headless())
+            reset_kwargs: Keyword arguments for HearthstoneGame.reset
+            max_steps: Actions per game before it is ended as a draw
+        """
+        self.num_envs = num_envs
+        self.encoder = encoder or FeatureEncoder()
+        self.config = config or GameConfig.headless()
+        self.reset_kwargs = reset_kwargs or {}
+        self.max_steps = max_steps
+
+        self.envs = [HearthstoneGame(config=self.config) for _ in range(num_envs)]
+        for env in self.envs:
+            env._max_steps = max_steps
+
+        self._masks = np.zeros((num_envs, ACTION_SPACE_SIZE), dtype=bool)
+        self._obs = None
+        if hasattr(self.encoder, 'encode_batch'):
+            self._obs = np.zeros((num_envs, self.encoder.input_dim), dtype=np.float32)
+        self.current_players = np.ones(num_envs, dtype=np.int8)
+
+    def reset_all(self) -> Tuple[Any, np.ndarray]:
+        """Start a new game in every slot. Returns (observations, masks)."""
+        for env in self.envs:
+            env.reset(**self.reset_kwargs)
+        return self._observe()
+
+    def step(self, actions: np.ndarray) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Apply one action index per game.
+
+        An illegal index (not set in the last mask) ends the turn instead.
+
+        Returns:
+            (observations, masks, rewards, dones, infos): rewards are from
+            the point of view of the player who acted (+1 win, -1 loss,
+            0 otherwise); for finished games the info holds "winner"
+            (1, 2 or None for a draw) and "length".
+        """
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+
+        for i, action_idx in enumerate(np.asarray(actions).reshape(-1).tolist()):
+            env = self.envs[i]
+            actor = env.perspective
+            action = None
+            if 0 <= action_idx < ACTION_SPACE_SIZE and self._masks[i, action_idx]:
+                action = env.action_for_index(action_idx)
+            if action is None:
+                action = Action.end_turn()
+                infos[i]["illegal_action"] = action_idx
+
+            env._step_count += 1
+            try:
+                env.execute(action)
+            except Exception as e:
+                infos[i]["error"] = str(e)
+
+            if env.is_game_over or env._step_count >= env._max_steps:
+                winner_player = env.game.winner
+                winner = None
+                if winner_player is not None:
+                    winner = 1 if winner_player is env.game.players[0] else 2
+                if winner is not None:
+                    rewards[i] = 1.0 if winner == actor else -1.0
+                dones[i] = True
+                infos[i]["winner"] = winner
+                infos[i]["length"] = env._step_count
+                env.reset(**self.reset_kwargs)
+
+        observations, masks = self._observe()
+        return observations, masks, rewards, dones, infos
+
+    def _observe(self) -> Tuple[Any, np.ndarray]:
+        """Encode every game for its player to move and rebuild the masks."""
+        masks = self._masks
+        states = []
+        for i, env in enumerate(self.envs):
+            game = env.game
+            env.perspective = 1 if game.current_player is game.players[0] else 2
+            self.current_players[i] = env.perspective
+            env.legal_mask(out=masks[i])
+            states.append(env.get_state())
+
+        if self._obs is not None:
+            self.encoder.encode_batch(states, out=self._obs)
+            return self._obs, masks
+        return self.encoder.encode_many(states), masks
@@ -4,9 +4,26 @@ This module provides a unified interface to access all ported card effects
 across all expansions.
 """
 
+from types import MappingProxyType
+from typing import NamedTuple, Mapping, Callable, Tuple
+
 # Module-level cache for effects (populated on first call)
 _effects_cache = None
 
+# Precompiled, process-wide handler tables (populated on first call)
+_handler_tables = None
+
+
+# Events a card can react to while it is still in the deck
+DECK_TRIGGER_EVENTS = ("on_after_card_played",)
+
+
+class HandlerTables(NamedTuple):
+    """Immutable handler tables keyed by card_id, shared by every Game."""
+    battlecry: Mapping[str, Callable]
+    deathrattle: Mapping[str, Callable]
+    deck_triggers: Mapping[str, Tuple[str, Callable]]  # card_id -> (event, handler)
+
 
 def get_all_effects():
     """Get a combined dictionary of all ported card effects.
@@ -206,47 +223,80 @@ def get_effect(card_id: str):
     return effects.get(card_id)
 
 
-def register_all_effects(game) -> int:
-    """Register all Fireplace-ported effects with a game instance.
+def get_handler_tables() -> HandlerTables:
+    """Get the precompiled handler tables, built once per process.
     
-    Automatically routes effects to the correct handler dictionary based on function name:
-    - *_battlecry -> _battlecry_handlers
-    - *_deathrattle -> _deathrattle_handlers
-    - *_trigger -> _trigger_handlers (TODO: Needs proper event registration)
+    Routes effects to the correct table based on function name:
+    - *_battlecry -> battlecry
+    - *_deathrattle -> deathrattle
+    - *_trigger / *_inspire -> skipped (TODO: Needs proper event registration)
+    - *_<event> for a DECK_TRIGGER_EVENTS event -> deck_triggers (e.g. Patches)
+    - anything else (e.g. 'effect_CARDID') -> battlecry (spell cast)
     
-    Args:
-        game: The game instance to register effects with
-        
     Returns:
-        Number of effects registered
+        HandlerTables of read-only mappings, shared by reference
     """
-    effects = get_all_effects()
-    count = 0
-    for card_id, handler in effects.items():
+    global _handler_tables
+    
+    if _handler_tables is not None:
+        return _handler_tables
+    
+    battlecry = {}
+    deathrattle = {}
+    deck_triggers = {}
+    for card_id, handler in get_all_effects().items():
         func_name = handler.__name__
+        deck_event = next((e for e in DECK_TRIGGER_EVENTS if func_name.endswith("_" + e)), None)
         
-        if func_name.endswith("_battlecry"):
-            if hasattr(game, '_battlecry_handlers'):
-                game._battlecry_handlers[card_id] = handler
-                count += 1
+        if deck_event:
+            # Registered per card by create_card, fires while the card is in the deck
+            deck_triggers[card_id] = (deck_event, handler)
+        elif func_name.endswith("_battlecry"):
+            battlecry[card_id] = handler
         elif func_name.endswith("_deathrattle"):
-            if hasattr(game, '_deathrattle_handlers'):
-                game._deathrattle_handlers[card_id] = handler
-                count += 1
+            deathrattle[card_id] = handler
         elif func_name.endswith("_trigger") or func_name.endswith("_inspire"):
             # Triggers and Inspire effects are more complex, they need to be registered for specific events.
             # For now, we unfortunately can't auto-register them easily without parsing 
             # the docstring or having metadata.
-            # We'll skip them for now or put them in a separate dict if the game supports it.
-            # The current Game implementation has `_triggers` dict which is per-event.
             pass
         else:
             # Fallback for older ported effects that might just be named 'effect_CARDID'
             # Assume battlecry/spell cast for now
-            if hasattr(game, '_battlecry_handlers'):
-                game._battlecry_handlers[card_id] = handler
-                count += 1
-                
+            battlecry[card_id] = handler
+    
+    _handler_tables = HandlerTables(
+        battlecry=MappingProxyType(battlecry),
+        deathrattle=MappingProxyType(deathrattle),
+        deck_triggers=MappingProxyType(deck_triggers),
+    )
+    return _handler_tables
+
+
+def register_all_effects(game) -> int:
+    """Attach the shared Fireplace-ported handler tables to a game instance.
+    
+    Nothing is copied: the game's handler tables read through to the
+    process-wide tables from get_handler_tables(). Handlers the game
+    registered itself (e.g. via create_card) stay layered on top.
+    
+    Args:
+        game: The game instance to register effects with
+        
+    Returns:
+        Number of effects registered
+    """
+    tables = get_handler_tables()
+    count = 0
+    if hasattr(game, '_battlecry_handlers'):
+        game._battlecry_handlers.rebase(tables.battlecry)
+        count += len(tables.battlecry)
+    if hasattr(game, '_deathrattle_handlers'):
+        game._deathrattle_handlers.rebase(tables.deathrattle)
+        count += len(tables.deathrattle)
+    if hasattr(game, '_deck_trigger_handlers'):
+        game._deck_trigger_handlers.rebase(tables.deck_triggers)
+        count += len(tables.deck_triggers)
     return count
 
 
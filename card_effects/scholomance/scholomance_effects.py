@@ -66,9 +66,7 @@ def effect_SCH_351_battlecry(game, source, target):
                 source.destroy()
         
         # Register trigger
-        # We access the game's internal trigger list directly as we don't have a public API for dynamic triggers yet
-        if "on_damage_taken" in game._triggers:
-            game._triggers["on_damage_taken"].append((illusion, illusion_damage_handler))
+        game.register_trigger("on_damage_taken", illusion, illusion_damage_handler)
 
 
 # SCH_514 - Lorekeeper Polkelt
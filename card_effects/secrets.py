@@ -221,7 +221,7 @@ def check_secrets(game, trigger_type: str, event_data: dict) -> None:
     current_player = game.current_player
     opponent = current_player.opponent if current_player else None
     
-    if not opponent:
+    if not opponent or not opponent.has_secret_for(trigger_type):
         return
     
     secrets_to_remove = []
@@ -232,8 +232,10 @@ def check_secrets(game, trigger_type: str, event_data: dict) -> None:
             handler = SECRET_HANDLERS.get(secret_id)
             if handler and handler(game, secret, event_data):
                 secrets_to_remove.append(secret)
+                # The secret may have changed stats: rescan boards for deaths
+                game._scan_boards = True
                 break  # Only one secret triggers per event
     
     # Remove triggered secrets
     for secret in secrets_to_remove:
-        opponent.secrets.remove(secret)
+        opponent.remove_secret(secret)
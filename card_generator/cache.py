@@ -5,11 +5,21 @@ Manages saving and loading of generated card effects, organized by expansion.
 
 import os
 import importlib.util
-from typing import Optional, Callable, Dict
+from typing import Optional, Callable, Dict, Set, Tuple
+
+EFFECT_PREFIX = "effect_"
+EFFECT_ATTRS = ("battlecry", "deathrattle", "on_play", "setup")
+
 
 class EffectCache:
-    """Manages the storage and retrieval of generated Python code for card effects."""
-    
+    """Manages the storage and retrieval of generated Python code for card effects.
+
+    Effect files are indexed with a single scan of ``card_effects/*/effect_*.py``
+    the first time they are needed, and each effect module is executed at most
+    once per process. Cards without an effect file are remembered too, so deck
+    construction and token creation never touch the filesystem after warm-up.
+    """
+
     def __init__(self, cache_dir: str = "card_effects"):
         self.cache_dir = cache_dir
         if not os.path.exists(cache_dir):
@@ -18,37 +28,102 @@ class EffectCache:
             with open(os.path.join(cache_dir, "__init__.py"), "w") as f:
                 f.write('"""Generated card effects."""\n')
 
+        # card_id -> {expansion dir name ("" for cache_dir itself): path}
+        self._index: Optional[Dict[str, Dict[str, str]]] = None
+        # Expansion directories known to exist
+        self._known_dirs: Set[str] = set()
+        # (card_id, card_set) -> loaded effects, or None when there is no effect
+        self._effects: Dict[Tuple[str, Optional[str]], Optional[Dict[str, Callable]]] = {}
+
+    @staticmethod
+    def _dir_name(card_set: str) -> str:
+        """Sanitize card_set for directory name."""
+        return card_set.lower().replace(" ", "_")
+
+    def build_index(self) -> int:
+        """Scan the cache directory once and index every effect file.
+
+        Returns:
+            Number of effect files indexed
+        """
+        index: Dict[str, Dict[str, str]] = {}
+        count = 0
+
+        def add_files(dir_path: str, dir_name: str) -> None:
+            nonlocal count
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith(EFFECT_PREFIX) and name.endswith(".py") and entry.is_file():
+                        card_id = name[len(EFFECT_PREFIX):-3]
+                        index.setdefault(card_id, {})[dir_name] = entry.path
+                        count += 1
+
+        with os.scandir(self.cache_dir) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir():
+                    subdirs.append(entry)
+        for entry in subdirs:
+            self._known_dirs.add(entry.name)
+            add_files(entry.path, entry.name)
+        add_files(self.cache_dir, "")
+
+        self._index = index
+        return count
+
+    def invalidate(self) -> None:
+        """Drop the file index and loaded modules (e.g. after external edits)."""
+        self._index = None
+        self._known_dirs.clear()
+        self._effects.clear()
+
+    def _get_index(self) -> Dict[str, Dict[str, str]]:
+        if self._index is None:
+            self.build_index()
+        return self._index
+
+    def _find_effect_file(self, card_id: str, card_set: Optional[str] = None) -> Optional[str]:
+        """Look up an effect file in the index without touching the filesystem."""
+        paths = self._get_index().get(card_id)
+        if not paths:
+            return None
+        if card_set:
+            return paths.get(self._dir_name(card_set))
+        # Fallback search if card_set not provided: prefer expansion directories
+        for dir_name, path in paths.items():
+            if dir_name:
+                return path
+        return paths.get("")
+
     def get_expansion_dir(self, card_set: str) -> str:
         """Returns the directory path for a specific expansion."""
-        # Sanitize card_set for directory name
-        dir_name = card_set.lower().replace(" ", "_")
+        dir_name = self._dir_name(card_set)
         expansion_dir = os.path.join(self.cache_dir, dir_name)
+        if dir_name in self._known_dirs:
+            return expansion_dir
         if not os.path.exists(expansion_dir):
             os.makedirs(expansion_dir, exist_ok=True)
             with open(os.path.join(expansion_dir, "__init__.py"), "w") as f:
                 f.write(f'"""Generated effects for {card_set}."""\n')
+        self._known_dirs.add(dir_name)
         return expansion_dir
 
     def get_effect_path(self, card_id: str, card_set: Optional[str] = None) -> str:
         """Returns the file path for a card's effect code."""
         if card_set:
             expansion_dir = self.get_expansion_dir(card_set)
-            return os.path.join(expansion_dir, f"effect_{card_id}.py")
-        
-        # Fallback search if card_set not provided
-        for entry in os.listdir(self.cache_dir):
-            full_path = os.path.join(self.cache_dir, entry)
-            if os.path.isdir(full_path):
-                effect_path = os.path.join(full_path, f"effect_{card_id}.py")
-                if os.path.exists(effect_path):
-                    return effect_path
-                    
-        return os.path.join(self.cache_dir, f"effect_{card_id}.py")
+            return os.path.join(expansion_dir, f"{EFFECT_PREFIX}{card_id}.py")
+
+        path = self._find_effect_file(card_id)
+        if path:
+            return path
+
+        return os.path.join(self.cache_dir, f"{EFFECT_PREFIX}{card_id}.py")
 
     def is_cached(self, card_id: str, card_set: Optional[str] = None) -> bool:
         """Checks if the effect code for a card exists in the cache."""
-        path = self.get_effect_path(card_id, card_set)
-        return os.path.exists(path)
+        return self._find_effect_file(card_id, card_set) is not None
 
     def save_effect(self, card_id: str, code: str, card_set: str = "LEGACY") -> bool:
         """Saves the generated Python code to the cache."""
@@ -57,39 +132,53 @@ class EffectCache:
             with open(path, "w", encoding="utf-8") as f:
                 f.write(f'"""Effect for {card_id} in {card_set}"""\n\n')
                 f.write(code)
-            return True
         except Exception as e:
             print(f"Error saving effect: {e}")
             return False
 
+        # Keep the index in sync and force a reload of the new code
+        if self._index is not None:
+            self._index.setdefault(card_id, {})[self._dir_name(card_set)] = path
+        for key in [k for k in self._effects if k[0] == card_id]:
+            del self._effects[key]
+        return True
+
     def load_effect(self, card_id: str, card_set: Optional[str] = None) -> Optional[Dict[str, Callable]]:
-        """Loads the effect functions from the cache."""
-        path = self.get_effect_path(card_id, card_set)
-        if not os.path.exists(path):
-            return None
+        """Loads the effect functions from the cache.
 
+        The effect module is executed once; later calls (and cards with no
+        effect file) are answered from memory.
+        """
+        key = (card_id, card_set)
         try:
-            # We need to calculate the correct module path
-            # Assuming card_effects is in the PYTHONPATH
-            rel_path = os.path.relpath(path, os.path.dirname(self.cache_dir))
-            module_name = rel_path.replace(os.sep, ".").replace(".py", "")
-            
-            spec = importlib.util.spec_from_file_location(f"effect_{card_id}", path)
+            return self._effects[key]
+        except KeyError:
+            pass
+
+        path = self._find_effect_file(card_id, card_set)
+        effects = self._exec_effect_module(card_id, path) if path else None
+        self._effects[key] = effects
+        return effects
+
+    def _exec_effect_module(self, card_id: str, path: str) -> Optional[Dict[str, Callable]]:
+        """Execute an effect file and collect its entry points."""
+        try:
+            spec = importlib.util.spec_from_file_location(f"{EFFECT_PREFIX}{card_id}", path)
             if spec and spec.loader:
                 module = importlib.util.module_from_spec(spec)
-                
+
                 # Dynamic imports to avoid circular dependency
                 from simulator.card_loader import create_card, CardDatabase
                 module.__dict__["create_card"] = create_card
                 module.__dict__["CardDatabase"] = CardDatabase
-                
+
                 spec.loader.exec_module(module)
-                
+
                 effects = {}
-                for attr in ["battlecry", "deathrattle", "on_play", "setup"]:
+                for attr in EFFECT_ATTRS:
                     if hasattr(module, attr):
                         effects[attr] = getattr(module, attr)
-                
+
                 return effects
             return None
         except Exception as e:
@@ -18,7 +18,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ai.model import HearthstoneModel
 from ai.encoder import FeatureEncoder
-from ai.mcts import MCTS
+from ai.mcts import MCTS, MCTSSession
 from ai.game_wrapper import HearthstoneGame
 from ai.actions import Action
 
@@ -62,6 +62,9 @@ class Arena:
             # Or depends on game logic.
             # In our game engine, players[0] is initialized as current usually.
             
+            # One tree per game, following both players' moves
+            session = MCTSSession(MCTS(self.model, self.encoder, env.game, num_simulations=mcts_sims))
+            
             # Game Loop
             step = 0
             while not env.is_game_over and step < 200:
@@ -72,13 +75,13 @@ class Arena:
                     # === MODEL TURN (Player 1) ===
                     # Use MCTS
                     root_state = env.game.clone()
-                    mcts = MCTS(self.model, self.encoder, root_state, num_simulations=mcts_sims) # mcts_sims passed from arg
-                    probs = mcts.search(root_state)
+                    probs = session.search(root_state)
                     
                     # Greedy action for evaluation
                     action_idx = np.argmax(probs)
                     
                     self._apply_action(env, action_idx)
+                    session.advance(int(action_idx), env.game)
                     
                 else:
                     # === RANDOM TURN (Player 2) ===
@@ -87,6 +90,7 @@ class Arena:
                         # Should not happen as End Turn is always valid?
                         # If truly no actions, pass
                         env.game.end_turn()
+                        session.reset()
                     else:
                         random_action = np.random.choice(valid_actions)
                         
@@ -94,6 +98,7 @@ class Arena:
                         # Or convert to index and back to test wrapper?
                         # Using wrapper apply directly on object
                         self._apply_action_object(env, random_action)
+                        session.advance(random_action.to_index(), env.game)
                         
                 step += 1
                 
@@ -113,11 +118,18 @@ class Arena:
         return wins, losses, draws
 
     def _apply_action(self, env, action_idx):
-        from ai.actions import Action
-        action_obj = Action.from_index(action_idx)
-        self._execute(env, action_obj, "Model")
+        # The action MCTS simulated for this index (same card, attacker and target)
+        try:
+            env.execute_index(int(action_idx))
+        except Exception:
+            pass
 
     def _apply_action_object(self, env, action_obj):
+        try:
+            if env.execute(action_obj):
+                return
+        except Exception:
+            return
         self._execute(env, action_obj, "Random")
         
     def _execute(self, env, action, player_name):
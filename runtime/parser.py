@@ -432,7 +432,7 @@ class LogParser:
         elif old_zone == Zone.GRAVEYARD and entity in controller.graveyard:
             controller.graveyard.remove(entity)
         elif old_zone == Zone.SECRET and entity in controller.secrets:
-            controller.secrets.remove(entity)
+            controller.remove_secret(entity)
         
         # Update zone
         entity.zone = new_zone
@@ -446,7 +446,7 @@ class LogParser:
         elif new_zone == Zone.GRAVEYARD and entity not in controller.graveyard:
             controller.graveyard.append(entity)
         elif new_zone == Zone.SECRET and entity not in controller.secrets:
-            controller.secrets.append(entity)
+            controller.add_secret(entity)
     
     def _change_controller(self, entity, new_controller):
         """Move entity to new controller."""
@@ -213,7 +213,7 @@ class GameStateManager:
     def _suggest_with_mcts(self, model, encoder) -> Suggestion:
         """AI-based suggestion using MCTS."""
         try:
-            mcts = MCTS(model, encoder, self.game, num_simulations=50)
+            mcts = MCTS(model, encoder, self.game, num_simulations=50, batch_size=8)
             action_probs = mcts.search(self.game)
             
             # Get best action
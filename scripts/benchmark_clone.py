@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Game.clone Micro-Benchmark.
+
+Plays a seeded random game up to a mid-game turn, then reports how many
+Game.clone calls per second the simulator sustains on that state. MCTS
+clones the game once per expanded node, so this bounds search throughput.
+
+Usage:
+    python scripts/benchmark_clone.py --turn 12 --clones 5000
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.game_wrapper import HearthstoneGame
+
+
+def build_midgame_state(turn: int, seed: int) -> HearthstoneGame:
+    """Play random legal actions (mostly non-pass) until the given turn."""
+    random.seed(seed)
+    env = HearthstoneGame()
+    env.reset(do_mulligan=True)
+    first_player = env.game.players[0]
+
+    while env.game.turn < turn and not env.is_game_over:
+        env.perspective = 1 if env.current_player is first_player else 2
+        actions = env.get_valid_actions()
+        if len(actions) > 1 and random.random() < 0.8:
+            env.step(random.choice(actions[:-1]))
+        else:
+            env.step(actions[-1])  # End turn
+    return env
+
+
+def time_clones(game, count: int, touch_deck: bool = False) -> float:
+    """Return clones per second over `count` clones."""
+    start = time.perf_counter()
+    for _ in range(count):
+        clone = game.clone()
+        if touch_deck:
+            # Forces the shared deck to be copied, like a draw would
+            clone.current_player.deck
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Game.clone throughput")
+    parser.add_argument("--turn", type=int, default=12, help="Turn to play to before cloning")
+    parser.add_argument("--clones", type=int, default=5000, help="Number of clones to time")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the setup game")
+    args = parser.parse_args()
+
+    env = build_midgame_state(args.turn, args.seed)
+    game = env.game
+
+    print(f"State: turn {game.turn}")
+    for player in game.players:
+        print(f"  {player.name}: deck={player.deck_size} hand={len(player.hand)} "
+              f"board={len(player.board)} graveyard={len(player.graveyard)}")
+
+    # Warm up (builds per-class clone layouts)
+    time_clones(game, 100)
+
+    rate = time_clones(game, args.clones)
+    print(f"clone:             {rate:,.0f} clones/sec ({1e6 / rate:.1f} us/clone)")
+    rate = time_clones(game, args.clones, touch_deck=True)
+    print(f"clone + deck copy: {rate:,.0f} clones/sec ({1e6 / rate:.1f} us/clone)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Headless Game Throughput Benchmark.
+
+Plays the same seeded random games with the default GameConfig and with
+GameConfig.headless(), checks that every game ends in exactly the same
+state in both modes, and reports games per second for each.
+
+Usage:
+    python scripts/benchmark_headless.py --games 20 --seed 0
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.game_wrapper import HearthstoneGame
+from simulator import GameConfig
+
+
+def legal_moves(game) -> List[Tuple[str, object, object]]:
+    """(kind, entity, target) moves of the current player; end turn is last.
+
+    Same move set as HearthstoneGame.get_valid_actions, without building
+    Action objects, so the timing measures the engine rather than the
+    RL wrapper.
+    """
+    player = game.current_player
+    moves = []
+    for card in player.hand:
+        if player.can_play_card(card):
+            targets = player.get_valid_targets(card) or [None]
+            moves.extend(("play", card, target) for target in targets)
+    for attacker in player.board:
+        if attacker.can_attack():
+            moves.extend(("attack", attacker, t) for t in player.get_valid_attack_targets(attacker))
+    if player.hero and player.hero.can_attack():
+        moves.extend(("attack", player.hero, t) for t in player.get_valid_attack_targets(player.hero))
+    if player.hero_power and player.hero_power.can_use():
+        moves.append(("hero_power", None, None))
+    moves.append(("end_turn", None, None))
+    return moves
+
+
+def play_random_game(seed: int, config: Optional[GameConfig] = None, max_moves: int = 1000) -> Tuple:
+    """Play one seeded random game and return a fingerprint of its final state."""
+    random.seed(seed)
+    env = HearthstoneGame(config=config)
+    env.reset(do_mulligan=True)
+    game = env.game
+
+    for _ in range(max_moves):
+        if game.ended:
+            break
+        moves = legal_moves(game)
+        if len(moves) > 1 and random.random() < 0.8:
+            kind, entity, target = random.choice(moves[:-1])
+        else:
+            kind, entity, target = moves[-1]
+        if kind == "play":
+            game.play_card(entity, target=target)
+        elif kind == "attack":
+            game.attack(entity, target)
+        elif kind == "hero_power":
+            game.use_hero_power()
+        else:
+            game.end_turn()
+
+    return (
+        game.turn,
+        tuple(
+            (player.hero.health, player.hero.armor, player.deck_size,
+             tuple(c.card_id for c in player.hand),
+             tuple((m.card_id, m.attack, m.health) for m in player.board),
+             tuple(player.cards_played_this_game), tuple(player.dead_minions))
+            for player in game.players
+        ),
+    )
+
+
+def run(games: int, seed: int, config: Optional[GameConfig]) -> Tuple[float, list]:
+    """Return (games/sec, fingerprints) over `games` seeded games."""
+    start = time.perf_counter()
+    results = [play_random_game(seed + i, config) for i in range(games)]
+    return games / (time.perf_counter() - start), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headless game throughput")
+    parser.add_argument("--games", type=int, default=20, help="Number of games per mode")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    args = parser.parse_args()
+
+    # Warm up (card database, handler tables)
+    play_random_game(args.seed, GameConfig.headless())
+
+    default_rate, default_results = run(args.games, args.seed, None)
+    headless_rate, headless_results = run(args.games, args.seed, GameConfig.headless())
+
+    mismatches = sum(a != b for a, b in zip(default_results, headless_results))
+    print(f"default:  {default_rate:6.2f} games/sec")
+    print(f"headless: {headless_rate:6.2f} games/sec ({headless_rate / default_rate:.2f}x)")
+    print(f"identical games: {args.games - mismatches}/{args.games}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -83,24 +83,20 @@ class InferenceServer:
             self._inference_context = torch.no_grad
     
     @torch.inference_mode()
-    def batch_inference(self, states: List[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]) -> List[Tuple[np.ndarray, float]]:
+    def batch_inference(self, batch: Tuple[torch.Tensor, torch.Tensor, torch.Tensor]) -> List[Tuple[np.ndarray, float]]:
         """
         Run batched inference on multiple game states.
         
         Args:
-            states: List of (card_ids, card_features, mask) tuples
+            batch: (card_ids, card_features, mask) batch from SequenceEncoder.encode_many
             
         Returns:
             List of (policy_probs, value) tuples
         """
-        if not states:
+        c_ids_batch, c_feats_batch, mask_batch = (t.to(self.device) for t in batch)
+        if len(c_ids_batch) == 0:
             return []
         
-        # Stack into batches
-        c_ids_batch = torch.stack([s[0] for s in states]).to(self.device)
-        c_feats_batch = torch.stack([s[1] for s in states]).to(self.device)
-        mask_batch = torch.stack([s[2] for s in states]).to(self.device)
-        
         # Single forward pass for entire batch
         policy_logits, values = self.model(c_ids_batch, c_feats_batch, mask_batch)
         
@@ -108,7 +104,7 @@ class InferenceServer:
         policy_probs = torch.softmax(policy_logits, dim=-1).cpu().numpy()
         values = values.cpu().numpy().flatten()
         
-        return [(policy_probs[i], values[i]) for i in range(len(states))]
+        return [(policy_probs[i], values[i]) for i in range(len(policy_probs))]
 
 
 class GameWorker:
@@ -166,9 +162,9 @@ class GameWorker:
         self.turn_count = 0
         self.current_valid_actions = []
     
-    def get_state(self) -> Optional[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+    def get_state(self) -> Optional[GameStateWrapper]:
         """
-        Get current encoded state.
+        Get current state, to be encoded in a batch with the other workers.
         Returns None if game is over or needs reset.
         """
         if self.game.ended or self.turn_count >= 60:
@@ -192,19 +188,23 @@ class GameWorker:
         if self.game.ended:
             return None
             
-        # Encode state
-        state_wrapper = GameStateWrapper(self.game, self.game.current_player_idx)
         try:
-            return self.encoder.encode(state_wrapper)
+            return GameStateWrapper(self.game, self.game.current_player_idx)
         except:
-            # If encoding fails, end turn and retry next call (or fail game)
+            # If wrapping fails, end turn and retry next call (or fail game)
             self.game.end_turn()
             self.turn_count += 1
             return None
     
-    def step(self, policy_probs: np.ndarray) -> Optional[List[Dict]]:
+    def step(self, policy_probs: np.ndarray,
+             encoded: Optional[Tuple[torch.Tensor, torch.Tensor]] = None) -> Optional[List[Dict]]:
         """
         Apply action based on policy.
+        
+        Args:
+            policy_probs: Policy for the state returned by get_state()
+            encoded: (card_ids, card_features) of that state, if already encoded
+        
         Returns list of game samples if game ended, else None.
         """
         if not self.current_valid_actions:
@@ -217,9 +217,12 @@ class GameWorker:
         
         # Record sample
         label = self._get_action_index(action, player)
-        state_wrapper = GameStateWrapper(self.game, self.game.current_player_idx)
         try:
-            c_ids, c_feats, mask = self.encoder.encode(state_wrapper)
+            if encoded is not None:
+                c_ids, c_feats = encoded
+            else:
+                state_wrapper = GameStateWrapper(self.game, self.game.current_player_idx)
+                c_ids, c_feats, mask = self.encoder.encode(state_wrapper)
             self.samples.append({
                 'card_ids': c_ids.tolist(),
                 'card_features': c_feats.tolist(),
@@ -397,14 +400,15 @@ class AlphaZeroGenerator:
             if not states:
                 continue
                 
-            # 2. Run batched inference
-            results = self.inference_server.batch_inference(states)
+            # 2. Encode all states in one pass and run batched inference
+            c_ids, c_feats, mask = self.encoder.encode_many(states)
+            results = self.inference_server.batch_inference((c_ids, c_feats, mask))
             
             # 3. Step workers with results
-            for idx, (policy, _) in zip(active_worker_indices, results):
+            for row, (idx, (policy, _)) in enumerate(zip(active_worker_indices, results)):
                 worker = workers[idx]
                 try:
-                    samples = worker.step(policy)
+                    samples = worker.step(policy, (c_ids[row], c_feats[row]))
                     if samples:
                         # Game finished
                         self.buffer.extend(samples)
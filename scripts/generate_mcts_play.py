@@ -21,9 +21,8 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ai.transformer_model import CardTransformer, SequenceEncoder
-from ai.mcts import MCTS
+from ai.mcts import MCTS, MCTSSession
 from ai.game_wrapper import HearthstoneGame
-from ai.actions import Action
 
 def _worker_fn(worker_args):
     """Worker process for parallel generation."""
@@ -54,14 +53,16 @@ def _worker_fn(worker_args):
         step_count = 0
         max_steps = 100
         
+        # One tree per game: each move reuses the chosen subtree
+        session = MCTSSession(MCTS(model, encoder, env.game, num_simulations=mcts_sims))
+        
         while not env.is_game_over and step_count < max_steps:
             # Clone state for MCTS root
             # Note: MCTS expects the 'Game' object (simulator) currently
             root_state = env.game.clone()
             
             # Run MCTS
-            mcts = MCTS(model, encoder, root_state, num_simulations=mcts_sims)
-            probs = mcts.search(root_state)
+            probs = session.search(root_state)
             
             # Store data
             encoded_state = encoder.encode(env.get_state())
@@ -74,10 +75,9 @@ def _worker_fn(worker_args):
             # Temperature annealing could go here (e.g. forced random early on)
             action_idx = np.random.choice(len(probs), p=probs)
             
-            # Execute
-            action_obj = Action.from_index(action_idx)
-            # Apply to real env
-            env.step(action_obj)
+            # Apply to real env: the same action the search simulated
+            env.execute_index(action_idx)
+            session.advance(action_idx, env.game)
             
             step_count += 1
             
@@ -24,6 +24,7 @@ from simulator.enums import GamePhase, Mulligan, CardType, Zone
 from simulator.card_loader import CardDatabase, create_card
 
 from ai.transformer_model import SequenceEncoder
+from training.shards import ShardWriter
 
 
 # Hero IDs by class
@@ -169,12 +170,54 @@ class MetaDeckLoader:
         return [k for k, v in self.decks.items() if v.get('class') == player_class.upper()]
 
 
+class JsonSampleWriter:
+    """Streams samples into one JSON file ({"samples": [...], ...}).
+
+    Same add/metadata/close interface as training.shards.ShardWriter, for
+    tools that still read JSON; samples are written as they come instead of
+    being kept in memory until the end.
+    """
+    
+    def __init__(self, output_file: str):
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        self.metadata: Dict[str, Any] = {}
+        self.num_samples = 0
+        self._file = open(output_file, 'w')
+        self._file.write('{"samples": [')
+    
+    def add(self, card_ids, card_features, label: int, outcome: float = 0.0):
+        sample = {
+            'card_ids': card_ids.tolist(),
+            'card_features': card_features.tolist(),
+            'action_label': label,
+            'game_outcome': outcome
+        }
+        self._file.write((', ' if self.num_samples else '') + json.dumps(sample))
+        self.num_samples += 1
+    
+    def close(self):
+        meta = dict(self.metadata, num_samples=self.num_samples)
+        self._file.write('], ' + json.dumps(meta)[1:])
+        self._file.close()
+    
+    def __len__(self) -> int:
+        return self.num_samples
+
+
 class SelfPlayGenerator:
     """Generates self-play games using meta decks."""
     
-    def __init__(self, output_file: str, data_dir: str = "data"):
+    def __init__(self, output_file: str, data_dir: str = "data", shard_size: int = 65536):
+        """
+        Args:
+            output_file: Dataset directory of binary shards (see
+                training.shards), or a .json file for the legacy format
+            data_dir: Directory with meta_deck_lists.json
+            shard_size: Samples per shard
+        """
         self.output_file = output_file
-        self.buffer = []
+        self.shard_size = shard_size
+        self.writer = None
         self.encoder = SequenceEncoder()
         
         # Load card database
@@ -189,12 +232,13 @@ class SelfPlayGenerator:
         self.vocab = {c.card_id: i + 2 for i, c in enumerate(all_cards)}
         
         # Save vocab
-        vocab_path = os.path.join(os.path.dirname(output_file), 'vocab.json')
+        vocab_path = os.path.join(os.path.dirname(output_file.rstrip(os.sep)) or '.', 'vocab.json')
         with open(vocab_path, 'w') as f:
             json.dump(self.vocab, f)
             print(f"Saved vocabulary ({len(self.vocab)} cards) to {vocab_path}")
             
         self.encoder = SequenceEncoder(self.vocab)
+        self.encoder.load_card_table(all_cards)
         
         # Load meta decks
         self.deck_loader = MetaDeckLoader(data_dir)
@@ -241,6 +285,12 @@ class SelfPlayGenerator:
         print(f"Starting generation of {num_games} games...")
         print(f"Using {len(available_decks)} deck archetypes")
         
+        if self.output_file.endswith('.json'):
+            self.writer = JsonSampleWriter(self.output_file)
+        else:
+            self.writer = ShardWriter(self.output_file, shard_size=self.shard_size)
+        print(f"Writing samples to {self.output_file}")
+        
         for i in range(num_games):
             # Pick two random decks
             key1 = random.choice(available_decks)
@@ -257,7 +307,7 @@ class SelfPlayGenerator:
                 self.games_played += 1
                 
                 if self.games_played % 10 == 0:
-                    print(f"[{self.games_played}/{num_games}] Samples: {len(self.buffer)}")
+                    print(f"[{self.games_played}/{num_games}] Samples: {len(self.writer)}")
                     
             except Exception as e:
                 self.games_failed += 1
@@ -266,10 +316,14 @@ class SelfPlayGenerator:
                     import traceback
                     traceback.print_exc()
         
-        self._save_buffer()
+        self.writer.metadata.update({
+            'games_played': self.games_played,
+            'generated_at': datetime.now().isoformat(),
+        })
+        self.writer.close()
         
         print(f"\nCompleted: {self.games_played} games, {self.games_failed} failed")
-        print(f"Total samples: {len(self.buffer)}")
+        print(f"Total samples: {len(self.writer)}")
         
     def _play_single_game(self, deck1: Dict, deck2: Dict) -> Game:
         """Play one game and record samples."""
@@ -332,8 +386,8 @@ class SelfPlayGenerator:
                 try:
                     c_ids, c_feats, mask = self.encoder.encode(state)
                     game_samples.append({
-                        'card_ids': c_ids.tolist(),
-                        'card_features': c_feats.tolist(),
+                        'card_ids': c_ids,
+                        'card_features': c_feats,
                         'action_label': card_index,  # Proper action index
                         'played_card': card.card_id,
                         'player_idx': pid
@@ -362,8 +416,8 @@ class SelfPlayGenerator:
                 try:
                     c_ids, c_feats, mask = self.encoder.encode(state)
                     game_samples.append({
-                        'card_ids': c_ids.tolist(),
-                        'card_features': c_feats.tolist(),
+                        'card_ids': c_ids,
+                        'card_features': c_feats,
                         'action_label': action_label,
                         'played_card': f"ATTACK_{action_label}",
                         'player_idx': pid
@@ -377,8 +431,8 @@ class SelfPlayGenerator:
                     try:
                         c_ids, c_feats, mask = self.encoder.encode(state)
                         game_samples.append({
-                            'card_ids': c_ids.tolist(),
-                            'card_features': c_feats.tolist(),
+                            'card_ids': c_ids,
+                            'card_features': c_feats,
                             'action_label': 10,  # Hero Power action index
                             'played_card': player.hero.hero_power.card_id if player.hero and player.hero.hero_power else 'HERO_POWER',
                             'player_idx': pid
@@ -399,12 +453,7 @@ class SelfPlayGenerator:
             p_idx = sample['player_idx']
             outcome = 0.0 if winner_idx == -1 else (1.0 if p_idx == winner_idx else -1.0)
             
-            self.buffer.append({
-                'card_ids': sample['card_ids'],
-                'card_features': sample['card_features'],
-                'action_label': sample['action_label'],
-                'game_outcome': outcome
-            })
+            self.writer.add(sample['card_ids'], sample['card_features'], sample['action_label'], outcome)
         
         return game
     
@@ -451,31 +500,12 @@ class SelfPlayGenerator:
         return actions
 
 
-
-    def _save_buffer(self):
-        """Save training data."""
-        print(f"Saving {len(self.buffer)} samples to {self.output_file}...")
-        
-        # Ensure directory exists
-        Path(self.output_file).parent.mkdir(parents=True, exist_ok=True)
-        
-        data = {
-            'num_samples': len(self.buffer),
-            'games_played': self.games_played,
-            'generated_at': datetime.now().isoformat(),
-            'samples': self.buffer
-        }
-        
-        with open(self.output_file, 'w') as f:
-            json.dump(data, f)
-        
-        print("Done.")
-
-
 def main():
     parser = argparse.ArgumentParser(description='Self-Play Data Generator')
     parser.add_argument('--num-games', type=int, default=100, help='Number of games')
-    parser.add_argument('--output', type=str, default='data/self_play_data.json', help='Output file')
+    parser.add_argument('--output', type=str, default='data/self_play_data',
+                        help='Output directory of binary shards (or a .json file for the legacy format)')
+    parser.add_argument('--shard-size', type=int, default=65536, help='Samples per shard')
     parser.add_argument('--data-dir', type=str, default='data', help='Data directory')
     parser.add_argument('--list-decks', action='store_true', help='List available decks')
     parser.add_argument('--decks', type=str, default=None, help='Comma-separated deck keys to use')
@@ -503,7 +533,7 @@ def main():
     if args.decks:
         deck_keys = [k.strip() for k in args.decks.split(',')]
     
-    generator = SelfPlayGenerator(args.output, args.data_dir)
+    generator = SelfPlayGenerator(args.output, args.data_dir, shard_size=args.shard_size)
     generator.generate_games(args.num_games, deck_keys)
 
 
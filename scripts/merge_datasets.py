@@ -1,52 +1,67 @@
 #!/usr/bin/env python3
 """Merge training datasets with a rolling window to prevent unbounded growth.
 
+The merged dataset is a sharded binary dataset (see training/shards.py):
+new samples are appended as whole shards and the window is applied by
+deleting the oldest shards, so retained data is never read or rewritten
+and an update costs O(new data). JSON inputs are streamed into shards.
+
 Usage:
-    python3 scripts/merge_datasets.py --base data/combined.json --new data/rl_data.json --max-samples 100000
+    python3 scripts/merge_datasets.py --base data/combined --new data/rl_data --max-samples 100000
 """
 
 import argparse
-import json
 import os
+import shutil
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.shards import (
+    append_shards, clear_shards, convert_json, drop_oldest_shards, is_shard_dir, read_manifest
+)
+
+
+def _add_dataset(output_dir: str, path: str, shard_size: int, move: bool = False) -> int:
+    """Append a shard dataset or JSON file to output_dir. Returns the samples added."""
+    if is_shard_dir(path):
+        return append_shards(output_dir, [path], move=move)
+
+    # JSON: stream into a scratch dataset next to the output, then move its shards in
+    scratch_dir = os.path.join(output_dir, ".incoming")
+    try:
+        convert_json([path], scratch_dir, shard_size=shard_size)
+        return append_shards(output_dir, [scratch_dir], move=True)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def merge_datasets(base_path: str, new_path: str, output_path: str, max_samples: int,
+                   shard_size: int = 65536, move: bool = False) -> None:
+    """Merge datasets keeping only the most recent samples (whole shards)."""
+    if os.path.isfile(output_path):
+        raise ValueError(f"Output must be a dataset directory, not a file: {output_path}")
 
-def merge_datasets(base_path: str, new_path: str, output_path: str, max_samples: int) -> None:
-    """Merge datasets keeping only the most recent samples."""
-    
-    # Load base dataset (or create empty if doesn't exist)
-    if os.path.exists(base_path):
-        print(f"Loading base: {base_path}")
-        with open(base_path, 'r') as f:
-            base = json.load(f)
-    else:
-        print(f"Base file not found, starting fresh")
-        base = {"samples": []}
-    
-    # Load new dataset
-    print(f"Loading new: {new_path}")
-    with open(new_path, 'r') as f:
-        new = json.load(f)
-    
-    old_count = len(base.get("samples", []))
-    new_count = len(new.get("samples", []))
-    
-    # Merge and apply rolling window
-    combined = base.get("samples", []) + new.get("samples", [])
-    combined = combined[-max_samples:]  # Keep only last N samples
-    
-    # Update base with merged samples
-    base["samples"] = combined
-    
-    # Write output
-    print(f"Writing: {output_path}")
-    with open(output_path, 'w') as f:
-        json.dump(base, f)
-    
-    final_count = len(combined)
-    discarded = (old_count + new_count) - final_count
-    
-    print(f"\nMerge complete:")
+    os.makedirs(output_path, exist_ok=True)
+    if os.path.abspath(output_path) != os.path.abspath(base_path):
+        clear_shards(output_path)
+        if os.path.exists(base_path):
+            print(f"Copying base: {base_path}")
+            _add_dataset(output_path, base_path, shard_size)
+        else:
+            print(f"Base not found, starting fresh")
+    elif not is_shard_dir(output_path):
+        print(f"Base not found, starting fresh")
+
+    old_count = read_manifest(output_path)["num_samples"] if is_shard_dir(output_path) else 0
+
+    print(f"Appending new: {new_path}")
+    new_count = _add_dataset(output_path, new_path, shard_size, move=move)
+
+    discarded = drop_oldest_shards(output_path, max_samples)
+    final_count = read_manifest(output_path)["num_samples"]
+
+    print(f"\nMerge complete: {output_path}")
     print(f"  Base samples:     {old_count:,}")
     print(f"  New samples:      {new_count:,}")
     print(f"  Final samples:    {final_count:,}")
@@ -56,15 +71,21 @@ def merge_datasets(base_path: str, new_path: str, output_path: str, max_samples:
 
 def main():
     parser = argparse.ArgumentParser(description="Merge datasets with rolling window")
-    parser.add_argument("--base", required=True, help="Base dataset (will be updated or created)")
-    parser.add_argument("--new", required=True, help="New dataset to merge")
-    parser.add_argument("--output", help="Output path (defaults to --base)")
+    parser.add_argument("--base", required=True, help="Base dataset directory (will be updated or created), or a JSON file")
+    parser.add_argument("--new", required=True, help="New dataset to merge (dataset directory or JSON file)")
+    parser.add_argument("--output", help="Output directory (defaults to --base, without .json for JSON files)")
     parser.add_argument("--max-samples", type=int, default=100000, help="Max samples to keep (default: 100000)")
-    
+    parser.add_argument("--shard-size", type=int, default=65536,
+                        help="Samples per shard for JSON inputs; the window is applied in whole shards")
+    parser.add_argument("--move", action="store_true", help="Move the new dataset's shards instead of copying them")
+
     args = parser.parse_args()
-    output = args.output or args.base
-    
-    merge_datasets(args.base, args.new, output, args.max_samples)
+    output = args.output
+    if output is None:
+        output = os.path.splitext(args.base)[0] if os.path.isfile(args.base) else args.base
+
+    merge_datasets(args.base, args.new, output, args.max_samples,
+                   shard_size=args.shard_size, move=args.move)
 
 
 if __name__ == "__main__":
@@ -5,15 +5,25 @@ Loads card data from hearthstone_data package.
 
 from __future__ import annotations
 
+import os
 from typing import Dict, Optional, List
 from hearthstone import cardxml
 from hearthstone.enums import CardType as HSCardType, Race as HSRace, Rarity as HSRarity
 
 from .enums import CardType, CardClass, Rarity, Race, SpellSchool, GameTag
 from .entities import CardData, Card, Minion, Spell, Weapon, Hero, HeroPower, Location
+from .card_snapshot import get_source_key, get_snapshot_path, read_snapshot, write_snapshot
 from card_generator.cache import EffectCache
 
 
+# Converted cards are snapshotted here so later processes skip the XML parse.
+# Override with HEARTHSTONE_CARDDB_CACHE; set it to an empty string to disable.
+DEFAULT_SNAPSHOT_DIR = os.environ.get(
+    'HEARTHSTONE_CARDDB_CACHE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cache'),
+)
+
+
 class CardDatabase:
     """Database of all cards loaded from hearthstone_data."""
     
@@ -22,6 +32,7 @@ class CardDatabase:
     _dbf_to_card: Dict[int, str] = {}  # DBF ID to card_id lookup
     _loaded: bool = False
     _cache: EffectCache = EffectCache()
+    snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR
     
     def __new__(cls) -> CardDatabase:
         if cls._instance is None:
@@ -37,10 +48,57 @@ class CardDatabase:
     
     @classmethod
     def load(cls) -> Dict[str, CardData]:
-        """Load all cards from hearthstone_data."""
+        """Load all cards from hearthstone_data.
+        
+        Reads the on-disk snapshot when it matches the installed card data,
+        otherwise parses CardDefs.xml and (re)writes the snapshot.
+        """
         if cls._loaded:
             return cls._cards
         
+        if cls.snapshot_dir:
+            if cls._load_snapshot():
+                cls._loaded = True
+                return cls._cards
+        
+        cls._load_xml()
+        
+        if cls.snapshot_dir:
+            cls._save_snapshot()
+        
+        cls._loaded = True
+        return cls._cards
+    
+    @classmethod
+    def _load_snapshot(cls) -> bool:
+        """Populate the database from the snapshot, if it is up to date."""
+        try:
+            path = get_snapshot_path(cls.snapshot_dir)
+            result = read_snapshot(path, get_source_key())
+        except Exception as e:
+            print(f"Error reading card snapshot: {e}")
+            return False
+        
+        if result is None:
+            return False
+        
+        cards, dbf_to_card = result
+        cls._cards.update(cards)
+        cls._dbf_to_card.update(dbf_to_card)
+        return True
+    
+    @classmethod
+    def _save_snapshot(cls) -> None:
+        """Write the converted cards to the snapshot (best effort)."""
+        try:
+            path = get_snapshot_path(cls.snapshot_dir)
+            write_snapshot(path, cls._cards, cls._dbf_to_card, get_source_key())
+        except Exception as e:
+            print(f"Error writing card snapshot: {e}")
+    
+    @classmethod
+    def _load_xml(cls) -> None:
+        """Parse CardDefs.xml and convert every card."""
         db, _ = cardxml.load()
         
         for card_id, card in db.items():
@@ -55,9 +113,6 @@ class CardDatabase:
             except Exception as e:
                 print(f"Error loading card {card_id}: {e}")
                 pass
-        
-        cls._loaded = True
-        return cls._cards
     
     @classmethod
     def _convert_card(cls, card) -> Optional[CardData]:
@@ -278,12 +333,6 @@ def create_card(card_id: str, game=None) -> Optional[Card]:
         card = Hero(data, game)
     elif data.card_type == CardType.HERO_POWER:
         card = HeroPower(data, game)
-        # Load hero power effect handler
-        if game:
-            from card_effects.hero_powers import get_hero_power_handler
-            handler = get_hero_power_handler(card_id)
-            if handler:
-                game._battlecry_handlers[card_id] = handler
     elif data.card_type == CardType.LOCATION:
         card = Location(data, game)
     else:
@@ -291,24 +340,48 @@ def create_card(card_id: str, game=None) -> Optional[Card]:
 
     # Load effects if game is provided
     if game:
-        effects = CardDatabase._cache.load_effect(card_id, data.card_set)
-        if effects:
-            if "battlecry" in effects:
-                game._battlecry_handlers[card_id] = effects["battlecry"]
-            if "deathrattle" in effects:
-                game._deathrattle_handlers[card_id] = effects["deathrattle"]
-            if "on_play" in effects:
-                # Spells use on_play for their logic
-                game._battlecry_handlers[card_id] = effects["on_play"]
-            if "setup" in effects:
-                # Setup is called immediately to register triggers
-                effects["setup"](game, card)
-            if "get_valid_targets" in effects:
-                game._target_handlers[card_id] = effects["get_valid_targets"]
+        load_card_effects(card, game)
                 
     return card
 
 
+def load_card_effects(card: Card, game, setup: bool = True) -> None:
+    """Register a card's effect handlers with a game.
+    
+    With setup, also registers its deck trigger and runs its effect setup
+    (which registers its triggers), as for a newly created card. Restoring
+    a serialized game registers the handlers of every card without setup,
+    then sets up only the cards that had triggers.
+    """
+    card_id = card.card_id
+    if card.data.card_type == CardType.HERO_POWER:
+        # Load hero power effect handler
+        from card_effects.hero_powers import get_hero_power_handler
+        handler = get_hero_power_handler(card_id)
+        if handler:
+            game._battlecry_handlers[card_id] = handler
+    
+    if setup:
+        deck_trigger = game._deck_trigger_handlers.get(card_id)
+        if deck_trigger:
+            game.register_deck_trigger(deck_trigger[0], card, deck_trigger[1])
+    
+    effects = CardDatabase._cache.load_effect(card_id, card.data.card_set)
+    if effects:
+        if "battlecry" in effects:
+            game._battlecry_handlers[card_id] = effects["battlecry"]
+        if "deathrattle" in effects:
+            game._deathrattle_handlers[card_id] = effects["deathrattle"]
+        if "on_play" in effects:
+            # Spells use on_play for their logic
+            game._battlecry_handlers[card_id] = effects["on_play"]
+        if setup and "setup" in effects:
+            # Setup is called immediately to register triggers
+            effects["setup"](game, card)
+        if "get_valid_targets" in effects:
+            game._target_handlers[card_id] = effects["get_valid_targets"]
+
+
 def create_deck(card_ids: List[str], game=None) -> List[Card]:
     """Create a deck from a list of card IDs."""
     deck = []
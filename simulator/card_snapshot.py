@@ -0,0 +1,163 @@
+"""Hearthstone Simulator - Card Database Snapshot.
+
+Columnar on-disk snapshot of the converted card database, so processes can
+skip parsing CardDefs.xml (and running _convert_card on every card) at startup.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+from array import array
+from dataclasses import fields
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple, Any
+
+from .entities import CardData
+
+
+# Bump whenever CardData's fields or CardDatabase._convert_card change,
+# so snapshots written by older code get rebuilt.
+SNAPSHOT_FORMAT = 1
+
+# Field layout, derived once from the CardData dataclass
+_FIELDS = fields(CardData)
+_FIELD_NAMES = [f.name for f in _FIELDS]
+_BOOL_FIELDS = [f.name for f in _FIELDS if isinstance(f.default, bool)]
+_ENUM_FIELDS = {f.name: type(f.default) for f in _FIELDS if isinstance(f.default, IntEnum)}
+_INT_FIELDS = [
+    f.name for f in _FIELDS
+    if isinstance(f.default, int) and not isinstance(f.default, (bool, IntEnum))
+]
+_STR_FIELDS = [f.name for f in _FIELDS if f.type in ('str', str)]
+
+
+def get_source_key() -> Tuple[Any, ...]:
+    """Identify the card data the snapshot was built from.
+
+    Combines the snapshot format with the hearthstone/hearthstone_data
+    versions and the CardDefs.xml size and mtime, so a data update (or a
+    locally replaced CardDefs.xml) triggers a rebuild.
+    """
+    import hearthstone
+    import hearthstone_data
+
+    path = hearthstone_data.get_carddefs_path()
+    st = os.stat(path)
+    return (
+        SNAPSHOT_FORMAT,
+        getattr(hearthstone_data, '__version__', ''),
+        getattr(hearthstone, '__version__', ''),
+        st.st_size,
+        st.st_mtime_ns,
+    )
+
+
+def get_snapshot_path(snapshot_dir: str) -> str:
+    """Get the snapshot file path for the installed hearthstone_data version."""
+    import hearthstone_data
+    version = getattr(hearthstone_data, '__version__', 'unknown')
+    return os.path.join(snapshot_dir, f"carddb-{version}.snapshot")
+
+
+def write_snapshot(path: str, cards: Dict[str, CardData], dbf_to_card: Dict[int, str],
+                   source_key: Tuple[Any, ...]) -> None:
+    """Write cards as columns: packed int32 arrays, one bitmask per card, string lists."""
+    values = list(cards.values())
+    card_dbf = {card_id: dbf_id for dbf_id, card_id in dbf_to_card.items()}
+
+    columns: Dict[str, Any] = {}
+    for name in _STR_FIELDS:
+        columns[name] = [getattr(c, name) for c in values]
+    for name in _INT_FIELDS:
+        columns[name] = array('i', (getattr(c, name) for c in values)).tobytes()
+    for name in _ENUM_FIELDS:
+        columns[name] = array('i', (int(getattr(c, name)) for c in values)).tobytes()
+    flags = array('Q', [0]) * len(values)
+    for i, c in enumerate(values):
+        mask = 0
+        for bit, name in enumerate(_BOOL_FIELDS):
+            if getattr(c, name):
+                mask |= 1 << bit
+        flags[i] = mask
+    columns['_flags'] = flags.tobytes()
+    columns['tags'] = [c.tags for c in values]
+    columns['_dbf_id'] = array('i', (card_dbf.get(c.card_id, 0) for c in values)).tobytes()
+
+    payload = {
+        'source': source_key,
+        'count': len(values),
+        'layout': (_STR_FIELDS, _INT_FIELDS, list(_ENUM_FIELDS), _BOOL_FIELDS),
+        'columns': columns,
+    }
+
+    # Write atomically: parallel workers may race to build the same snapshot
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_snapshot(path: str, source_key: Tuple[Any, ...]
+                  ) -> Optional[Tuple[Dict[str, CardData], Dict[int, str]]]:
+    """Read a snapshot, or None if it is missing or was built from other data."""
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'rb') as f:
+        payload = pickle.load(f)
+
+    if payload.get('source') != source_key:
+        return None
+    if payload.get('layout') != (_STR_FIELDS, _INT_FIELDS, list(_ENUM_FIELDS), _BOOL_FIELDS):
+        return None
+
+    count = payload['count']
+    columns = payload['columns']
+
+    def unpack(raw: bytes, typecode: str = 'i') -> List[int]:
+        arr = array(typecode)
+        arr.frombytes(raw)
+        return arr.tolist()
+
+    data: Dict[str, List[Any]] = {}
+    for name in _STR_FIELDS:
+        data[name] = columns[name]
+    for name in _INT_FIELDS:
+        data[name] = unpack(columns[name])
+    for name, enum_cls in _ENUM_FIELDS.items():
+        # Map through a small lookup table instead of calling the enum per card
+        raw = unpack(columns[name])
+        lookup = {v: enum_cls(v) for v in set(raw)}
+        data[name] = [lookup[v] for v in raw]
+    flags = unpack(columns['_flags'], 'Q')
+    for bit, name in enumerate(_BOOL_FIELDS):
+        data[name] = [bool(mask >> bit & 1) for mask in flags]
+    data['tags'] = columns['tags']
+
+    # Materialize CardData rows without going through the generated __init__
+    ordered = [data[name] for name in _FIELD_NAMES]
+    new = object.__new__
+    cards: Dict[str, CardData] = {}
+    for row in zip(*ordered):
+        card = new(CardData)
+        card.__dict__ = dict(zip(_FIELD_NAMES, row))
+        cards[card.card_id] = card
+
+    dbf_to_card: Dict[int, str] = {}
+    for card_id, dbf_id in zip(data['card_id'], unpack(columns['_dbf_id'])):
+        if dbf_id:
+            dbf_to_card[dbf_id] = card_id
+
+    if len(cards) != count:
+        return None
+    return cards, dbf_to_card
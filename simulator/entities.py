@@ -6,7 +6,7 @@ Defines all game entities: Cards, Minions, Heroes, Weapons, etc.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Callable, TYPE_CHECKING
+from typing import Optional, List, Dict, Any, Callable, Tuple, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 from .enums import Zone, CardType, CardClass, Rarity, Race, SpellSchool, GameTag
@@ -16,15 +16,18 @@ if TYPE_CHECKING:
     from .player import Player
 
 
-@dataclass
+@dataclass(frozen=True)
 class Enchantment:
-    """A buff or debuff applied to a card."""
+    """A buff or debuff applied to a card.
+
+    Enchantments are immutable records, so cloned cards share them.
+    """
     enchantment_id: str
     source_id: int  # Entity ID of source
     attack_bonus: int = 0
     health_bonus: int = 0
     cost_modifier: int = 0
-    keywords_added: List[str] = field(default_factory=list)
+    keywords_added: Tuple[str, ...] = ()
     one_turn_effect: bool = False  # If True, removed at end of turn
     
     # Store arbitrary data for complex effects (e.g. deathrattles given)
@@ -83,6 +86,35 @@ class CardData:
     tags: Dict[int, int] = field(default_factory=dict)
 
 
+# Attribute types copied one level deep when an entity is cloned; everything
+# else (ints, enums, CardData, Enchantment records) is immutable or rebound
+_CONTAINER_TYPES = frozenset((list, dict, set))
+
+# Card class -> (attribute count, container attributes) after __init__
+_CLONE_LAYOUTS: Dict[type, Tuple[int, Tuple[str, ...]]] = {}
+
+# Keyword -> bit in the keyword mask of a card's enchantment totals
+KEYWORD_BITS: Dict[str, int] = {
+    keyword: 1 << bit for bit, keyword in enumerate((
+        'TAUNT', 'DIVINE_SHIELD', 'CHARGE', 'WINDFURY', 'STEALTH',
+        'POISONOUS', 'LIFESTEAL', 'RUSH', 'REBORN', 'ECHO',
+    ))
+}
+_TAUNT = KEYWORD_BITS['TAUNT']
+_DIVINE_SHIELD = KEYWORD_BITS['DIVINE_SHIELD']
+_CHARGE = KEYWORD_BITS['CHARGE']
+_WINDFURY = KEYWORD_BITS['WINDFURY']
+_STEALTH = KEYWORD_BITS['STEALTH']
+_POISONOUS = KEYWORD_BITS['POISONOUS']
+_LIFESTEAL = KEYWORD_BITS['LIFESTEAL']
+_RUSH = KEYWORD_BITS['RUSH']
+_REBORN = KEYWORD_BITS['REBORN']
+_ECHO = KEYWORD_BITS['ECHO']
+
+# Enchantment totals of a card without enchantments
+_NO_ENCHANTMENTS = (0, 0, 0, 0)
+
+
 class Entity:
     """Base class for all game entities."""
     
@@ -100,6 +132,14 @@ class Entity:
         """Reset entity ID counter for new game."""
         cls._next_id = 1
     
+    def _copy_state(self) -> Dict[str, Any]:
+        """Copy instance attributes, with lists, dicts and sets copied one level deep."""
+        state = self.__dict__.copy()
+        for key, value in state.items():
+            if type(value) in _CONTAINER_TYPES:
+                state[key] = value.copy()
+        return state
+    
     def get_tag(self, tag: GameTag, default: int = 0) -> int:
         """Get a tag value."""
         return self.tags.get(tag.value, default)
@@ -131,9 +171,9 @@ class Card(Entity):
         self._durability: int = data.durability
         self._damage: int = 0
         
-        # Enchantments
+        # Enchantments, and their cached totals (None = recompute)
         self.enchantments: List[Enchantment] = []
-
+        self._enchant_totals: Optional[Tuple[int, int, int, int]] = _NO_ENCHANTMENTS
         
         # State flags
         self.exhausted: bool = False
@@ -156,42 +196,52 @@ class Card(Entity):
         self._reborn: bool = data.reborn
         self._echo: bool = getattr(data, 'echo', False)
     
-    @property
-    def cost(self) -> int:
-        """Calculate current cost with enchantments."""
-        val = self._cost
-        for enc in self.enchantments:
-            val += enc.cost_modifier
-        return max(0, val)
+    def _enchantment_totals(self) -> Tuple[int, int, int, int]:
+        """(cost, attack, health, keyword mask) summed over enchantments, cached.
+
+        The cache is dropped by add_enchantment, remove_enchantment,
+        expire_enchantments and silence, so stat and keyword reads are O(1).
+        """
+        totals = self._enchant_totals
+        if totals is None:
+            cost = attack = health = keywords = 0
+            for enc in self.enchantments:
+                cost += enc.cost_modifier
+                attack += enc.attack_bonus
+                health += enc.health_bonus
+                for keyword in enc.keywords_added:
+                    keywords |= KEYWORD_BITS.get(keyword.upper(), 0)
+            totals = self._enchant_totals = (cost, attack, health, keywords)
+        return totals
 
-    @property
-    def attack(self) -> int:
-        """Calculate current attack with enchantments."""
-        val = self._attack
-        for enc in self.enchantments:
-            val += enc.attack_bonus
-        return max(0, val)
-        
-    @property
-    def health(self) -> int:
-        """Calculate current health (max health) with enchantments."""
-        val = self._max_health
-        for enc in self.enchantments:
-            val += enc.health_bonus
-        return max(1, val)
-        
     @property
     def current_health(self) -> int:
         """Current health account for damage."""
-        return self.health - self._damage
+        return self.health
+
+    def _health_changed(self) -> None:
+        """Have the game check this card at the next death check."""
+        if self.game:
+            self.game.mark_health_changed(self)
 
     def add_enchantment(self, enchantment: Enchantment):
         """Add a buff/debuff."""
         self.enchantments.append(enchantment)
+        self._enchant_totals = None
+        self._health_changed()
         
     def remove_enchantment(self, enchantment_id: str):
         """Remove an enchantment by ID."""
         self.enchantments = [e for e in self.enchantments if e.enchantment_id != enchantment_id]
+        self._enchant_totals = None
+        self._health_changed()
+
+    def expire_enchantments(self) -> None:
+        """Remove one-turn enchantments (end of turn)."""
+        if any(e.one_turn_effect for e in self.enchantments):
+            self.enchantments = [e for e in self.enchantments if not e.one_turn_effect]
+            self._enchant_totals = None
+            self._health_changed()
 
     def has_keyword(self, keyword_attr: str) -> bool:
         """Check if card has keyword (native or enchanted)."""
@@ -199,80 +249,47 @@ class Card(Entity):
         if getattr(self, f"_{keyword_attr}", False):
             return True
         # 2. Enchantments
-        keyword_upper = keyword_attr.upper()
-        for enc in self.enchantments:
-            if keyword_upper in enc.keywords_added:
-                return True
-        return False
-
-    # Keyword getters using common helper
-    @property
-    def taunt(self) -> bool: return self.has_keyword('taunt')
-    @property
-    def divine_shield(self) -> bool: return self.has_keyword('divine_shield')
-    @property
-    def charge(self) -> bool: return self.has_keyword('charge')
-    @property
-    def windfury(self) -> bool: return self.has_keyword('windfury')
-    @property
-    def stealth(self) -> bool: return self.has_keyword('stealth')
-    @property
-    def poisonous(self) -> bool: return self.has_keyword('poisonous')
-    @property
-    def lifesteal(self) -> bool: return self.has_keyword('lifesteal')
-    @property
-    def rush(self) -> bool: return self.has_keyword('rush')
-    @property
-    def reborn(self) -> bool: return self.has_keyword('reborn')
-    @property
-    def echo(self) -> bool: return self.has_keyword('echo')
+        keywords = (self._enchant_totals or self._enchantment_totals())[3]
+        return bool(keywords & KEYWORD_BITS.get(keyword_attr.upper(), 0))
 
     def clone(self) -> 'Card':
-        """Create a deep copy of the card."""
-        # Create new instance of same class (Minion, Spell, etc.)
-        new_card = type(self)(self.data, None)
+        """Create a copy of the card, keeping its entity ID.
+
+        Skips __init__ and copies the instance state directly: CardData and
+        enchantment records are shared, lists and dicts (enchantments, tags,
+        effect-specific attributes) are copied one level deep. The copy is
+        unbound (no game or controller); Game.clone rebinds it.
+        """
+        cls = type(self)
+        layout = _CLONE_LAYOUTS.get(cls)
+        if layout is None:
+            layout = _CLONE_LAYOUTS[cls] = cls._init_layout()
+        attr_count, container_attrs = layout
         
-        # Copy dynamic stats
-        new_card._cost = self._cost
-        new_card._attack = self._attack
-        new_card._health = self._health
-        new_card._max_health = self._max_health
-        new_card._armor = self._armor
-        
-        # Copy enchantments manually since they are dataclasses
-        import copy
-        new_card.enchantments = copy.deepcopy(self.enchantments)
-
-        new_card._durability = self._durability
-        new_card._damage = self._damage
-        
-        # Copy states
-        new_card.zone = self.zone
-        new_card.zone_position = self.zone_position
-        new_card.exhausted = self.exhausted
-        new_card.attacks_this_turn = self.attacks_this_turn
-        new_card.frozen = self.frozen
-        new_card.silenced = self.silenced
-        new_card.immune = self.immune
-        new_card.cant_attack = self.cant_attack
-        new_card.cant_be_targeted = self.cant_be_targeted
-        
-        # Copy keywords
-        new_card._taunt = self._taunt
-        new_card._divine_shield = self._divine_shield
-        new_card._charge = self._charge
-        new_card._windfury = self._windfury
-        new_card._stealth = self._stealth
-        new_card._poisonous = self._poisonous
-        new_card._lifesteal = self._lifesteal
-        new_card._rush = self._rush
-        new_card._reborn = self._reborn
-        
-        # Copy tags
-        new_card.tags = self.tags.copy()
+        if len(self.__dict__) == attr_count:
+            # Only the attributes set by __init__: copy its known containers
+            state = self.__dict__.copy()
+            for key in container_attrs:
+                state[key] = state[key].copy()
+        else:
+            # Effects added attributes of their own: check every value
+            state = self._copy_state()
+        state['game'] = None
+        state['controller'] = None
         
+        new_card = object.__new__(cls)
+        new_card.__dict__ = state
         return new_card
     
+    @classmethod
+    def _init_layout(cls) -> Tuple[int, Tuple[str, ...]]:
+        """Attribute count and container attributes of a freshly built card."""
+        next_id = Entity._next_id
+        template = cls(CardData("TEMPLATE"))
+        Entity._next_id = next_id
+        state = template.__dict__
+        return len(state), tuple(k for k, v in state.items() if type(v) in _CONTAINER_TYPES)
+    
     @property
     def card_id(self) -> str:
         return self.data.card_id
@@ -285,38 +302,42 @@ class Card(Entity):
     def card_type(self) -> CardType:
         return self.data.card_type
     
+    # Stats include enchantments; the setters store the base value so that
+    # e.g. `minion.attack += 2` adds exactly 2 on top of any buffs
     @property
     def cost(self) -> int:
-        return max(0, self._cost)
+        return max(0, self._cost + (self._enchant_totals or self._enchantment_totals())[0])
     
     @cost.setter
     def cost(self, value: int) -> None:
-        self._cost = value
+        self._cost = value - (self._enchant_totals or self._enchantment_totals())[0]
     
     @property
     def attack(self) -> int:
-        return max(0, self._attack)
+        return max(0, self._attack + (self._enchant_totals or self._enchantment_totals())[1])
     
     @attack.setter
     def attack(self, value: int) -> None:
-        self._attack = value
+        self._attack = value - (self._enchant_totals or self._enchantment_totals())[1]
     
     @property
     def health(self) -> int:
-        return self._max_health - self._damage
+        return self._max_health + (self._enchant_totals or self._enchantment_totals())[2] - self._damage
     
     @health.setter
     def health(self, value: int) -> None:
-        self._max_health = value
-        self._damage = max(0, self._max_health - value)
+        self._max_health = value - (self._enchant_totals or self._enchantment_totals())[2]
+        self._damage = 0
+        self._health_changed()
     
     @property
     def max_health(self) -> int:
-        return self._max_health
+        return self._max_health + (self._enchant_totals or self._enchantment_totals())[2]
     
     @max_health.setter
     def max_health(self, value: int) -> None:
-        self._max_health = value
+        self._max_health = value - (self._enchant_totals or self._enchantment_totals())[2]
+        self._health_changed()
     
     @property
     def damage(self) -> int:
@@ -325,11 +346,13 @@ class Card(Entity):
     @damage.setter
     def damage(self, value: int) -> None:
         self._damage = max(0, value)
+        self._health_changed()
     
-    # Keyword properties (affected by silence)
+    # Keyword properties: native or enchanted, removed by silence
     @property
     def taunt(self) -> bool:
-        return self._taunt and not self.silenced
+        return (self._taunt or bool((self._enchant_totals or self._enchantment_totals())[3] & _TAUNT)) \
+            and not self.silenced
     
     @taunt.setter
     def taunt(self, value: bool) -> None:
@@ -337,7 +360,8 @@ class Card(Entity):
     
     @property
     def divine_shield(self) -> bool:
-        return self._divine_shield and not self.silenced
+        return (self._divine_shield or bool((self._enchant_totals or self._enchantment_totals())[3] & _DIVINE_SHIELD)) \
+            and not self.silenced
     
     @divine_shield.setter
     def divine_shield(self, value: bool) -> None:
@@ -345,7 +369,8 @@ class Card(Entity):
     
     @property
     def charge(self) -> bool:
-        return self._charge and not self.silenced
+        return (self._charge or bool((self._enchant_totals or self._enchantment_totals())[3] & _CHARGE)) \
+            and not self.silenced
     
     @charge.setter
     def charge(self, value: bool) -> None:
@@ -353,7 +378,8 @@ class Card(Entity):
     
     @property
     def windfury(self) -> bool:
-        return self._windfury and not self.silenced
+        return (self._windfury or bool((self._enchant_totals or self._enchantment_totals())[3] & _WINDFURY)) \
+            and not self.silenced
     
     @windfury.setter
     def windfury(self, value: bool) -> None:
@@ -361,7 +387,8 @@ class Card(Entity):
     
     @property
     def stealth(self) -> bool:
-        return self._stealth and not self.silenced
+        return (self._stealth or bool((self._enchant_totals or self._enchantment_totals())[3] & _STEALTH)) \
+            and not self.silenced
     
     @stealth.setter
     def stealth(self, value: bool) -> None:
@@ -369,7 +396,8 @@ class Card(Entity):
     
     @property
     def poisonous(self) -> bool:
-        return self._poisonous and not self.silenced
+        return (self._poisonous or bool((self._enchant_totals or self._enchantment_totals())[3] & _POISONOUS)) \
+            and not self.silenced
     
     @poisonous.setter
     def poisonous(self, value: bool) -> None:
@@ -377,7 +405,8 @@ class Card(Entity):
     
     @property
     def lifesteal(self) -> bool:
-        return self._lifesteal and not self.silenced
+        return (self._lifesteal or bool((self._enchant_totals or self._enchantment_totals())[3] & _LIFESTEAL)) \
+            and not self.silenced
     
     @lifesteal.setter
     def lifesteal(self, value: bool) -> None:
@@ -385,7 +414,8 @@ class Card(Entity):
     
     @property
     def rush(self) -> bool:
-        return self._rush and not self.silenced
+        return (self._rush or bool((self._enchant_totals or self._enchantment_totals())[3] & _RUSH)) \
+            and not self.silenced
     
     @rush.setter
     def rush(self, value: bool) -> None:
@@ -393,12 +423,22 @@ class Card(Entity):
     
     @property
     def reborn(self) -> bool:
-        return self._reborn and not self.silenced
-
+        return (self._reborn or bool((self._enchant_totals or self._enchantment_totals())[3] & _REBORN)) \
+            and not self.silenced
+    
     @reborn.setter
     def reborn(self, value: bool) -> None:
         self._reborn = value
     
+    @property
+    def echo(self) -> bool:
+        return (self._echo or bool((self._enchant_totals or self._enchantment_totals())[3] & _ECHO)) \
+            and not self.silenced
+    
+    @echo.setter
+    def echo(self, value: bool) -> None:
+        self._echo = value
+    
     def can_attack(self) -> bool:
         """Check if this entity can attack."""
         if self.cant_attack or self.frozen:
@@ -423,9 +463,12 @@ class Card(Entity):
         self._stealth = False
         self._poisonous = False
         self._lifesteal = False
-        # Restore health to base
+        # Remove buffs and restore health to base
+        self.enchantments = []
+        self._enchant_totals = _NO_ENCHANTMENTS
         self._max_health = self.data.health
         self._attack = self.data.attack
+        self._health_changed()
     
     def destroy(self) -> None:
         """Destroy this entity."""
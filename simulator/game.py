@@ -12,6 +12,30 @@ from dataclasses import dataclass, field
 from .enums import GamePhase, Step, Zone, CardType, PlayState, Mulligan, GameTag
 from .entities import Entity, Card, CardData, Minion, Spell, Weapon, Hero, HeroPower, Location
 from .player import Player
+from .handlers import HandlerTable
+from .triggers import TriggerRegistry
+
+try:
+    from card_effects.secrets import check_secrets
+except ImportError:
+    check_secrets = None
+
+
+# Process-wide (battlecry, deathrattle, deck trigger) handler tables, imported once
+_shared_handlers: Optional[Tuple[Any, Any, Any]] = None
+
+
+def _get_shared_handlers() -> Tuple[Any, Any, Any]:
+    """Get the shared Fireplace-ported handler tables (loaded on first call)."""
+    global _shared_handlers
+    if _shared_handlers is None:
+        try:
+            from card_effects.fireplace_registry import get_handler_tables
+            tables = get_handler_tables()
+            _shared_handlers = (tables.battlecry, tables.deathrattle, tables.deck_triggers)
+        except ImportError:
+            _shared_handlers = (None, None, None)
+    return _shared_handlers
 
 
 @dataclass
@@ -20,6 +44,31 @@ class GameConfig:
     max_turns: int = 89  # Turn 45 for each player
     max_actions_per_turn: int = 100
     starting_health: int = 30
+    # Diagnostics: off in the headless profile, never affect the rules
+    log_actions: bool = True  # Record play/attack/... entries in action_history
+    verbose: bool = True  # Print effect errors caught during triggers
+    
+    @classmethod
+    def headless(cls, **overrides) -> 'GameConfig':
+        """Profile for self-play and search: same rules, no logging or printing."""
+        overrides.setdefault('log_actions', False)
+        overrides.setdefault('verbose', False)
+        return cls(**overrides)
+
+
+# Events that board/hand triggers can register for
+TRIGGER_EVENTS = (
+    "on_turn_start",
+    "on_turn_end",
+    "on_minion_summon",
+    "on_minion_death",
+    "on_damage_taken",
+    "on_card_played",
+    "on_hero_power",
+)
+
+# Player card zones copied by Game.clone (the deck is shared, not copied)
+_CLONED_ZONES = ("hand", "board", "graveyard", "secrets", "setaside", "choices")
 
 
 class Game:
@@ -42,33 +91,27 @@ class Game:
         self.actions_this_turn: int = 0
         
         # Trigger system
-        self._triggers: Dict[str, List[Tuple[Entity, Callable]]] = {
-            "on_turn_start": [],
-            "on_turn_end": [],
-            "on_minion_summon": [],
-            "on_minion_death": [],
-            "on_damage_taken": [],
-            "on_card_played": [],
-            "on_hero_power": [],
-        }
-        
-        # Death processing
-        self._pending_deaths: List[Card] = []
+        self._triggers: TriggerRegistry = TriggerRegistry(TRIGGER_EVENTS)
+        
+        # Death processing: pending deaths are an ordered set (dict keys).
+        # Only minions whose health changed are checked for deaths, unless
+        # card effect code ran since the last check (effects may edit stats
+        # directly), in which case both boards are scanned once.
+        self._pending_deaths: Dict[Card, None] = {}
+        self._health_changed: set = set()
+        self._scan_boards: bool = False
         self._pending_deathrattles: List[Tuple[Card, Callable]] = []
         
-        # Effect handlers (to be populated by effect system)
-        self._battlecry_handlers: Dict[str, Callable] = {}
-        self._deathrattle_handlers: Dict[str, Callable] = {}
-        self._target_handlers: Dict[str, Callable] = {}
-        self._trigger_handlers: Dict[str, List[Callable]] = {}
-        self._aura_handlers: Dict[str, Callable] = {}
-        
-        # Register Fireplace-ported effects
-        try:
-            from card_effects.fireplace_registry import register_all_effects
-            register_all_effects(self)
-        except ImportError:
-            pass
+        # Effect handlers: Fireplace-ported effects are shared by reference,
+        # per-game registrations (create_card, hero powers) go to an overlay
+        battlecry_base, deathrattle_base, deck_trigger_base = _get_shared_handlers()
+        self._battlecry_handlers: HandlerTable = HandlerTable(battlecry_base)
+        self._deathrattle_handlers: HandlerTable = HandlerTable(deathrattle_base)
+        # card_id -> (event, handler) for cards that trigger from the deck
+        self._deck_trigger_handlers: HandlerTable = HandlerTable(deck_trigger_base)
+        self._target_handlers: HandlerTable = HandlerTable()
+        self._trigger_handlers: HandlerTable = HandlerTable()
+        self._aura_handlers: HandlerTable = HandlerTable()
         
         # Game log
         self.action_history: List[Dict[str, Any]] = []
@@ -77,122 +120,124 @@ class Game:
         self.pending_choices: Optional[Dict[str, Any]] = None
 
     def clone(self) -> 'Game':
-        """Create a deep copy of the game state for MCTS."""
-        import copy
-        
-        # 1. Create new empty game
-        new_game = Game(self.config)
-        new_game.phase = self.phase
-        new_game.step = self.step
-        new_game.turn = self.turn
-        new_game.actions_this_turn = self.actions_this_turn
-        new_game.current_player_idx = self.current_player_idx
-        
-        # 2. Clone Players
-        # (We need to maintain cross-references, so we create both first)
-        new_p1 = self.players[0].clone()
-        new_p2 = self.players[1].clone()
-        
-        new_p1.game = new_game
-        new_p2.game = new_game
-        
-        new_game.players = [new_p1, new_p2]
-        new_p1.opponent = new_p2
-        new_p2.opponent = new_p1  # Fix missing assignment
-        
-        # 3. Clone Entities and link them to new game/players
-        # Helper to clone a list of cards
-        def clone_card_list(source_list, owner):
-            new_list = []
-            for card in source_list:
+        """Create an independent copy of the game state for MCTS.
+
+        Structural copy: skips the constructor (no effect registration, and
+        the entity ID counter is left alone), copies each entity's state
+        directly while sharing CardData and enchantment records, shares the
+        handler tables copy-on-write, and shares each deck until one side
+        touches it (see Player.deck).
+        """
+        new_game = object.__new__(Game)
+        state = self.__dict__.copy()
+        for key, value in state.items():
+            if type(value) is list or type(value) is dict:
+                state[key] = value.copy()
+        new_game.__dict__ = state
+        
+        # Map old entities to their copies, to rebind cross references
+        entity_map: Dict[Entity, Entity] = {}
+        
+        def clone_card(card: Card, owner: Player) -> Card:
+            new_card = entity_map.get(card)
+            if new_card is None:
                 new_card = card.clone()
                 new_card.game = new_game
                 new_card.controller = owner
-                new_list.append(new_card)
-            return new_list
-
-        # P1 Assets
-        if self.players[0].hero:
-            new_p1.hero = self.players[0].hero.clone()
-            new_p1.hero.game = new_game
-            new_p1.hero.controller = new_p1
+                entity_map[card] = new_card
+            return new_card
+        
+        new_players = []
+        for player in self.players:
+            new_player = player.clone()
+            new_player.game = new_game
+            entity_map[player] = new_player
             
-        if self.players[0].hero_power:
-            new_p1.hero_power = self.players[0].hero_power.clone()
-            new_p1.hero_power.game = new_game
-            new_p1.hero_power.controller = new_p1
+            if player.hero:
+                hero = clone_card(player.hero, new_player)
+                if hero.weapon:
+                    hero.weapon = clone_card(hero.weapon, new_player)
+                if hero.hero_power:
+                    hero.hero_power = clone_card(hero.hero_power, new_player)
+                new_player.hero = hero
+            
+            for zone in _CLONED_ZONES:
+                setattr(new_player, zone, [clone_card(c, new_player) for c in getattr(player, zone)])
+            
+            # Share the deck; both sides copy it on first access
+            new_player._deck = player._deck
+            new_player._deck_shared = True
+            player._deck_shared = True
+            new_players.append(new_player)
+        
+        new_game.players = new_players
+        if len(new_players) == 2:
+            new_players[0].opponent = new_players[1]
+            new_players[1].opponent = new_players[0]
+        
+        # Triggers: the callbacks receive their source as an argument, so
+        # only the source needs rebinding. Deck cards keep their shared
+        # instance until the deck is unshared; triggers of entities that
+        # are gone (e.g. dead minions) are dropped.
+        deck_cards = set()
+        if self._triggers:
+            for player in self.players:
+                deck_cards.update(player._deck)
+        new_game._triggers = self._triggers.copy(entity_map, deck_cards)
+        
+        new_game._pending_deaths = {entity_map[c]: None for c in self._pending_deaths if c in entity_map}
+        new_game._health_changed = {entity_map[c] for c in self._health_changed if c in entity_map}
+        new_game._pending_deathrattles = [
+            (entity_map[c], callback) for c, callback in self._pending_deathrattles if c in entity_map
+        ]
+        if self.pending_choices:
+            choices = dict(self.pending_choices)
+            choices["player"] = entity_map.get(choices.get("player"), choices.get("player"))
+            choices["options"] = [entity_map.get(c, c) for c in choices.get("options", [])]
+            new_game.pending_choices = choices
+        
+        # Handlers are stateless: share the tables copy-on-write
+        new_game._battlecry_handlers = self._battlecry_handlers.copy()
+        new_game._deathrattle_handlers = self._deathrattle_handlers.copy()
+        new_game._deck_trigger_handlers = self._deck_trigger_handlers.copy()
+        new_game._target_handlers = self._target_handlers.copy()
+        new_game._trigger_handlers = self._trigger_handlers.copy()
+        new_game._aura_handlers = self._aura_handlers.copy()
+        
+        return new_game
+    
+    def to_bytes(self) -> bytes:
+        """Encode the game state into a compact, versioned buffer.
 
-        new_p1.deck = clone_card_list(self.players[0].deck, new_p1)
-        new_p1.hand = clone_card_list(self.players[0].hand, new_p1)
-        new_p1.board = clone_card_list(self.players[0].board, new_p1)
-        new_p1.graveyard = clone_card_list(self.players[0].graveyard, new_p1)
-        
-        # P2 Assets
-        if self.players[1].hero:
-            new_p2.hero = self.players[1].hero.clone()
-            new_p2.hero.game = new_game
-            new_p2.hero.controller = new_p2
+        Stores players, zones, card IDs, dynamic stats, enchantments and
+        registered triggers (as source card + event), not the callbacks or
+        handler tables, so the buffer is small and loads in any process with
+        the same card data. A game waiting on a choice or on deathrattles
+        cannot be encoded (ValueError).
+        """
+        from .serialization import game_to_bytes
+        return game_to_bytes(self)
 
-        if self.players[1].hero_power:
-            new_p2.hero_power = self.players[1].hero_power.clone()
-            new_p2.hero_power.game = new_game
-            new_p2.hero_power.controller = new_p2
+    @classmethod
+    def from_bytes(cls, data: bytes, config: Optional[GameConfig] = None) -> 'Game':
+        """Rebuild a game encoded by to_bytes.
 
-        new_p2.deck = clone_card_list(self.players[1].deck, new_p2)
-        new_p2.hand = clone_card_list(self.players[1].hand, new_p2)
-        new_p2.board = clone_card_list(self.players[1].board, new_p2)
-        new_p2.graveyard = clone_card_list(self.players[1].graveyard, new_p2)
-        
-        # 4. Handlers (Shallow copy is mostly fine for function references, 
-        # BUT triggers might bind to old entity instances via closure?)
-        # For MCTS, we might lose dynamic triggers if we don't re-register them.
-        # Ideally, cards re-register their triggers on 'setup' or we copy the internal trigger list mapping old entities to new ones.
-        # Complex Trigger Cloning Strategy:
-        # The `_triggers` dict maps {event: [(entity, callback), ...]}
-        # We need to map old_entity -> new_entity in this list.
-        
-        # Map IDs to new entities for lookup
-        # Problem: Entities might share IDs (copies). We rely on object identity in logic usually?
-        # Actually our engine uses object references.
-        # We need a mapping: old_entity_obj -> new_entity_obj
-        
-        entity_map = {}
-        # Populate map
-        def map_entities(p_old, p_new):
-            if p_old.hero: entity_map[p_old.hero] = p_new.hero
-            if p_old.hero_power: entity_map[p_old.hero_power] = p_new.hero_power
-            for i in range(len(p_old.deck)): entity_map[p_old.deck[i]] = p_new.deck[i]
-            for i in range(len(p_old.hand)): entity_map[p_old.hand[i]] = p_new.hand[i]
-            for i in range(len(p_old.board)): entity_map[p_old.board[i]] = p_new.board[i]
-            for i in range(len(p_old.graveyard)): entity_map[p_old.graveyard[i]] = p_new.graveyard[i]
+        Handlers are re-registered and triggers rebuilt by re-running the
+        effect setup of their source cards. Raises ValueError for buffers
+        that are not a serialized game or use another format version.
+        Buffers cannot run code, but can set any entity state: only load
+        them from trusted sources.
 
-        map_entities(self.players[0], new_p1)
-        map_entities(self.players[1], new_p2)
-        
-        # Rebuild Triggers
-        # Warning: The 'callback' itself might be a closure capturing the OLD entity (e.g. "def on_end(game, trig_src=OLD_SOURCE)...").
-        # If we just copy the callback, it will run using the OLD entity constant.
-        # However, most of our auto-generated triggers use `trig_src` passed as argument!
-        # `callback(game, source, ...)` -> `source` is passed by the trigger system loop.
-        # So as long as we update the `source` in the `_triggers` list, the callback will receive the NEW source.
-        # Perfect!
-        
-        new_game._triggers = {k: [] for k in self._triggers}
-        for event, listeners in self._triggers.items():
-            for old_source, cb in listeners:
-                if old_source in entity_map:
-                    new_source = entity_map[old_source]
-                    new_game._triggers[event].append((new_source, cb))
-                else:
-                    # Source might be dead or not tracked? Or Hero?
-                    # If not found, skip (probably dead)
-                    pass
+        Args:
+            data: Buffer from to_bytes
+            config: Config of the rebuilt game (default: the encoded one)
+        """
+        from .serialization import game_from_bytes
+        return game_from_bytes(data, config)
 
-        # Copy static handlers
-        new_game._battlecry_handlers = self._battlecry_handlers # Stateless
-        new_game._deathrattle_handlers = self._deathrattle_handlers # Stateless
-        
-        return new_game
+    def _rebind_triggers(self, entity_map: Dict[Entity, Entity]) -> None:
+        """Point triggers registered by replaced entities at their replacements."""
+        self._triggers.rebind(entity_map)
     
     def start_discover(self, player: Player, options: List[Card], callback: Callable) -> None:
         """Pause game and wait for player to choose one of 3 cards."""
@@ -216,6 +261,7 @@ class Game:
                 callback(self, choice)
             except Exception:
                 pass  # Ignore callback errors in self-play
+            self._scan_boards = True
     
     def choose_discover(self, choice_idx: int) -> bool:
         """Resolve a pending discover choice."""
@@ -231,6 +277,7 @@ class Game:
         self.pending_choices = None  # Clear before callback to avoid loops
         
         callback(self, choice)
+        self._scan_boards = True
         
         # Process deaths after effect
         self.process_deaths()
@@ -239,62 +286,63 @@ class Game:
 
     def register_trigger(self, event_name: str, source: Entity, callback: Callable) -> None:
         """Register a trigger callback."""
-        if event_name in self._triggers:
-            self._triggers[event_name].append((source, callback))
+        self._triggers.register(event_name, source, callback)
+    
+    def register_deck_trigger(self, event_name: str, source: Card, callback: Callable) -> None:
+        """Register a callback that fires while its source is in a deck (e.g. Patches)."""
+        self._triggers.register_deck(event_name, source, callback)
     
     def unregister_triggers(self, source: Entity) -> None:
         """Remove all triggers for a specific source."""
-        for event_name in self._triggers:
-            self._triggers[event_name] = [t for t in self._triggers[event_name] if t[0] != source]
+        self._triggers.unregister(source)
 
     def fire_event(self, event_name: str, *args, **kwargs) -> None:
         """Execute all callbacks for an event."""
-        
-        # 1. Triggers (Observers)
-        if event_name in self._triggers:
-            # Filter out triggers whose source is no longer in play
-            # (unless it's a graveyard trigger or on_death)
-            valid_triggers = []
-            for source, callback in self._triggers[event_name]:
-                if source.zone == Zone.PLAY or source.zone == Zone.HAND or isinstance(source, Hero):
-                    valid_triggers.append((source, callback))
-                elif event_name == "on_minion_death": # Keep on_minion_death triggers valid even if source dying
-                     valid_triggers.append((source, callback))
-
-            # Update triggers list (remove dead triggers)
-            self._triggers[event_name] = valid_triggers
-            
-            # Execute callbacks
-            for source, callback in valid_triggers:
+        triggers = self._triggers
+        triggers.fire_counts[event_name] += 1
+        
+        # 1. Triggers (Observers). Triggers whose source is no longer in
+        # play or hand are dropped (on_minion_death ones stay valid while
+        # their source is dying)
+        listeners = triggers.active(event_name)
+        if listeners:
+            triggers.call_counts[event_name] += len(listeners)
+            self._scan_boards = True
+            for source, callback in listeners:
                 try:
                     callback(self, source, *args, **kwargs)
                 except Exception as e:
-                    print(f"CRITICAL ERROR executing trigger '{event_name}' for {source.name} ({source.card_id}): {e}")
                     # Don't crash game for one effect failure
-                    pass
+                    if self.config.verbose:
+                        print(f"CRITICAL ERROR executing trigger '{event_name}' for {source.name} ({source.card_id}): {e}")
 
         # 2. Deck Triggers (e.g. Patches)
         self.check_deck_triggers(event_name, *args, **kwargs)
 
     def check_deck_triggers(self, event_name: str, *args, **kwargs) -> None:
-        """Check for triggers from cards in decks (e.g. Patches)."""
-        if event_name not in ["on_after_card_played"]:
+        """Run triggers registered for cards in decks (e.g. Patches)."""
+        listeners = self._triggers.active_in_deck(event_name)
+        if not listeners:
             return
-            
-        DECK_TRIGGER_CARDS = {
-            "CFM_637": "on_after_card_played", # Patches
-        }
-        
+        # A deck still shared with a clone holds cards bound to another game:
+        # take private copies first (rebinding the listeners to them), so each
+        # callback sees a card of this game in its own controller's deck
+        sources = {source for source, _ in listeners}
+        unshared = False
         for player in self.players:
-            # Quick check if player has any potential deck triggers
-            for card in player.deck:
-                if card.card_id in DECK_TRIGGER_CARDS:
-                    expected_event = DECK_TRIGGER_CARDS[card.card_id]
-                    if event_name == expected_event:
-                        # Look up handler in _trigger_handlers
-                        if card.card_id in self._trigger_handlers:
-                             for handler in self._trigger_handlers[card.card_id]:
-                                 handler(self, card, *args, **kwargs)
+            if player._deck_shared and not sources.isdisjoint(player._deck):
+                player._unshare_deck()
+                unshared = True
+        if unshared:
+            listeners = self._triggers.active_in_deck(event_name)
+        self._triggers.call_counts[event_name] += len(listeners)
+        self._scan_boards = True
+        for source, callback in listeners:
+            try:
+                callback(self, source, *args, **kwargs)
+            except Exception as e:
+                if self.config.verbose:
+                    print(f"CRITICAL ERROR executing deck trigger '{event_name}' for {source.name} ({source.card_id}): {e}")
 
     @property
     def current_player(self) -> Player:
@@ -306,6 +354,13 @@ class Game:
         """Get the opponent of the current player."""
         return self.players[1 - self.current_player_idx]
     
+    def _secrets_listen(self, event: str) -> bool:
+        """Whether a secret of the opponent of the current player triggers on an event."""
+        if check_secrets is None:
+            return False
+        opponent = self.players[self.current_player_idx].opponent
+        return opponent is not None and opponent.has_secret_for(event)
+    
     def get_opponent(self, player: Player) -> Player:
         """Get the opponent of a specific player."""
         return player.opponent
@@ -421,12 +476,9 @@ class Game:
                 all_entities.append(player.weapon)
                 
         for entity in all_entities:
-            if hasattr(entity, 'enchantments'):
+            if entity.enchantments:
                 # Filter out expired enchantments
-                entity.enchantments = [
-                    e for e in entity.enchantments 
-                    if not e.one_turn_effect
-                ]
+                entity.expire_enchantments()
         
         # Process any pending deaths
         self.process_deaths()
@@ -478,34 +530,31 @@ class Game:
         player.remove_from_hand(card)
         
         # Log action
-        self._log_action("play_card", {
-            "card": card.card_id,
-            "target": target.card_id if target else None,
-            "position": position
-        })
+        if self.config.log_actions:
+            self._log_action("play_card", {
+                "card": card.card_id,
+                "target": target.card_id if target else None,
+                "position": position
+            })
         
         player.cards_played_this_turn += 1
         player.cards_played_this_game.append(card.card_id)
         self.fire_event("on_card_played", card, target)
         
         # === SECRET CHECK: SPELLS ===
-        if card.card_type == CardType.SPELL:
-            try:
-                from card_effects.secrets import check_secrets
-                event_data = {'card': card, 'target': target, 'countered': False}
-                
-                # Check for Counterspell (on_spell_played)
-                check_secrets(self, "on_spell_played", event_data)
-                
-                if event_data['countered']:
-                    # Spell was countered - move to graveyard but do NOT trigger effects
-                    player.spells_played_this_game.append(card.card_id)
-                    player.spells_played_this_turn += 1
-                    card.zone = Zone.GRAVEYARD
-                    player.graveyard.append(card)
-                    return True
-            except ImportError:
-                pass
+        if card.card_type == CardType.SPELL and self._secrets_listen("on_spell_played"):
+            event_data = {'card': card, 'target': target, 'countered': False}
+            
+            # Check for Counterspell (on_spell_played)
+            check_secrets(self, "on_spell_played", event_data)
+            
+            if event_data['countered']:
+                # Spell was countered - move to graveyard but do NOT trigger effects
+                player.spells_played_this_game.append(card.card_id)
+                player.spells_played_this_turn += 1
+                card.zone = Zone.GRAVEYARD
+                player.graveyard.append(card)
+                return True
         
         success = False
         
@@ -545,12 +594,8 @@ class Game:
         self.fire_event("on_minion_summon", minion)
         
         # Check for Mirror Entity, Snipe, etc (on_minion_played)
-        try:
-            from card_effects.secrets import check_secrets
-            event_data = {'card': minion}
-            check_secrets(self, "on_minion_played", event_data)
-        except ImportError:
-            pass
+        if self._secrets_listen("on_minion_played"):
+            check_secrets(self, "on_minion_played", {'card': minion})
         
         # Trigger battlecry
         if card.data.battlecry:
@@ -567,8 +612,10 @@ class Game:
         player = self.current_player
         
         # Trigger spell effect
-        if card.card_id in self._battlecry_handlers:
-            self._battlecry_handlers[card.card_id](self, card, target)
+        handler = self._battlecry_handlers.get(card.card_id)
+        if handler:
+            handler(self, card, target)
+            self._scan_boards = True
         
         # Move to graveyard
         card.zone = Zone.GRAVEYARD
@@ -615,24 +662,21 @@ class Game:
         # === SECRET CHECK: ATTACK ===
         # Trigger 'on_hero_attacked' or 'on_minion_attack'
         # Secrets triggers might change the target (Noble Sacrifice)
-        try:
-            from card_effects.secrets import check_secrets
+        trigger_type = "on_hero_attacked" if defender.card_type == CardType.HERO else "on_minion_attack"
+        if self._secrets_listen(trigger_type):
             event_data = {'attacker': attacker, 'target': defender, 'new_target': None}
-            
-            trigger_type = "on_hero_attacked" if defender.card_type == CardType.HERO else "on_minion_attack"
             check_secrets(self, trigger_type, event_data)
             
             # Update target if changed (Noble Sacrifice)
             if event_data['new_target']:
                 defender = event_data['new_target']
-        except ImportError:
-            pass
         
         # Log action
-        self._log_action("attack", {
-            "attacker": attacker.card_id,
-            "defender": defender.card_id
-        })
+        if self.config.log_actions:
+            self._log_action("attack", {
+                "attacker": attacker.card_id,
+                "defender": defender.card_id
+            })
         
         # Remove stealth
         if attacker.stealth:
@@ -683,20 +727,17 @@ class Game:
         # Deal damage
         if isinstance(target, Hero):
             # Check for Ice Block (on_fatal_damage)
-            if target.health - amount <= 0:
-                try:
-                    from card_effects.secrets import check_secrets
-                    event_data = {'damage': amount, 'prevented': False}
-                    check_secrets(self, "on_fatal_damage", event_data)
-                    if event_data['prevented']:
-                        return 0
-                except ImportError:
-                    pass
+            if target.health - amount <= 0 and self._secrets_listen("on_fatal_damage"):
+                event_data = {'damage': amount, 'prevented': False}
+                check_secrets(self, "on_fatal_damage", event_data)
+                if event_data['prevented']:
+                    return 0
             
             actual_damage = target.take_damage(amount)
         else:
             target._damage += amount
             actual_damage = amount
+            self._health_changed.add(target)
         
         if actual_damage > 0:
             if isinstance(target, Hero) and target.controller:
@@ -791,25 +832,43 @@ class Game:
     
     def destroy(self, entity: Card) -> None:
         """Mark an entity for destruction."""
-        if entity not in self._pending_deaths:
-            self._pending_deaths.append(entity)
+        self._pending_deaths[entity] = None
+    
+    def mark_health_changed(self, entity: Card) -> None:
+        """Have the next process_deaths check this entity's health."""
+        self._health_changed.add(entity)
+    
+    def _collect_deaths(self) -> None:
+        """Add dead board minions to the pending deaths, in board order."""
+        if self._scan_boards:
+            candidates = None
+        elif self._health_changed:
+            candidates = self._health_changed
+            if not any(entity.is_dead() for entity in candidates):
+                self._health_changed = set()
+                return
+        else:
+            return
+        self._scan_boards = False
+        self._health_changed = set()
+        
+        pending = self._pending_deaths
+        for player in self.players:
+            for minion in player.board:
+                if (candidates is None or minion in candidates) and minion.is_dead() \
+                        and minion not in pending:
+                    pending[minion] = None
     
     def process_deaths(self) -> None:
         """Process all pending deaths."""
-        while self._pending_deaths or any(
-            m.is_dead() for p in self.players for m in p.board
-        ):
+        while True:
             # Check for new deaths
-            for player in self.players:
-                for minion in player.board[:]:
-                    if minion.is_dead() and minion not in self._pending_deaths:
-                        self._pending_deaths.append(minion)
-            
+            self._collect_deaths()
             if not self._pending_deaths:
                 break
             
             # Process deaths in order
-            deaths = self._pending_deaths[:]
+            deaths = list(self._pending_deaths)
             self._pending_deaths.clear()
             
             for entity in deaths:
@@ -834,13 +893,17 @@ class Game:
     
     def _trigger_battlecry(self, minion: Card, target: Optional[Card]) -> None:
         """Trigger a battlecry effect."""
-        if minion.card_id in self._battlecry_handlers:
-            self._battlecry_handlers[minion.card_id](self, minion, target)
+        handler = self._battlecry_handlers.get(minion.card_id)
+        if handler:
+            handler(self, minion, target)
+            self._scan_boards = True
     
     def _trigger_deathrattle(self, minion: Card) -> None:
         """Trigger a deathrattle effect."""
-        if minion.card_id in self._deathrattle_handlers:
-            self._deathrattle_handlers[minion.card_id](self, minion)
+        handler = self._deathrattle_handlers.get(minion.card_id)
+        if handler:
+            handler(self, minion)
+            self._scan_boards = True
     
     def _handle_reborn(self, minion: Card) -> None:
         """Handle reborn mechanic."""
@@ -885,13 +948,16 @@ class Game:
         hero_power.used_this_turn = True
         
         # Log action
-        self._log_action("hero_power", {
-            "target": target.card_id if target else None
-        })
+        if self.config.log_actions:
+            self._log_action("hero_power", {
+                "target": target.card_id if target else None
+            })
         
         # Trigger effect
-        if hero_power.card_id in self._battlecry_handlers:
-            self._battlecry_handlers[hero_power.card_id](self, hero_power, target)
+        handler = self._battlecry_handlers.get(hero_power.card_id)
+        if handler:
+            handler(self, hero_power, target)
+            self._scan_boards = True
         
         # Process deaths
         self.process_deaths()
@@ -912,17 +978,20 @@ class Game:
             return False
         
         # Log action
-        self._log_action("use_location", {
-            "location": location.card_id,
-            "target": target.card_id if target else None
-        })
+        if self.config.log_actions:
+            self._log_action("use_location", {
+                "location": location.card_id,
+                "target": target.card_id if target else None
+            })
         
         # Use the location (sets cooldown and reduces durability)
         location.use()
         
         # Trigger effect
-        if location.card_id in self._battlecry_handlers:
-            self._battlecry_handlers[location.card_id](self, location, target)
+        handler = self._battlecry_handlers.get(location.card_id)
+        if handler:
+            handler(self, location, target)
+            self._scan_boards = True
         
         # Process deaths
         self.process_deaths()
@@ -989,7 +1058,7 @@ class Game:
                     "mana": p.mana,
                     "mana_crystals": p.mana_crystals,
                     "hand_size": len(p.hand),
-                    "deck_size": len(p.deck),
+                    "deck_size": p.deck_size,
                     "board": [
                         {"name": m.name, "attack": m.attack, "health": m.health}
                         for m in p.board
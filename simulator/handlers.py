@@ -0,0 +1,108 @@
+"""Hearthstone Simulator - Effect Handler Tables.
+
+Per-game view over the process-wide effect handler tables.
+"""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+
+_EMPTY: Mapping[str, Callable] = MappingProxyType({})
+
+
+class HandlerTable:
+    """Copy-on-write overlay of per-game handlers over a shared base table.
+
+    Reads fall through to ``base``, which is shared by reference between every
+    Game and never mutated. Writes (e.g. effects loaded by ``create_card``) go
+    to a private overlay dict, so building or cloning a Game costs nothing for
+    handler setup. ``copy()`` shares the overlay too; whichever side writes
+    first takes its own copy.
+    """
+
+    __slots__ = ('_base', '_local', '_owned')
+
+    def __init__(self, base: Optional[Mapping[str, Callable]] = None):
+        self._base: Mapping[str, Callable] = base if base is not None else _EMPTY
+        self._local: Optional[Dict[str, Callable]] = None
+        self._owned: bool = False
+
+    @property
+    def base(self) -> Mapping[str, Callable]:
+        """The shared (read-only) table underneath the overlay."""
+        return self._base
+
+    def rebase(self, base: Mapping[str, Callable]) -> None:
+        """Swap the shared table, keeping per-game overrides."""
+        self._base = base
+
+    def _writable(self) -> Dict[str, Callable]:
+        if not self._owned:
+            self._local = dict(self._local) if self._local else {}
+            self._owned = True
+        return self._local
+
+    def __contains__(self, card_id: object) -> bool:
+        local = self._local
+        if local is not None and card_id in local:
+            return True
+        return card_id in self._base
+
+    def __getitem__(self, card_id: str) -> Callable:
+        local = self._local
+        if local is not None and card_id in local:
+            return local[card_id]
+        return self._base[card_id]
+
+    def get(self, card_id: str, default: Optional[Callable] = None) -> Optional[Callable]:
+        local = self._local
+        if local is not None and card_id in local:
+            return local[card_id]
+        return self._base.get(card_id, default)
+
+    def __setitem__(self, card_id: str, handler: Callable) -> None:
+        self._writable()[card_id] = handler
+
+    def __delitem__(self, card_id: str) -> None:
+        # Only overrides can be removed; the shared table is immutable.
+        if self._local is None or card_id not in self._local:
+            raise KeyError(card_id)
+        del self._writable()[card_id]
+
+    def __iter__(self) -> Iterator[str]:
+        local = self._local or {}
+        yield from local
+        for card_id in self._base:
+            if card_id not in local:
+                yield card_id
+
+    def __len__(self) -> int:
+        local = self._local
+        if not local:
+            return len(self._base)
+        return len(self._base) + sum(1 for k in local if k not in self._base)
+
+    def keys(self):
+        return list(iter(self))
+
+    def items(self):
+        return [(k, self[k]) for k in self]
+
+    @property
+    def overrides(self) -> Mapping[str, Callable]:
+        """Per-game handlers layered over the shared table."""
+        return MappingProxyType(self._local or {})
+
+    def copy(self) -> 'HandlerTable':
+        """Return an O(1) copy sharing both the base table and the overlay."""
+        new_table = HandlerTable(self._base)
+        if self._local:
+            new_table._local = self._local
+            # Both sides now share the overlay; the next writer copies it.
+            self._owned = False
+        return new_table
+
+    def __repr__(self) -> str:
+        return f"<HandlerTable shared={len(self._base)} overrides={len(self._local or ())}>"
@@ -7,11 +7,16 @@ from __future__ import annotations
 
 import random
 from dataclasses import dataclass, field
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Dict, TYPE_CHECKING
 
 from .enums import Zone, PlayState, Mulligan, CardType
 from .entities import Entity, Card, Hero, HeroPower, Weapon, Minion
 
+try:
+    from card_effects.secrets import SECRET_TRIGGERS
+except ImportError:
+    SECRET_TRIGGERS = {}
+
 if TYPE_CHECKING:
     from .game import Game
 
@@ -33,14 +38,17 @@ class Player(Entity):
         # Hero
         self.hero: Optional[Hero] = None
         
-        # Zones
-        self.deck: List[Card] = []
+        # Zones (the deck may be shared with clones of the game, see `deck`)
+        self._deck: List[Card] = []
+        self._deck_shared: bool = False
         self.hand: List[Card] = []
         self.board: List[Minion] = []
         self.graveyard: List[Card] = []
         self.setaside: List[Card] = [] # For Discover options, created cards, etc.
         self.choices: List[Card] = [] # Subset of setaside specifically for current choices
         self.secrets: List[Card] = []
+        # Number of secrets listening to each trigger event (see add_secret)
+        self.secret_triggers: Dict[str, int] = {}
         
         # Mana
         self.mana_crystals: int = 0
@@ -67,40 +75,62 @@ class Player(Entity):
         self.spells_played_last_turn: int = 0
 
     def clone(self) -> 'Player':
-        """Create a deep copy of the player (excluding entities managed by Game.clone)."""
-        new_player = Player(self.name, None)
-        # Stats
-        new_player.mana_crystals = self.mana_crystals
-        new_player.mana = self.mana
-        new_player.overload = self.overload
-        new_player.overload_next_turn = self.overload_next_turn
-        new_player.temp_mana = self.temp_mana
-        new_player.play_state = self.play_state
-        new_player.mulligan_state = self.mulligan_state
-        new_player.fatigue_counter = self.fatigue_counter
-        
-        # History (Lists of strings/ints are safe to shallow copy if we create new list)
-        new_player.cards_played_this_game = list(self.cards_played_this_game)
-        new_player.spells_played_this_game = list(self.spells_played_this_game)
-        new_player.minions_played_this_game_list = list(self.minions_played_this_game_list)
-        new_player.dead_minions = list(self.dead_minions)
-        new_player.cards_drawn_this_game = list(self.cards_drawn_this_game)
-        
-        # Custom attribs (like corpses, rafaams_played)
-        # We should define a way to copy dynamic attributes.
-        # For now, just copy specific known ones or __dict__?
-        # __dict__ copy is safer for dynamic attributes
-        for k, v in self.__dict__.items():
-            if k not in ['hero', 'hero_power', 'deck', 'hand', 'board', 'graveyard', 'secrets', 'game', 'opponent', '_game']:
-                if isinstance(v, (int, str, bool, float)) or v is None:
-                    setattr(new_player, k, v)
-                elif isinstance(v, list) and (not v or isinstance(v[0], (int, str))):
-                     setattr(new_player, k, list(v))
-                elif isinstance(v, set):
-                     setattr(new_player, k, set(v))
-                     
+        """Create a copy of the player (excluding entities managed by Game.clone).
+
+        Scalar state is copied directly and history trackers (and any dynamic
+        list, dict or set attributes, like corpses or rafaams_played) are
+        copied one level deep.
+        """
+        new_player = object.__new__(Player)
+        new_player.__dict__ = self._copy_state()
         return new_player
     
+    @property
+    def deck(self) -> List[Card]:
+        """Cards in the deck.
+
+        After Game.clone the deck list and its cards are shared between the
+        original and the copy, since most simulated actions never touch the
+        deck. Whichever side reads it first through this property takes a
+        private copy of the cards.
+        """
+        if self._deck_shared:
+            self._unshare_deck()
+        return self._deck
+    
+    @deck.setter
+    def deck(self, cards: List[Card]) -> None:
+        self._deck = cards
+        self._deck_shared = False
+    
+    @property
+    def deck_size(self) -> int:
+        """Number of cards in the deck (never unshares it)."""
+        return len(self._deck)
+    
+    def peek_deck(self) -> List[Card]:
+        """Deck cards for read-only inspection, without unsharing the deck.
+
+        The cards may belong to other clones: do not modify them or keep
+        references to them.
+        """
+        return self._deck
+    
+    def _unshare_deck(self) -> None:
+        """Replace a deck shared with other clones by private copies of its cards."""
+        self._deck_shared = False
+        cards = []
+        replaced = {}
+        for card in self._deck:
+            new_card = card.clone()
+            new_card.game = self.game
+            new_card.controller = self
+            cards.append(new_card)
+            replaced[card] = new_card
+        self._deck = cards
+        if self.game is not None:
+            self.game._rebind_triggers(replaced)
+    
     @property
     def damage_taken_this_turn(self) -> int:
         return getattr(self, '_damage_taken_this_turn', 0)
@@ -340,6 +370,33 @@ class Player(Entity):
             return True
         return False
     
+    def add_secret(self, secret: Card) -> None:
+        """Put a secret into play and index it by its trigger event."""
+        secret.controller = self
+        secret.zone = Zone.SECRET
+        self.secrets.append(secret)
+        event = SECRET_TRIGGERS.get(secret.card_id)
+        if event:
+            self.secret_triggers[event] = self.secret_triggers.get(event, 0) + 1
+    
+    def remove_secret(self, secret: Card) -> bool:
+        """Remove a secret from play (revealed or destroyed)."""
+        if secret not in self.secrets:
+            return False
+        self.secrets.remove(secret)
+        event = SECRET_TRIGGERS.get(secret.card_id)
+        if event:
+            remaining = self.secret_triggers.get(event, 0) - 1
+            if remaining > 0:
+                self.secret_triggers[event] = remaining
+            else:
+                self.secret_triggers.pop(event, None)
+        return True
+    
+    def has_secret_for(self, event: str) -> bool:
+        """Whether any of this player's secrets triggers on an event."""
+        return event in self.secret_triggers
+    
     def equip_weapon(self, weapon: Weapon) -> None:
         """Equip a weapon (destroys existing one)."""
         if self.hero:
@@ -0,0 +1,312 @@
+"""Hearthstone Simulator - Game State Serialization.
+
+Compact, versioned binary encoding of a Game (see Game.to_bytes), to ship
+positions between processes and to snapshot them.
+
+The buffer is a short header (magic + format version) followed by a pickled
+tree of plain values: every entity is stored once in an entity table and
+referenced by index, card data by card ID (or by value for cards missing
+from the CardDatabase), enums and enchantment records as small tuples.
+Callbacks are not stored: triggers are recorded as (source, event) and
+rebuilt on load by re-running the effect setup of their source cards.
+
+The tree holds only built-in containers and scalars, so the unpickler
+refuses to import anything: a buffer cannot run code when loaded. It can
+still set any attribute of any entity, so only load buffers from trusted
+sources (e.g. worker processes of the same run).
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+from collections import Counter
+from dataclasses import MISSING, asdict, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from .enums import (
+    GamePhase, Step, Zone, CardType, CardClass,
+    Rarity, Race, SpellSchool, PlayState, Mulligan, GameTag
+)
+from .entities import (
+    Entity, Enchantment, CardData, Card, Minion, Spell, Weapon, Hero, HeroPower, Location
+)
+from .player import Player
+from .handlers import HandlerTable
+from .game import Game, GameConfig
+
+
+MAGIC = b'HSG'
+
+# Bump whenever the layout below (tags, type tables, payload keys) changes
+FORMAT_VERSION = 1
+
+# Tags of encoded values. Lists, dicts and scalars are stored as they are;
+# every tuple in the tree starts with one of these.
+_REF, _TUPLE, _SET, _FROZENSET, _ENUM, _DATA, _ENCHANT = range(7)
+
+# Types are stored by position in these tables (append only)
+_ENTITY_TYPES = (Player, Card, Minion, Spell, Weapon, Hero, HeroPower, Location)
+_ENUM_TYPES = (GamePhase, Step, Zone, CardType, CardClass,
+               Rarity, Race, SpellSchool, PlayState, Mulligan, GameTag)
+_ENTITY_INDEX = {cls: i for i, cls in enumerate(_ENTITY_TYPES)}
+_ENUM_INDEX = {cls: i for i, cls in enumerate(_ENUM_TYPES)}
+
+_SCALARS = frozenset((int, float, str, bool, bytes, type(None)))
+_NESTED = frozenset((list, dict, tuple))
+_ENCHANT_FIELDS = tuple(f.name for f in fields(Enchantment))
+_DATA_DEFAULTS = {
+    f.name: f.default if f.default is not MISSING else f.default_factory()
+    for f in fields(CardData) if f.name != 'card_id'
+}
+
+# Game attributes stored outside the generic state (or not at all)
+_GAME_SKIP = frozenset((
+    'config', 'players', '_triggers', 'pending_choices', '_pending_deathrattles',
+))
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler for trees of plain values: refuses every class and function."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise pickle.UnpicklingError(f"Serialized Game refers to {module}.{name}")
+
+
+# Sentinel for values that cannot be stored (callbacks, foreign objects)
+_DROP = object()
+
+
+class _Writer:
+    """Encodes a game into a tree of plain values."""
+
+    def __init__(self):
+        self.entities: List[Entity] = []
+        self.entity_refs: Dict[int, int] = {}
+        self.card_data: List[CardData] = []
+        self.data_refs: Dict[int, int] = {}
+        self.layout_refs: Dict[Tuple[str, ...], int] = {}
+        self.dropped: Counter = Counter()
+        # Owners of cards in decks still shared with other clones, whose
+        # controller is the player of the game they were cloned from
+        self.owners: Dict[int, Player] = {}
+
+    def ref(self, entity: Entity) -> int:
+        index = self.entity_refs.get(id(entity))
+        if index is None:
+            index = self.entity_refs[id(entity)] = len(self.entities)
+            self.entities.append(entity)
+        return index
+
+    def encode(self, value: Any) -> Any:
+        t = type(value)
+        if t in _SCALARS:
+            return value
+        if t is list:
+            encoded = [self.encode(v) for v in value]
+            return [v for v in encoded if v is not _DROP] if _DROP in encoded else encoded
+        if t is dict:
+            result = {}
+            for key, item in value.items():
+                key, item = self.encode(key), self.encode(item)
+                if key is not _DROP and item is not _DROP:
+                    result[key] = item
+            return result
+        if t in _ENUM_INDEX:
+            return (_ENUM, _ENUM_INDEX[t], value.value)
+        if isinstance(value, Entity):
+            return (_REF, self.ref(value))
+        if t is CardData:
+            index = self.data_refs.get(id(value))
+            if index is None:
+                index = self.data_refs[id(value)] = len(self.card_data)
+                self.card_data.append(value)
+            return (_DATA, index)
+        if t is Enchantment:
+            return (_ENCHANT,) + tuple(self.encode(getattr(value, name)) for name in _ENCHANT_FIELDS)
+        if t is tuple:
+            return (_TUPLE,) + tuple(self.encode(v) for v in value)
+        if t is set or t is frozenset:
+            items = [v for v in (self.encode(v) for v in value) if v is not _DROP]
+            return (_SET if t is set else _FROZENSET, items)
+        self.dropped[t.__name__] += 1
+        return _DROP
+
+    def encode_entity(self, entity: Entity) -> Tuple[int, int, List[Any]]:
+        """(type index, layout index, attribute values) of an entity.
+
+        Entities of one type mostly share their attribute names, so the
+        names are stored once per distinct layout.
+        """
+        cls = type(entity)
+        index = _ENTITY_INDEX.get(cls)
+        if index is None:
+            # Effect-defined subclass: store it as its nearest known base
+            index = next(_ENTITY_INDEX[base] for base in cls.__mro__ if base in _ENTITY_INDEX)
+            self.dropped[cls.__name__] += 1
+        owner = self.owners.get(id(entity))
+        keys = []
+        values = []
+        for key, value in entity.__dict__.items():
+            if type(value) not in _SCALARS:
+                if key == 'game':
+                    continue
+                if key == 'controller' and owner is not None:
+                    value = owner
+                value = self.encode(value)
+                if value is _DROP:
+                    continue
+            keys.append(key)
+            values.append(value)
+        keys = tuple(keys)
+        layout = self.layout_refs.get(keys)
+        if layout is None:
+            layout = self.layout_refs[keys] = len(self.layout_refs)
+        return index, layout, values
+
+    def encode_card_data(self, data: CardData) -> Any:
+        """Card ID if the CardDatabase holds this exact record, else its non-default fields."""
+        from .card_loader import CardDatabase
+        if CardDatabase._cards.get(data.card_id) is data:
+            return data.card_id
+        return {
+            name: self.encode(value) for name, value in data.__dict__.items()
+            if name == 'card_id' or value != _DATA_DEFAULTS.get(name)
+        }
+
+
+class _Reader:
+    """Rebuilds values encoded by _Writer."""
+
+    def __init__(self, entities: List[Entity], card_data: List[CardData]):
+        self.entities = entities
+        self.card_data = card_data
+
+    def decode_values(self, values: List[Any]) -> List[Any]:
+        return [self.decode(v) if type(v) in _NESTED else v for v in values]
+
+    def decode(self, value: Any) -> Any:
+        t = type(value)
+        if t is list:
+            return self.decode_values(value)
+        if t is dict:
+            return dict(zip(self.decode_values(list(value)), self.decode_values(list(value.values()))))
+        if t is not tuple:
+            return value
+        tag = value[0]
+        if tag == _REF:
+            return self.entities[value[1]]
+        if tag == _TUPLE:
+            return tuple(self.decode(v) for v in value[1:])
+        if tag == _ENUM:
+            return _ENUM_TYPES[value[1]](value[2])
+        if tag == _DATA:
+            return self.card_data[value[1]]
+        if tag == _ENCHANT:
+            return Enchantment(*(self.decode(v) for v in value[1:]))
+        if tag == _SET:
+            return {self.decode(v) for v in value[1]}
+        return frozenset(self.decode(v) for v in value[1])
+
+
+def game_to_bytes(game: Game) -> bytes:
+    """Encode a game (see Game.to_bytes)."""
+    if game.pending_choices or game._pending_deathrattles:
+        raise ValueError("Cannot serialize a game while a choice or deathrattles are pending")
+
+    writer = _Writer()
+    players = [writer.ref(player) for player in game.players]
+    for player in game.players:
+        if player._deck_shared:
+            writer.owners.update((id(card), player) for card in player._deck)
+    state = writer.encode({k: v for k, v in game.__dict__.items()
+                           if k not in _GAME_SKIP and type(v) is not HandlerTable})
+    triggers = [(writer.ref(source), events) for source, events in game._triggers.describe()]
+
+    # Entity states may reference entities not seen yet (the list grows)
+    entities = []
+    i = 0
+    while i < len(writer.entities):
+        entities.append(writer.encode_entity(writer.entities[i]))
+        i += 1
+
+    payload = {
+        'config': asdict(game.config),
+        'next_id': Entity._next_id,
+        'players': players,
+        'state': state,
+        'layouts': list(writer.layout_refs),
+        'entities': entities,
+        'card_data': [writer.encode_card_data(data) for data in writer.card_data],
+        'triggers': triggers,
+    }
+    if writer.dropped and game.config.verbose:
+        print(f"Game.to_bytes: skipped values that cannot be stored: {dict(writer.dropped)}")
+    return MAGIC + bytes((FORMAT_VERSION,)) + pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def game_from_bytes(data: bytes, config: Optional[GameConfig] = None) -> Game:
+    """Rebuild a game encoded by game_to_bytes (see Game.from_bytes)."""
+    from .card_loader import CardDatabase, load_card_effects
+
+    data = memoryview(data)
+    if bytes(data[:len(MAGIC)]) != MAGIC or len(data) <= len(MAGIC):
+        raise ValueError("Not a serialized Game")
+    version = data[len(MAGIC)]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported Game format version {version} (expected {FORMAT_VERSION})")
+    try:
+        payload = _PlainUnpickler(io.BytesIO(data[len(MAGIC) + 1:])).load()
+    except (pickle.UnpicklingError, EOFError) as e:
+        raise ValueError(f"Corrupt serialized Game: {e}") from None
+
+    next_id = Entity._next_id  # Game() resets the counter
+    game = Game(config or GameConfig(**payload['config']))
+
+    # Card data first (entity states refer to it), then empty entities, so
+    # that references between entities resolve in any order
+    card_data: List[CardData] = []
+    reader = _Reader([], card_data)
+    for entry in payload['card_data']:
+        if type(entry) is str:
+            record = CardDatabase.get_card(entry)
+            if record is None:
+                raise ValueError(f"Unknown card ID in serialized Game: {entry}")
+        else:
+            record = CardData(**reader.decode(entry))
+        card_data.append(record)
+
+    layouts = payload['layouts']
+    entities = [object.__new__(_ENTITY_TYPES[index]) for index, _, _ in payload['entities']]
+    reader.entities = entities
+    for entity, (_, layout, values) in zip(entities, payload['entities']):
+        entity.__dict__ = dict(zip(layouts[layout], reader.decode_values(values)))
+        entity.game = game
+        if type(entity) is Player:
+            entity._deck_shared = False
+
+    game.__dict__.update(reader.decode(payload['state']))
+    game.players = [entities[i] for i in payload['players']]
+
+    # Handlers of every card, then triggers of the cards that had any. The
+    # setup code may reset effect attributes of its card, so they are put
+    # back afterwards.
+    for entity in entities:
+        if isinstance(entity, Card):
+            load_card_effects(entity, game, setup=False)
+    missing = 0
+    for index, events in payload['triggers']:
+        source = entities[index]
+        if not isinstance(source, Card):
+            missing += len(events)
+            continue
+        state = source.__dict__.copy()
+        load_card_effects(source, game)
+        source.__dict__.update(state)
+        missing += game._triggers.retain(source, [tuple(key) for key in events])
+    if missing and game.config.verbose:
+        print(f"Game.from_bytes: {missing} trigger(s) could not be restored")
+
+    # Never rewind the counter: entities created since the buffer was written
+    # (in this process) must not share ids with entities created after it
+    Entity._next_id = max(next_id, payload['next_id'])
+    return game
@@ -0,0 +1,214 @@
+"""Hearthstone Simulator - Trigger Registry.
+
+Event listeners indexed by event and by source entity.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from .enums import Zone
+from .entities import Hero
+
+if TYPE_CHECKING:
+    from .entities import Entity
+
+
+Listener = Tuple['Entity', Callable]
+
+# Zones a card does not come back from: deck listeners of cards there are dropped
+_DEAD_ZONES = (Zone.GRAVEYARD, Zone.REMOVEDFROMGAME)
+
+
+class TriggerRegistry:
+    """Trigger callbacks of one Game, indexed by event and by source.
+
+    Each event keeps an insertion-ordered ``{token: (source, callback)}``
+    dict, and each source the tokens it registered, so removing a source
+    touches only its own entries. Listeners whose source has left play are
+    dropped lazily, the next time their event fires.
+
+    Deck listeners (e.g. Patches the Pirate) are registered separately and
+    only run while their source is in the deck, so nothing has to scan the
+    decks to find them.
+
+    ``fire_counts`` and ``call_counts`` count, per event, how often it fired
+    and how many callbacks ran, to make dispatch cost visible in profiles.
+    """
+
+    __slots__ = ('_events', '_deck_events', '_sources', '_next_token',
+                 'fire_counts', 'call_counts')
+
+    def __init__(self, events: Iterable[str]):
+        self._events: Dict[str, Dict[int, Listener]] = {event: {} for event in events}
+        self._deck_events: Dict[str, Dict[int, Listener]] = {}
+        self._sources: Dict['Entity', List[Tuple[int, Dict[int, Listener]]]] = {}
+        self._next_token = 0
+        self.fire_counts: Counter = Counter()
+        self.call_counts: Counter = Counter()
+
+    def _add(self, listeners: Dict[int, Listener], source: 'Entity', callback: Callable) -> None:
+        token = self._next_token
+        self._next_token += 1
+        listeners[token] = (source, callback)
+        self._sources.setdefault(source, []).append((token, listeners))
+
+    def _discard(self, listeners: Dict[int, Listener], token: int) -> None:
+        source = listeners.pop(token)[0]
+        entries = self._sources.get(source)
+        if entries:
+            entries.remove((token, listeners))
+            if not entries:
+                del self._sources[source]
+
+    def register(self, event_name: str, source: 'Entity', callback: Callable) -> bool:
+        """Add a listener for a known event. Unknown events are ignored."""
+        listeners = self._events.get(event_name)
+        if listeners is None:
+            return False
+        self._add(listeners, source, callback)
+        return True
+
+    def register_deck(self, event_name: str, source: 'Entity', callback: Callable) -> None:
+        """Add a listener that runs only while its source is in a deck."""
+        listeners = self._deck_events.get(event_name)
+        if listeners is None:
+            listeners = self._deck_events[event_name] = {}
+        self._add(listeners, source, callback)
+
+    def unregister(self, source: 'Entity') -> None:
+        """Remove every listener (normal and deck) of a source."""
+        for token, listeners in self._sources.pop(source, ()):
+            listeners.pop(token, None)
+
+    def active(self, event_name: str) -> List[Listener]:
+        """Listeners to run for an event, dropping those whose source left play.
+
+        Sources in play or in hand (and heroes) are active; on_minion_death
+        listeners also run while their own source is dying.
+        """
+        listeners = self._events.get(event_name)
+        if not listeners:
+            return []
+        keep_all = event_name == "on_minion_death"
+        result = []
+        dead = None
+        for token, listener in listeners.items():
+            source = listener[0]
+            zone = source.zone
+            if zone == Zone.PLAY or zone == Zone.HAND or keep_all or isinstance(source, Hero):
+                result.append(listener)
+            else:
+                if dead is None:
+                    dead = []
+                dead.append(token)
+        if dead:
+            for token in dead:
+                self._discard(listeners, token)
+        return result
+
+    def active_in_deck(self, event_name: str) -> List[Listener]:
+        """Deck listeners to run for an event; those of dead cards are dropped."""
+        listeners = self._deck_events.get(event_name)
+        if not listeners:
+            return []
+        result = []
+        dead = None
+        for token, listener in listeners.items():
+            zone = listener[0].zone
+            if zone == Zone.DECK:
+                result.append(listener)
+            elif zone in _DEAD_ZONES:
+                if dead is None:
+                    dead = []
+                dead.append(token)
+        if dead:
+            for token in dead:
+                self._discard(listeners, token)
+        return result
+
+    def copy(self, entity_map: Dict['Entity', 'Entity'], shared: Optional[set] = None) -> 'TriggerRegistry':
+        """Copy for a cloned game, with sources replaced through entity_map.
+
+        Listeners of sources that are neither mapped nor in ``shared`` (e.g.
+        deck cards still shared with the clone) are dropped. Counters start
+        from zero.
+        """
+        new = TriggerRegistry(())
+        new._next_token = self._next_token
+        shared = shared or ()
+        sources = new._sources
+        for new_tables, tables in ((new._events, self._events), (new._deck_events, self._deck_events)):
+            for event, listeners in tables.items():
+                new_listeners = new_tables[event] = {}
+                for token, (source, callback) in listeners.items():
+                    mapped = entity_map.get(source)
+                    if mapped is None:
+                        if source not in shared:
+                            continue
+                        mapped = source
+                    new_listeners[token] = (mapped, callback)
+                    sources.setdefault(mapped, []).append((token, new_listeners))
+        return new
+
+    def rebind(self, entity_map: Dict['Entity', 'Entity']) -> None:
+        """Point listeners of replaced sources at their replacements."""
+        for source in [s for s in self._sources if s in entity_map]:
+            new_source = entity_map[source]
+            entries = self._sources.pop(source)
+            for token, listeners in entries:
+                listeners[token] = (new_source, listeners[token][1])
+            self._sources.setdefault(new_source, []).extend(entries)
+
+    def _table_keys(self) -> Dict[int, Tuple[str, bool]]:
+        """id of each listener table -> (event, is_deck)."""
+        keys = {id(listeners): (event, False) for event, listeners in self._events.items()}
+        keys.update((id(listeners), (event, True)) for event, listeners in self._deck_events.items())
+        return keys
+
+    def describe(self) -> List[Tuple['Entity', List[Tuple[str, bool]]]]:
+        """(source, [(event, is_deck), ...]) per source, in registration order.
+
+        The callbacks are left out: Game.to_bytes records triggers this way
+        and rebuilds them by re-running the sources' effect setup.
+        """
+        keys = self._table_keys()
+        return [
+            (source, [keys[id(listeners)] for _, listeners in sorted(entries, key=lambda e: e[0])])
+            for source, entries in self._sources.items()
+        ]
+
+    def retain(self, source: 'Entity', wanted: List[Tuple[str, bool]]) -> int:
+        """Keep only the listeners of a source listed in wanted (see describe).
+
+        Extra listeners are removed; returns how many wanted ones were missing.
+        """
+        missing = Counter(wanted)
+        keys = self._table_keys()
+        for token, listeners in list(self._sources.get(source, ())):
+            key = keys[id(listeners)]
+            if missing[key] > 0:
+                missing[key] -= 1
+            else:
+                self._discard(listeners, token)
+        return sum(missing.values())
+
+    def __getitem__(self, event_name: str) -> List[Listener]:
+        """Registered (source, callback) pairs of an event, in order."""
+        listeners = self._events.get(event_name)
+        if listeners is None:
+            listeners = self._deck_events[event_name]
+        return list(listeners.values())
+
+    def __contains__(self, event_name: object) -> bool:
+        return event_name in self._events
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._sources.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._sources)
+
+    def __repr__(self) -> str:
+        return f"<TriggerRegistry listeners={len(self)} sources={len(self._sources)}>"
@@ -0,0 +1,95 @@
+"""Hearthstone Simulator - Zobrist State Hashing.
+
+Canonical 64-bit hash of a game position, used to detect transpositions
+(different action orders reaching the same state) during search.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .entities import Card
+    from .player import Player
+    from .game import Game
+
+
+_MASK = (1 << 64) - 1
+
+
+def component_key(component: Tuple[Any, ...]) -> int:
+    """Pseudo-random 64-bit key for one state component.
+
+    Plays the role of a Zobrist table lookup without storing a table: the
+    component tuple is hashed and spread with a splitmix64 finalizer. Keys
+    are stable within a process (Python hashes strings per process), which
+    is all an in-memory transposition table needs.
+    """
+    z = (hash(component) + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def card_state(card: Card) -> Tuple[Any, ...]:
+    """State of a card that matters for play: stats, damage, flags, enchantments."""
+    return (
+        card.data.card_id,
+        card._cost, card._attack, card._max_health, card._damage,
+        card._armor, card._durability,
+        card.exhausted, card.attacks_this_turn, card.frozen, card.silenced,
+        card.immune, card.cant_attack,
+        card._taunt, card._divine_shield, card._charge, card._windfury,
+        card._stealth, card._poisonous, card._lifesteal, card._rush, card._reborn,
+        tuple(
+            (e.enchantment_id, e.attack_bonus, e.health_bonus, e.cost_modifier, e.keywords_added)
+            for e in card.enchantments
+        ),
+        tuple(card.tags.items()) if card.tags else (),
+    )
+
+
+def player_hash(player: Player, index: int) -> int:
+    """XOR of the keys of every component of one player's side of the board.
+
+    Hand and board positions are part of the key, since actions address
+    cards by position. The deck only contributes its size, and reading it
+    never unshares a deck shared with a clone.
+    """
+    key = component_key((
+        'player', index,
+        player.mana, player.mana_crystals, player.overload, player.overload_next_turn,
+        player.temp_mana, player.fatigue_counter, player.deck_size, len(player.graveyard),
+        player.play_state,
+    ))
+
+    hero = player.hero
+    if hero is not None:
+        key ^= component_key(('hero', index) + card_state(hero))
+        if hero.weapon is not None:
+            key ^= component_key(('weapon', index) + card_state(hero.weapon))
+        if hero.hero_power is not None:
+            key ^= component_key(('hero_power', index, hero.hero_power.used_this_turn)
+                                 + card_state(hero.hero_power))
+
+    for pos, card in enumerate(player.hand):
+        key ^= component_key(('hand', index, pos) + card_state(card))
+    for pos, minion in enumerate(player.board):
+        key ^= component_key(('board', index, pos) + card_state(minion))
+    for pos, secret in enumerate(player.secrets):
+        key ^= component_key(('secret', index, pos, secret.card_id))
+    return key
+
+
+def game_hash(game: Game) -> int:
+    """Zobrist hash of the whole position.
+
+    The hash is a XOR of independent component keys (turn, player to move,
+    then each player's side), so a caller that knows which component
+    changed can update it by XOR-ing the old key out and the new one in.
+    Effect-specific attributes set outside Card/Player are not covered.
+    """
+    key = component_key(('game', game.turn, game.current_player_idx, game.phase))
+    for index, player in enumerate(game.players):
+        key ^= player_hash(player, index)
+    return key
@@ -13,7 +13,7 @@ from simulator.enums import GamePhase
 from ai.game_wrapper import HearthstoneGame
 from ai.encoder import FeatureEncoder
 from ai.model import HearthstoneModel
-from ai.mcts import MCTS
+from ai.mcts import MCTS, MCTSNode, MCTSSession, TranspositionTable
 
 class TestAICore(unittest.TestCase):
     
@@ -101,6 +101,64 @@ class TestAICore(unittest.TestCase):
         self.assertEqual(len(tensor.shape), 1)
         self.assertEqual(tensor.shape[0], encoder.input_dim)
         
+    def test_encoder_batch(self):
+        """Batch encoding matches per-state encoding and reuses the buffer."""
+        import numpy as np
+        encoder = FeatureEncoder()
+        states = [self.wrapper.get_state()]
+        self.wrapper.perspective = 2
+        states.append(self.wrapper.get_state())
+        
+        buffer = np.full((4, encoder.input_dim), 7.0, dtype=np.float32)
+        batch = encoder.encode_batch(states, out=buffer)
+        
+        self.assertEqual(tuple(batch.shape), (2, encoder.input_dim))
+        self.assertEqual(batch.data_ptr(), torch.from_numpy(buffer).data_ptr())
+        for row, state in zip(batch, states):
+            self.assertTrue(torch.equal(row, encoder.encode(state)))
+        
+        # encode() results do not alias each other
+        first = encoder.encode(states[0])
+        encoder.encode(states[1])
+        self.assertTrue(torch.equal(first, batch[0]))
+        
+    def test_sequence_encoder_batch(self):
+        """encode_many gathers card rows and patches stats per slot."""
+        from types import SimpleNamespace
+        from ai.transformer_model import SequenceEncoder
+        
+        def card(card_id, cost, attack, health, card_type=0):
+            return SimpleNamespace(card_id=card_id, cost=cost, attack=attack,
+                                   health=health, card_type=card_type)
+        
+        def state(board, hand, enemy_board):
+            return SimpleNamespace(friendly_player=SimpleNamespace(board=board, hand=hand),
+                                   enemy_player=SimpleNamespace(board=enemy_board))
+        
+        encoder = SequenceEncoder({"CS2_182": 2, "CS2_029": 3})
+        states = [
+            state([card("CS2_182", 4, 4, 5)], [card("CS2_029", 4, 0, 0, 1), card("???", 20, 0, 0)], []),
+            state([], [], [card("CS2_182", 4, 6, 3)] * 8),
+        ]
+        ids, features, mask = encoder.encode_many(states)
+        
+        self.assertEqual(tuple(features.shape), (2, encoder.seq_len, 11))
+        self.assertEqual(ids[0, :1].tolist(), [2])
+        self.assertEqual(ids[0, 7:10].tolist(), [3, 1, 0])
+        self.assertEqual(ids[1, 17:].tolist(), [2] * 7)
+        self.assertEqual(int(mask.sum()), 3 + 7)
+        # cost, attack, health, type one-hot, zone one-hot, controller
+        expected = [0.4, 4 / 12, 5 / 12, 1, 0, 0, 0, 0, 1, 0, 1]
+        self.assertTrue(torch.allclose(features[0, 0], torch.tensor(expected)))
+        self.assertEqual(features[0, 7, 3:].tolist(), [0, 1, 0, 0, 1, 0, 0, 1])
+        self.assertEqual(features[0, 8, 0].item(), 1.0)  # cost capped at 10
+        self.assertEqual(features[1, 17, 7:].tolist(), [0, 1, 0, 0])
+        self.assertFalse(features[0, 10:].any())
+        
+        for row, single in enumerate(states):
+            for batched, encoded in zip((ids, features, mask), encoder.encode(single)):
+                self.assertTrue(torch.equal(batched[row], encoded))
+        
     def test_model_forward(self):
         """Test Neural Network forward pass."""
         print("\nTesting Model Forward Pass...")
@@ -158,5 +216,288 @@ class TestAICore(unittest.TestCase):
         self.assertIsNotNone(probs)
         self.assertTrue(len(probs) > 0)
 
+    def test_mcts_batched_search(self):
+        """Batched MCTS evaluates several leaves per forward pass."""
+        encoder = FeatureEncoder()
+        model = HearthstoneModel(encoder.input_dim, action_dim=200)
+        batch_sizes = []
+        forward = model.forward
+
+        def counting_forward(x):
+            batch_sizes.append(x.shape[0])
+            return forward(x)
+
+        model.forward = counting_forward
+
+        # P1 to move (setup order is random), so the root has several actions
+        if self.game.players[0].name != "P1":
+            self.game.players.reverse()
+        mcts = MCTS(model, encoder, self.game.clone(), num_simulations=16,
+                    batch_size=8, virtual_loss=1.0)
+        probs = mcts.search(self.game.clone())
+
+        self.assertAlmostEqual(float(probs.sum()), 1.0, places=5)
+        self.assertLess(len(batch_sizes), 17)
+        self.assertGreater(max(batch_sizes), 1)
+
+    def test_mcts_virtual_loss_refunded(self):
+        """Every virtual loss charged during a batched search is refunded, for any weight."""
+        encoder = FeatureEncoder()
+        model = HearthstoneModel(encoder.input_dim, action_dim=200)
+        if self.game.players[0].name != "P1":
+            self.game.players.reverse()
+
+        for virtual_loss in (0.0, 1.0, 2.5):
+            with self.subTest(virtual_loss=virtual_loss):
+                mcts = MCTS(model, encoder, self.game.clone(), num_simulations=16,
+                            batch_size=8, virtual_loss=virtual_loss)
+                root = MCTSNode(self.game.clone())
+                probs = mcts.search_node(root)
+
+                self.assertAlmostEqual(float(probs.sum()), 1.0, places=5)
+                self.assertEqual(root.visit_count, 16)
+                nodes = [root]
+                for node in nodes:
+                    nodes.extend(node.children.values())
+                    self.assertGreaterEqual(node.visit_count, 0)
+                    # Values are in [-1, 1], so a leftover charge would show here
+                    self.assertLessEqual(abs(node.value_sum), node.visit_count + 1e-6)
+
+    def test_mcts_session_reuses_subtree(self):
+        """The chosen child becomes the next root with its statistics."""
+        encoder = FeatureEncoder()
+        model = HearthstoneModel(encoder.input_dim, action_dim=200)
+        if self.game.players[0].name != "P1":
+            self.game.players.reverse()
+
+        session = MCTSSession(MCTS(model, encoder, self.game, num_simulations=20))
+        probs = session.search(self.game.clone())
+        action_idx = int(probs.argmax())
+        child = session.root.children[action_idx]
+        visits = child.visit_count
+
+        self.assertTrue(session.advance(action_idx))
+        self.assertIs(session.root, child)
+        self.assertIsNone(child.parent)
+
+        session.search(child.state)
+        self.assertEqual(session.root.visit_count, visits + 20)
+
+        self.assertFalse(session.advance(-1))
+        self.assertIsNone(session.root)
+
+    def test_mcts_session_resets_on_other_position(self):
+        """A subtree is dropped when the real game is not the position it simulated."""
+        encoder = FeatureEncoder()
+        model = HearthstoneModel(encoder.input_dim, action_dim=200)
+        if self.game.players[0].name != "P1":
+            self.game.players.reverse()
+
+        session = MCTSSession(MCTS(model, encoder, self.game, num_simulations=20))
+        probs = session.search(self.game.clone())
+        action_idx = int(probs.argmax())
+        child_state = session.root.children[action_idx].state
+
+        # Same move, but the real game ended up elsewhere
+        real_state = child_state.clone()
+        real_state.players[0].hero.damage += 3
+        self.assertFalse(session.advance(action_idx, real_state))
+        self.assertIsNone(session.root)
+
+        # A stale root is also replaced when searching from another position
+        session.search(self.game.clone())
+        root = session.root
+        session.search(real_state)
+        self.assertIsNot(session.root, root)
+        self.assertEqual(session.root.visit_count, 20)
+
+    def test_mcts_transposition_table(self):
+        """Repeated positions are evaluated once and served from the table."""
+        encoder = FeatureEncoder()
+        model = HearthstoneModel(encoder.input_dim, action_dim=200)
+        if self.game.players[0].name != "P1":
+            self.game.players.reverse()
+
+        forward_calls = []
+        original_forward = model.forward
+        def counting_forward(x):
+            forward_calls.append(x.shape[0])
+            return original_forward(x)
+        model.forward = counting_forward
+
+        table = TranspositionTable(capacity=1000)
+        mcts = MCTS(model, encoder, self.game, num_simulations=10, transpositions=table)
+        probs = mcts.search(self.game.clone())
+        self.assertAlmostEqual(float(probs.sum()), 1.0, places=5)
+        evaluated = sum(forward_calls)
+        self.assertEqual(len(table), evaluated)
+
+        # The same search again hits the table for every node
+        forward_calls.clear()
+        mcts.search(self.game.clone())
+        self.assertEqual(forward_calls, [])
+        self.assertGreater(table.hit_rate, 0.0)
+
+        table = TranspositionTable(capacity=2)
+        for key in range(3):
+            table.store(key, {0: 1.0}, 0.0)
+        self.assertEqual(len(table), 2)
+        self.assertIsNone(table.lookup(0))
+
+    def test_legal_mask(self):
+        """legal_mask matches get_valid_action_mask; only the chosen Action is built."""
+        import numpy as np
+        if self.game.players[0].name != "P1":
+            self.game.players.reverse()
+        self.game.players[0].mana = 10
+        self.game.players[0].board[0].exhausted = False
+
+        mask = self.wrapper.legal_mask()
+        self.assertEqual(mask.dtype, bool)
+        self.assertEqual(mask.tolist(), [bool(v) for v in self.wrapper.get_valid_action_mask()])
+        self.assertGreater(int(mask[111:].sum()), 0)  # The Ogre can attack
+
+        first_actions = {}
+        for action in self.wrapper.get_valid_actions():
+            first_actions.setdefault(action.to_index(), action)
+        for idx in range(len(mask)):
+            action = self.wrapper.action_for_index(idx)
+            if mask[idx]:
+                self.assertEqual(action._sim_action, first_actions[idx]._sim_action)
+            else:
+                self.assertIsNone(action)
+
+        self.wrapper.perspective = 2
+        self.assertFalse(self.wrapper.legal_mask(out=mask).any())
+
+    def test_vec_env_lockstep(self):
+        """Games advance together and finished games restart automatically."""
+        import numpy as np
+        from ai.vec_env import VecHearthstoneEnv
+        from ai.actions import ACTION_SPACE_SIZE
+
+        env = VecHearthstoneEnv(3, max_steps=4)
+        obs, masks = env.reset_all()
+        self.assertEqual(obs.shape, (3, FeatureEncoder().input_dim))
+        self.assertEqual(masks.shape, (3, ACTION_SPACE_SIZE))
+        self.assertTrue(masks[:, 0].all())  # End turn is always legal
+
+        for tick in range(4):
+            actions = np.array([np.flatnonzero(row)[-1] for row in masks])
+            obs, masks, rewards, dones, infos = env.step(actions)
+        self.assertTrue(dones.all())
+        self.assertTrue(all(info["length"] == 4 for info in infos))
+        self.assertTrue(all(e._step_count == 0 for e in env.envs))
+
+        # Observations are the player to move's view of the restarted game
+        for i, e in enumerate(env.envs):
+            self.assertTrue(np.array_equal(obs[i], FeatureEncoder().encode(e.get_state()).numpy()))
+            self.assertEqual(env.current_players[i], e.perspective)
+
+    def test_replay_buffer_ring(self):
+        """The buffer overwrites its oldest samples and values follow the winner."""
+        import numpy as np
+        from ai.replay_buffer import ReplayBuffer
+
+        buffer = ReplayBuffer(capacity=4)
+        trajectory = [(torch.full((3,), float(i)), np.full(2, 0.5), 1 + i % 2) for i in range(6)]
+        buffer.add_game(trajectory, winner_id=2)
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(sorted(buffer.states[:, 0].tolist()), [2.0, 3.0, 4.0, 5.0])
+        self.assertTrue(np.array_equal(buffer.values, np.where(buffer.states[:, 0] % 2 == 1, 1.0, -1.0)))
+
+        states, policies, values = buffer.sample(8)
+        self.assertEqual(states.shape, (4, 3))
+        self.assertEqual(policies.shape, (4, 2))
+        self.assertEqual(values.shape, (4, 1))
+        self.assertEqual(sorted(states[:, 0].tolist()), [2.0, 3.0, 4.0, 5.0])
+
+    def test_replay_buffer_memmap(self):
+        """A disk-backed buffer reopens with its samples; priorities steer sampling."""
+        import tempfile
+        import numpy as np
+        from ai.replay_buffer import ReplayBuffer
+
+        with tempfile.TemporaryDirectory() as path:
+            buffer = ReplayBuffer(capacity=10, path=path, prioritized=True, alpha=1.0)
+            buffer.add_game([(torch.full((3,), float(i)), np.zeros(2), 1) for i in range(5)], winner_id=1)
+            buffer.update_priorities(np.arange(5), [0, 0, 0, 0, 1])
+            buffer.flush()
+            del buffer
+
+            reopened = ReplayBuffer(path=path, prioritized=True, alpha=1.0)
+            self.assertEqual(len(reopened), 5)
+            self.assertEqual(reopened.input_dim, 3)
+            states, _, values = reopened.sample(20)
+            self.assertTrue((values == 1.0).all())
+            self.assertGreater((states[:, 0] == 4.0).float().mean().item(), 0.9)
+
+    def test_replay_buffer_importance_weights(self):
+        """Prioritized batches come with (N * P(i)) ** -beta weights, scaled to a max of 1."""
+        import numpy as np
+        from ai.replay_buffer import ReplayBuffer
+
+        buffer = ReplayBuffer(capacity=5, prioritized=True, alpha=1.0)
+        buffer.add_game([(torch.full((3,), float(i)), np.zeros(2), 1) for i in range(5)], winner_id=1)
+        buffer.update_priorities(np.arange(5), [1, 1, 1, 1, 4])  # P = 1/8, ..., 1/2
+
+        indices, weights = buffer.sample_indices(200, beta=1.0)
+        self.assertTrue(np.allclose(weights[indices == 4], 0.25))  # (5/2) ** -1 / (5/8) ** -1
+        self.assertTrue(np.allclose(weights[indices != 4], 1.0))
+
+        _, weights = buffer.sample_indices(200, beta=0.5)
+        self.assertAlmostEqual(float(weights.min()), 0.5, places=5)
+
+        buffer.prioritized = False
+        indices, weights = buffer.sample_indices(4)
+        self.assertEqual(len(set(indices.tolist())), 4)
+        self.assertTrue((weights == 1.0).all())
+
+    def test_shared_replay_buffer(self):
+        """Games added by another process are visible to the learner's buffer."""
+        import multiprocessing as mp
+        import numpy as np
+        from ai.replay_buffer import SharedReplayBuffer
+
+        ctx = mp.get_context('spawn')
+        buffer = SharedReplayBuffer(capacity=8, input_dim=3, action_dim=2, ctx=ctx)
+        try:
+            buffer.add_game([(torch.zeros(3), np.zeros(2), 1)], winner_id=1)
+            actor = ctx.Process(target=_add_shared_game, args=(buffer,))
+            actor.start()
+            actor.join(timeout=60)
+            self.assertEqual(actor.exitcode, 0)
+
+            self.assertEqual(len(buffer), 4)
+            states, _, values = buffer.sample(4)
+            self.assertEqual(sorted(states[:, 0].tolist()), [0.0, 7.0, 7.0, 7.0])
+            self.assertEqual(sorted(values[:, 0].tolist()), [-1.0, -1.0, -1.0, 1.0])
+        finally:
+            buffer.close()
+        self.assertFalse(os.path.exists(buffer.path))
+
+    def test_weight_store_versions(self):
+        """Published weights load back with increasing versions."""
+        import tempfile
+        from training.data_collector import WeightStore
+
+        model = HearthstoneModel(input_dim=690, action_dim=200)
+        with tempfile.TemporaryDirectory() as path:
+            store = WeightStore(os.path.join(path, "weights.pt"))
+            self.assertEqual(store.version, -1)
+            self.assertEqual(store.publish(model.state_dict()), 0)
+            self.assertEqual(store.publish(model.state_dict()), 1)
+
+            state_dict, version = store.load()
+            self.assertEqual(version, 1)
+            HearthstoneModel(input_dim=690, action_dim=200).load_state_dict(state_dict)
+
+
+def _add_shared_game(buffer):
+    """Actor side of test_shared_replay_buffer (a module-level function for spawn)."""
+    import numpy as np
+    buffer.add_game([(torch.full((3,), 7.0), np.zeros(2), 1)] * 3, winner_id=2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,68 @@
+"""Tests for the generated card effect cache."""
+
+import os
+
+import pytest
+
+from card_generator.cache import EffectCache
+
+
+EFFECT_CODE = "def battlecry(game, source, target):\n    return 'fired'\n"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache_dir = tmp_path / "card_effects"
+    (cache_dir / "core").mkdir(parents=True)
+    (cache_dir / "core" / "effect_TEST_001.py").write_text(EFFECT_CODE)
+    return EffectCache(str(cache_dir))
+
+
+class TestEffectCache:
+    """Tests for EffectCache indexing and in-memory caching."""
+
+    def test_load_effect(self, cache):
+        """Effects are loaded from the expansion directory."""
+        effects = cache.load_effect("TEST_001", "CORE")
+        assert effects["battlecry"](None, None, None) == "fired"
+
+    def test_module_loaded_once(self, cache):
+        """Repeated loads return the same module objects."""
+        first = cache.load_effect("TEST_001", "CORE")
+        second = cache.load_effect("TEST_001", "CORE")
+        assert first is second
+
+    def test_no_filesystem_after_warmup(self, cache, monkeypatch):
+        """Warm lookups, hits and misses alike, never touch the disk."""
+        cache.load_effect("TEST_001", "CORE")
+        cache.load_effect("MISSING_001", "CORE")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("filesystem access")
+
+        monkeypatch.setattr(os.path, "exists", fail)
+        monkeypatch.setattr(os, "scandir", fail)
+        monkeypatch.setattr(os, "makedirs", fail)
+
+        assert cache.load_effect("TEST_001", "CORE") is not None
+        assert cache.load_effect("MISSING_001", "CORE") is None
+        assert cache.load_effect("OTHER_001", "CORE") is None
+        assert cache.is_cached("TEST_001", "CORE")
+
+    def test_lookup_without_card_set(self, cache):
+        """Effects can be found by card id alone."""
+        assert cache.is_cached("TEST_001")
+        assert cache.load_effect("TEST_001") is not None
+
+    def test_wrong_card_set_is_a_miss(self, cache):
+        """An effect only matches its own expansion directory."""
+        assert cache.load_effect("TEST_001", "LEGACY") is None
+
+    def test_save_effect_updates_index(self, cache):
+        """Saved effects are visible immediately, replacing stale modules."""
+        assert cache.load_effect("TEST_002", "LEGACY") is None
+
+        cache.save_effect("TEST_002", EFFECT_CODE, "LEGACY")
+
+        assert cache.is_cached("TEST_002", "LEGACY")
+        assert cache.load_effect("TEST_002", "LEGACY") is not None
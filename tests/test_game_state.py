@@ -248,6 +248,29 @@ class TestAction:
             recovered = Action.from_index(idx)
             assert recovered.action_type == action.action_type
     
+    def test_index_table(self):
+        """from_index returns shared immutable prototypes that round-trip."""
+        import pytest
+        from ai.actions import Action, ACTION_SPACE_SIZE
+        
+        for idx in range(ACTION_SPACE_SIZE):
+            action = Action.from_index(idx)
+            assert action is Action.from_index(idx)
+            assert action.to_index() == idx
+            assert action == Action._decode(idx)
+        
+        assert Action.from_index(ACTION_SPACE_SIZE) is Action.from_index(0)
+        assert Action.attack(2, 1) == Action.from_index(Action.attack(2, 1).to_index())
+        with pytest.raises(AttributeError):
+            Action.from_index(5).target_index = 0
+    
+    def test_decode_many(self):
+        """decode_many looks up a batch of indices at once."""
+        from ai.actions import Action
+        
+        decoded = Action.decode_many([0, 12, 174, -1])
+        assert list(decoded) == [Action.from_index(i) for i in (0, 12, 174, 0)]
+    
     def test_repr(self):
         """__repr__ returns readable string."""
         from ai.actions import Action
@@ -0,0 +1,93 @@
+"""Tests for streaming HSReplay parsing."""
+
+import numpy as np
+
+from training.replay_parser import StreamingReplayParser, extract_training_pairs, parse_replays_to_shards
+from training.shards import ShardReader
+
+
+# Two players; a minion in player 1's hand is played on turn 2. Turn changes
+# happen inside trigger blocks, as in real replays; turn 1 has no plays.
+REPLAY = """<?xml version="1.0"?>
+<HSReplay version="1.7">
+  <Game>
+    <GameEntity id="1"/>
+    <Player id="2" playerID="1" name="A"><Tag tag="50" value="1"/></Player>
+    <Player id="3" playerID="2" name="B"><Tag tag="50" value="2"/></Player>
+    <FullEntity id="10" cardID="CS2_182"><Tag tag="49" value="3"/><Tag tag="50" value="1"/><Tag tag="202" value="4"/></FullEntity>
+    <FullEntity id="11" cardID=""><Tag tag="49" value="3"/><Tag tag="50" value="2"/></FullEntity>
+    <Block entity="1" type="5">
+      <TagChange entity="1" tag="20" value="1"/>
+      <TagChange entity="2" tag="23" value="1"/>
+      <TagChange entity="10" tag="48" value="3"/>
+    </Block>
+    <Block entity="1" type="5">
+      <TagChange entity="1" tag="20" value="2"/>
+      <TagChange entity="2" tag="23" value="1"/>
+    </Block>
+    <ShowEntity entity="11" cardID="EX1_066"><Tag tag="48" value="1"/></ShowEntity>
+    <Block entity="10" type="7">
+      <TagChange entity="10" tag="49" value="1"/>
+    </Block>
+    <TagChange entity="2" tag="17" value="4"/>
+  </Game>
+</HSReplay>
+"""
+
+
+def _write_replay(path):
+    path.write_text(REPLAY)
+    return str(path)
+
+
+class TestStreamingReplayParser:
+    """Tests for StreamingReplayParser."""
+
+    def test_turns_and_snapshots(self, tmp_path):
+        """Plays land in their turn, whose snapshot includes changes of skipped turns."""
+        replay = StreamingReplayParser().parse_file(_write_replay(tmp_path / "game.xml"))
+
+        assert replay.winner == 1
+        assert [(t.turn_number, t.player) for t in replay.turns] == [(2, 1)]
+        assert [a.card_id for a in replay.turns[0].actions] == ["CS2_182"]
+
+        (turn, snapshot), = replay.iter_snapshots()
+        assert snapshot['entities'][10]['cost'] == 3  # Changed on turn 1
+        assert snapshot['entities'][10]['zone'] == 3  # Played after the snapshot
+        assert snapshot['entities'][11]['card_id'] == ""  # Revealed after the snapshot
+
+    def test_parse_to_shards(self, tmp_path):
+        """Replays are encoded into shards, one sample per play."""
+        paths = [_write_replay(tmp_path / f"game{i}.xml") for i in range(2)]
+        (tmp_path / "broken.xml").write_text("<HSReplay><Game>")
+        paths.insert(1, str(tmp_path / "broken.xml"))
+
+        num_replays, num_samples = parse_replays_to_shards(paths, str(tmp_path / "out"), workers=1)
+        assert (num_replays, num_samples) == (2, 2)
+
+        reader = ShardReader(str(tmp_path / "out"))
+        assert reader.manifest["num_replays"] == 2
+        assert reader["outcomes"][np.arange(2)].ravel().tolist() == [1.0, 1.0]
+        features = reader["card_features"][np.array([0])][0]
+        assert np.count_nonzero(reader["card_ids"][np.array([0])]) == 1  # The minion in hand
+        assert abs(features[7, 0] - 0.3) < 1e-6  # Hand slot 0: cost 3 / 10
+
+    def test_encode_errors_skip_replay(self, tmp_path, monkeypatch):
+        """A replay that fails to encode is skipped; the rest are still written."""
+        import training.replay_parser as replay_parser
+
+        encode = replay_parser.encode_replay
+
+        def flaky_encode(replay, encoder):
+            if replay.game_id == "bad.xml":
+                raise KeyError("players")
+            return encode(replay, encoder)
+
+        monkeypatch.setattr(replay_parser, "encode_replay", flaky_encode)
+        paths = [_write_replay(tmp_path / name) for name in ("bad.xml", "good.xml")]
+
+        assert parse_replays_to_shards(paths, str(tmp_path / "out"), workers=1) == (1, 1)
+
+        replays = [StreamingReplayParser().parse_file(path) for path in paths]
+        samples = extract_training_pairs(replays)
+        assert [sample["game_outcome"] for sample in samples] == [1.0]
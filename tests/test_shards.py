@@ -0,0 +1,172 @@
+"""Tests for sharded binary training datasets."""
+
+import json
+
+import numpy as np
+import torch
+import pytest
+
+from training.shards import MANIFEST_FILE, ShardReader, ShardWriter, append_shards, convert_json, drop_oldest_shards
+
+
+def _write(path, num_samples, shard_size):
+    """Write samples whose label is their index and whose card ids start there."""
+    with ShardWriter(str(path), shard_size=shard_size) as writer:
+        for i in range(num_samples):
+            writer.add(np.arange(i, i + 30), np.full((3, 11), float(i)), i, 1.0 if i % 2 else -1.0)
+        writer.metadata["games_played"] = 2
+
+
+class TestShardWriter:
+    """Tests for ShardWriter."""
+
+    def test_fixed_size_shards_and_manifest(self, tmp_path):
+        """Samples are split into full shards plus a partial last one."""
+        _write(tmp_path, 10, shard_size=4)
+
+        with open(tmp_path / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        assert manifest["complete"] and manifest["num_samples"] == 10
+        assert [s["num_samples"] for s in manifest["shards"]] == [4, 4, 2]
+        assert manifest["games_played"] == 2
+
+        ids = np.load(tmp_path / "shard_00001" / "card_ids.npy")
+        assert ids.shape == (4, 24) and ids.dtype == np.int32
+        assert ids[0, 0] == 4 and ids[0, -1] == 27  # Truncated to seq_len
+
+    def test_manifest_lists_only_written_shards(self, tmp_path):
+        """Before close, the manifest covers the shards on disk, not the one being filled."""
+        writer = ShardWriter(str(tmp_path), shard_size=4)
+        for i in range(6):
+            writer.add(np.zeros(24), np.zeros((24, 11)), i)
+
+        reader = ShardReader(str(tmp_path))
+        assert len(reader) == 4 and len(writer) == 6
+        assert not reader.manifest["complete"]
+
+
+    def test_error_leaves_dataset_incomplete(self, tmp_path):
+        """A writer left by an exception flushes its samples but does not mark them complete."""
+        with pytest.raises(KeyboardInterrupt):
+            with ShardWriter(str(tmp_path), shard_size=4) as writer:
+                for i in range(6):
+                    writer.add(np.zeros(24), np.zeros((24, 11)), i)
+                raise KeyboardInterrupt
+
+        reader = ShardReader(str(tmp_path))
+        assert not reader.manifest["complete"]
+        assert len(reader) == 6 and reader["labels"][-1] == 5
+
+class TestShardReader:
+    """Tests for memory-mapped shard reading."""
+
+    def test_gather_across_shards(self, tmp_path):
+        """Fancy indices, slices and negative indices read the right rows."""
+        _write(tmp_path, 10, shard_size=4)
+        card_ids, card_features, labels, outcomes = ShardReader(str(tmp_path)).arrays()
+
+        assert isinstance(labels.parts[0], np.memmap)
+        assert labels[np.array([9, 0, 5, 4])].tolist() == [9, 0, 5, 4]
+        assert labels[-1] == 9
+        assert np.asarray(labels[7:]).tolist() == [7, 8, 9]
+        assert labels[2:9][np.array([0, 6])].tolist() == [2, 8]
+        assert card_features.shape == (10, 24, 11)
+        assert card_features[np.array([5])][0, 2, 0] == 5.0 and card_features[np.array([5])][0, 3, 0] == 0.0
+        assert outcomes[np.array([2, 3])].ravel().tolist() == [-1.0, 1.0]
+
+    def test_out_of_range_indices_raise(self, tmp_path):
+        """Indices outside [-len, len) raise IndexError instead of wrapping around."""
+        _write(tmp_path, 10, shard_size=4)
+        labels = ShardReader(str(tmp_path))["labels"]
+
+        assert labels[np.array([-10, -1, 3])].tolist() == [0, 9, 3]
+        assert labels[5:][-5] == 5
+        for key in (10, -11, np.array([0, 13])):
+            with pytest.raises(IndexError):
+                labels[key]
+        with pytest.raises(IndexError):
+            labels[5:][5]
+
+
+class TestShardConversion:
+    """Tests for combining and converting datasets."""
+
+    def test_append_shards_renumbers(self, tmp_path):
+        """Appended shards follow the dataset's last shard, in source order."""
+        _write(tmp_path / "a", 5, shard_size=4)
+        _write(tmp_path / "b", 3, shard_size=4)
+
+        added = append_shards(str(tmp_path / "a"), [str(tmp_path / "b")], move=True)
+        assert added == 3
+        reader = ShardReader(str(tmp_path / "a"))
+        assert [s["name"] for s in reader.manifest["shards"]] == ["shard_00000", "shard_00001", "shard_00002"]
+        assert reader["labels"][np.arange(8)].tolist() == [0, 1, 2, 3, 4, 0, 1, 2]
+        assert not (tmp_path / "b" / "shard_00000").exists()
+
+    def test_drop_oldest_shards(self, tmp_path):
+        """The window drops whole shards, keeping at least max_samples."""
+        _write(tmp_path, 10, shard_size=4)
+
+        assert drop_oldest_shards(str(tmp_path), 5) == 4
+        reader = ShardReader(str(tmp_path))
+        assert len(reader) == 6 and reader["labels"][0] == 4
+        assert not (tmp_path / "shard_00000").exists()
+        assert drop_oldest_shards(str(tmp_path), 6) == 0
+
+    def test_convert_json_files(self, tmp_path):
+        """JSON files stream into one dataset, in input order."""
+        pytest.importorskip("ijson")
+        paths = []
+        for part in range(2):
+            samples = [{'card_ids': [part * 10 + i] * 24, 'card_features': [[0.5] * 11] * 24,
+                        'action_label': part * 10 + i, 'game_outcome': 1.0} for i in range(3)]
+            path = tmp_path / f"part{part}.json"
+            with open(path, 'w') as f:
+                json.dump({'samples': samples} if part == 0 else samples, f)
+            paths.append(str(path))
+
+        assert convert_json(paths, str(tmp_path / "out"), shard_size=2, workers=1) == 6
+        reader = ShardReader(str(tmp_path / "out"))
+        assert reader["labels"][np.arange(6)].tolist() == [0, 1, 2, 10, 11, 12]
+        assert reader["card_features"][np.array([4])][0, 23, 10] == 0.5
+
+
+class TestMemmapReplayDataset:
+    """Tests for batch-indexed imitation training data."""
+
+    def test_batches_from_shards(self, tmp_path):
+        """A DataLoader over the batch sampler yields whole batches of every row."""
+        from training.imitation_trainer import MemmapReplayDataset
+
+        _write(tmp_path, 10, shard_size=4)
+        train, val = MemmapReplayDataset(str(tmp_path)).split(0.8)
+        assert (len(train), len(val)) == (8, 2)
+
+        batches = list(train.loader(batch_size=3, shuffle=True, num_workers=0))
+        assert [len(b[3]) for b in batches] == [3, 3, 2]
+        labels = sorted(int(x) for b in batches for x in b[3])
+        assert labels == list(range(8))
+
+        card_ids, card_features, mask, labels, outcomes = val[[0, 1]]
+        assert card_ids.dtype == torch.int64 and card_ids.shape == (2, 24)
+        assert card_features.shape == (2, 24, 11)
+        assert mask[0].all() and labels.tolist() == [8, 9]
+        assert outcomes.tolist() == [-1.0, 1.0]
+
+    def test_reads_convert_to_binary_layout(self, tmp_path):
+        """Directories from scripts/convert_to_binary.py (raw memmaps + metadata.json) load too."""
+        from training.imitation_trainer import MemmapReplayDataset
+
+        shapes = {'card_ids': [5, 24], 'card_features': [5, 24, 11], 'labels': [5], 'outcomes': [5, 1]}
+        for name, dtype in (('card_ids', 'int32'), ('card_features', 'float32'),
+                            ('labels', 'int32'), ('outcomes', 'float32')):
+            array = np.memmap(tmp_path / f"{name}.npy", dtype=dtype, mode='w+', shape=tuple(shapes[name]))
+            array[:] = np.arange(5).reshape((5,) + (1,) * (array.ndim - 1))
+            array.flush()
+        with open(tmp_path / "metadata.json", 'w') as f:
+            json.dump({'num_samples': 5, 'seq_len': 24, 'shapes': shapes}, f)
+
+        dataset = MemmapReplayDataset(str(tmp_path))
+        _, _, _, labels, outcomes = dataset[[4, 2]]
+        assert labels.tolist() == [2, 4]  # Rows are read in file order
+        assert outcomes.tolist() == [2.0, 4.0]
@@ -0,0 +1,608 @@
+"""Tests for the simulator engine internals."""
+
+import pytest
+
+from simulator.game import Game, GameConfig
+from simulator.handlers import HandlerTable
+
+
+def _noop(game, source, target=None):
+    pass
+
+
+def _small_game():
+    """Two heroes with a 5 card deck and a buffed Yeti each; Player1 has a weapon."""
+    from simulator import Player, Hero, Minion, Weapon, CardData, CardType, Zone
+    from simulator.entities import Enchantment
+
+    game = Game()
+    p1, p2 = Player("Player1"), Player("Player2")
+    for player in (p1, p2):
+        player.hero = Hero(CardData("HERO_08", "Hero", health=30, card_type=CardType.HERO))
+        player.hero.controller = player
+    game.setup(p1, p2)
+
+    for player in game.players:
+        for i in range(5):
+            player.add_to_deck(Minion(CardData(f"DECK_{i}", cost=i, attack=1, health=1,
+                                               card_type=CardType.MINION), game))
+        minion = Minion(CardData("CS2_182", "Chillwind Yeti", cost=4, attack=4, health=5,
+                                 card_type=CardType.MINION), game)
+        minion.controller = player
+        minion.zone = Zone.PLAY
+        minion.add_enchantment(Enchantment("buff", 0, attack_bonus=1))
+        player.board.append(minion)
+
+    game.players[0].equip_weapon(Weapon(CardData("CS2_106", "Fiery War Axe", attack=3,
+                                                 durability=2, card_type=CardType.WEAPON), game))
+    return game
+
+
+class TestHandlerTable:
+    """Tests for the shared effect handler tables."""
+
+    def test_games_share_base_table(self):
+        """Every Game reads through to the same process-wide table."""
+        g1 = Game()
+        g2 = Game()
+
+        assert g1._battlecry_handlers.base is g2._battlecry_handlers.base
+        assert g1._deathrattle_handlers.base is g2._deathrattle_handlers.base
+        assert len(g1._battlecry_handlers) > 0
+
+    def test_base_table_is_read_only(self):
+        """The shared table cannot be mutated through a game."""
+        game = Game()
+        with pytest.raises(TypeError):
+            game._battlecry_handlers.base["TEST_001"] = _noop
+
+    def test_override_does_not_leak_between_games(self):
+        """Per-game registrations stay local to that game."""
+        g1 = Game()
+        g2 = Game()
+        g1._battlecry_handlers["TEST_001"] = _noop
+
+        assert "TEST_001" in g1._battlecry_handlers
+        assert "TEST_001" not in g2._battlecry_handlers
+        assert "TEST_001" not in g1._battlecry_handlers.base
+
+    def test_override_shadows_base(self):
+        """An override wins over the shared handler for the same card."""
+        game = Game()
+        card_id = next(iter(game._battlecry_handlers.base))
+        game._battlecry_handlers[card_id] = _noop
+
+        assert game._battlecry_handlers[card_id] is _noop
+        assert game._battlecry_handlers.base[card_id] is not _noop
+
+    def test_clone_is_copy_on_write(self):
+        """Clones see parent overrides, but later writes stay separate."""
+        game = Game()
+        game._battlecry_handlers["TEST_001"] = _noop
+
+        clone = game._battlecry_handlers.copy()
+        clone["TEST_002"] = _noop
+        game._battlecry_handlers["TEST_003"] = _noop
+
+        assert "TEST_001" in clone
+        assert "TEST_002" not in game._battlecry_handlers
+        assert "TEST_003" not in clone
+
+    def test_len_counts_shadowed_once(self):
+        """Overrides of shared card ids are not double counted."""
+        table = HandlerTable({"A": _noop})
+        table["A"] = _noop
+        table["B"] = _noop
+
+        assert len(table) == 2
+        assert sorted(table) == ["A", "B"]
+
+
+class TestCardSnapshot:
+    """Tests for the on-disk card database snapshot."""
+
+    @pytest.fixture
+    def cards(self):
+        from simulator.entities import CardData
+        from simulator.enums import CardType, CardClass, GameTag, Race
+
+        return {
+            "CS2_029": CardData("CS2_029", "Fireball", "Deal $6 damage.", "LEGACY", cost=4,
+                                card_type=CardType.SPELL, card_class=CardClass.MAGE,
+                                collectible=True, tags={GameTag.SPELLPOWER.value: 0}),
+            "CS2_182": CardData("CS2_182", "Chillwind Yeti", cost=4, attack=4, health=5,
+                                card_type=CardType.MINION, race=Race.BEAST, taunt=True,
+                                forge=True, tags={GameTag.SPELLPOWER.value: 1}),
+        }
+
+    def test_round_trip(self, tmp_path, cards):
+        """Cards and DBF ids survive a write/read cycle unchanged."""
+        from simulator.card_snapshot import write_snapshot, read_snapshot
+
+        path = str(tmp_path / "cards.snapshot")
+        write_snapshot(path, cards, {315: "CS2_029"}, ("v1",))
+        loaded, dbf_to_card = read_snapshot(path, ("v1",))
+
+        assert loaded == cards
+        assert dbf_to_card == {315: "CS2_029"}
+
+    def test_stale_snapshot_is_ignored(self, tmp_path, cards):
+        """A snapshot built from other card data is not used."""
+        from simulator.card_snapshot import write_snapshot, read_snapshot
+
+        path = str(tmp_path / "cards.snapshot")
+        write_snapshot(path, cards, {}, ("v1",))
+
+        assert read_snapshot(path, ("v2",)) is None
+        assert read_snapshot(str(tmp_path / "missing.snapshot"), ("v1",)) is None
+
+
+class TestGameClone:
+    """Tests for the structural Game.clone."""
+
+    @pytest.fixture
+    def game(self):
+        return _small_game()
+
+    def test_clone_is_independent(self, game):
+        """Changes to the clone never reach the original."""
+        clone = game.clone()
+        minion = clone.players[0].board[0]
+        minion.damage = 3
+        minion.add_enchantment(minion.enchantments[0])
+
+        original = game.players[0].board[0]
+        assert original.damage == 0
+        assert len(original.enchantments) == 1
+        assert minion.entity_id == original.entity_id
+        assert minion.data is original.data
+        assert minion.game is clone
+        assert minion.controller is clone.players[0]
+        assert clone.players[0].opponent is clone.players[1]
+
+    def test_clone_keeps_entity_counter(self, game):
+        """Cloning does not reset the entity IDs of the original game."""
+        from simulator import Entity
+
+        next_id = Entity._next_id
+        game.clone()
+        assert Entity._next_id == next_id
+
+    def test_hero_equipment_is_cloned(self, game):
+        """Weapons are copied and bound to the cloned player."""
+        clone = game.clone()
+        weapon = clone.players[0].weapon
+
+        assert weapon is not game.players[0].weapon
+        assert weapon.controller is clone.players[0]
+        assert weapon.durability == 2
+
+    def test_deck_shared_until_touched(self, game):
+        """Decks are shared by reference until one side accesses them."""
+        clone = game.clone()
+        original_player, clone_player = game.players[0], clone.players[0]
+
+        assert clone_player.peek_deck()[0] is original_player.peek_deck()[0]
+        assert clone_player.deck_size == 5
+
+        drawn = clone_player.draw()[0]
+        assert drawn.controller is clone_player
+        assert drawn.game is clone
+        assert original_player.deck_size == 5
+        assert drawn not in original_player.deck
+        assert original_player.deck[0].controller is original_player
+
+    def test_deck_triggers_follow_unshared_cards(self, game):
+        """Triggers of deck cards are rebound when the deck is copied."""
+        source = game.players[0].peek_deck()[0]
+        game.register_trigger("on_turn_end", source, _noop)
+
+        clone = game.clone()
+        clone_card = clone.players[0].deck[0]
+
+        assert clone._triggers["on_turn_end"] == [(clone_card, _noop)]
+        assert game._triggers["on_turn_end"] == [(source, _noop)]
+
+    @pytest.mark.parametrize("play_in_clone", [False, True])
+    def test_deck_trigger_after_clone(self, game, play_in_clone):
+        """Patches is summoned from a deck still shared with a clone, in either game."""
+        from simulator.card_loader import CardDatabase, create_card
+
+        CardDatabase.get_instance().load()
+        game.players[0].add_to_deck(create_card("CFM_637", game))  # Patches the Pirate
+        clone = game.clone()
+        target = clone if play_in_clone else game
+
+        player = target.players[0]
+        player.mana = player.max_mana = 10
+        pirate = create_card("CS2_146", target)  # Southsea Deckhand
+        player.add_to_hand(pirate)
+        target.play_card(pirate, None)
+
+        assert [c.card_id for c in player.board][-2:] == ["CS2_146", "CFM_637"]
+        assert player.board[-1].controller is player
+        other = game if play_in_clone else clone
+        assert "CFM_637" in [c.card_id for c in other.players[0].deck]
+
+
+class TestZobristHash:
+    """Tests for the position hash used by the transposition table."""
+
+    def test_clone_hashes_equal(self):
+        """A clone is the same position as its original."""
+        from simulator.zobrist import game_hash
+
+        game = _small_game()
+        assert game_hash(game.clone()) == game_hash(game)
+
+    def test_hash_tracks_state(self):
+        """Damage, buffs and board order all change the hash."""
+        from simulator.zobrist import game_hash
+        from simulator.entities import Enchantment
+
+        game = _small_game()
+        before = game_hash(game)
+
+        clone = game.clone()
+        clone.players[0].board[0].damage = 1
+        assert game_hash(clone) != before
+
+        clone = game.clone()
+        clone.players[1].board[0].add_enchantment(Enchantment("buff", 0, health_bonus=1))
+        assert game_hash(clone) != before
+
+        clone = game.clone()
+        clone.players[0].draw()
+        assert game_hash(clone) != before
+
+
+class TestTriggerRegistry:
+    """Tests for event-indexed trigger dispatch."""
+
+    def test_unregister_removes_every_event(self):
+        """Removing a source drops its listeners from all events."""
+        game = _small_game()
+        minion = game.players[0].board[0]
+        game.register_trigger("on_turn_end", minion, _noop)
+        game.register_trigger("on_minion_summon", minion, _noop)
+        game.register_trigger("on_attack", minion, _noop)  # Unknown events are ignored
+
+        assert len(game._triggers) == 2
+        game.unregister_triggers(minion)
+        assert len(game._triggers) == 0
+        assert game._triggers["on_turn_end"] == []
+
+    def test_dead_sources_dropped_on_fire(self):
+        """Listeners whose source left play are removed when their event fires."""
+        from simulator import Zone
+
+        game = _small_game()
+        calls = []
+        alive, dead = game.players[0].board[0], game.players[1].board[0]
+        for minion in (alive, dead):
+            game.register_trigger("on_turn_end", minion, lambda g, s, *a: calls.append(s))
+        dead.zone = Zone.GRAVEYARD
+
+        game.fire_event("on_turn_end", game.current_player)
+
+        assert calls == [alive]
+        assert [s for s, _ in game._triggers["on_turn_end"]] == [alive]
+        assert game._triggers.fire_counts["on_turn_end"] == 1
+        assert game._triggers.call_counts["on_turn_end"] == 1
+
+    def test_deck_trigger_fires_only_from_deck(self):
+        """Deck listeners run while their card is in the deck, and not after."""
+        from simulator import Zone
+
+        game = _small_game()
+        card = game.players[0].peek_deck()[0]
+        calls = []
+        game.register_deck_trigger("on_after_card_played", card, lambda g, s, c: calls.append(c))
+
+        game.fire_event("on_after_card_played", "played")
+        card.zone = Zone.HAND
+        game.fire_event("on_after_card_played", "played")
+        card.zone = Zone.GRAVEYARD
+        game.fire_event("on_after_card_played", "played")
+
+        assert calls == ["played"]
+        assert game._triggers["on_after_card_played"] == []
+
+
+class TestCardStats:
+    """Tests for enchantment-aware card stats and keywords."""
+
+    @pytest.fixture
+    def yeti(self):
+        from simulator import Minion, CardData, CardType
+
+        return Minion(CardData("CS2_182", "Chillwind Yeti", cost=4, attack=4, health=5,
+                               card_type=CardType.MINION))
+
+    def test_enchantments_apply(self, yeti):
+        """Buffs change stats and grant keywords until removed."""
+        from simulator.entities import Enchantment
+
+        yeti.add_enchantment(Enchantment("buff", 0, attack_bonus=2, health_bonus=1,
+                                         cost_modifier=-1, keywords_added=("TAUNT",)))
+        assert (yeti.cost, yeti.attack, yeti.health, yeti.max_health) == (3, 6, 6, 6)
+        assert yeti.taunt and yeti.has_keyword("taunt")
+        assert not yeti.stealth
+
+        yeti.remove_enchantment("buff")
+        assert (yeti.cost, yeti.attack, yeti.health) == (4, 4, 5)
+        assert not yeti.taunt
+
+    def test_setters_keep_buffs(self, yeti):
+        """Setting a stat sets the total, with buffs still on top of the base."""
+        from simulator.entities import Enchantment
+
+        yeti.add_enchantment(Enchantment("buff", 0, attack_bonus=2))
+        yeti.attack += 1
+        assert yeti.attack == 7
+
+        yeti.remove_enchantment("buff")
+        assert yeti.attack == 5
+
+    def test_expiry_and_silence(self, yeti):
+        """One-turn buffs expire; silence removes every buff and keyword."""
+        from simulator.entities import Enchantment
+
+        yeti.add_enchantment(Enchantment("temp", 0, attack_bonus=2, one_turn_effect=True))
+        yeti.add_enchantment(Enchantment("perm", 0, health_bonus=2, keywords_added=("DIVINE_SHIELD",)))
+        yeti.expire_enchantments()
+        assert (yeti.attack, yeti.health) == (4, 7)
+        assert yeti.divine_shield
+
+        yeti.silence()
+        assert (yeti.attack, yeti.health) == (4, 5)
+        assert not yeti.divine_shield
+        assert yeti.enchantments == []
+
+
+class TestDeathProcessing:
+    """Tests for dirty-set death checks."""
+
+    def test_damage_kills(self):
+        """Minions killed through deal_damage die; untouched ones are not rescanned."""
+        game = _small_game()
+        yeti, other = game.players[0].board[0], game.players[1].board[0]
+        game.process_deaths()
+        game.deal_damage(yeti, 10)
+        assert game._health_changed == {yeti}
+
+        game.process_deaths()
+        assert yeti not in game.players[0].board
+        assert game.players[0].graveyard == [yeti]
+        assert game.players[0].dead_minions == ["CS2_182"]
+        assert other in game.players[1].board
+        assert not game._health_changed and not game._pending_deaths
+
+    def test_effect_writes_are_caught(self):
+        """Stats written directly by effect code are found by the board rescan."""
+        game = _small_game()
+        yeti = game.players[1].board[0]
+
+        def direct_write(game, source, *args):
+            yeti._damage = 99
+        game.register_trigger("on_turn_start", game.players[0].hero, direct_write)
+
+        game.fire_event("on_turn_start")
+        assert game._scan_boards
+        game.process_deaths()
+        assert yeti not in game.players[1].board
+
+    def test_pending_deaths_are_ordered_and_unique(self):
+        """Destroyed minions die once each, in the order they were destroyed."""
+        game = _small_game()
+        died = []
+        game.register_trigger("on_minion_death", game.players[0].hero,
+                              lambda game, source, minion: died.append(minion))
+        first, second = game.players[1].board[0], game.players[0].board[0]
+        game.destroy(first)
+        game.destroy(second)
+        game.destroy(first)
+
+        clone = game.clone()
+        assert [m.card_id for m in clone._pending_deaths] == ["CS2_182", "CS2_182"]
+        assert clone.players[1].board[0] in clone._pending_deaths
+
+        game.process_deaths()
+        assert died == [first, second]
+
+
+class TestSecretIndex:
+    """Tests for the per-event secret index on Player."""
+
+    @staticmethod
+    def _secret(card_id, game):
+        from simulator import Spell, CardData, CardType
+
+        return Spell(CardData(card_id, card_type=CardType.SPELL), game)
+
+    def test_index_follows_secrets(self):
+        """Secrets are indexed by trigger event until removed."""
+        game = _small_game()
+        player = game.players[1]
+        snipe, mirror = self._secret("EX1_609", game), self._secret("EX1_294", game)
+        player.add_secret(snipe)
+        player.add_secret(mirror)
+        assert player.secret_triggers == {"on_minion_played": 2}
+        assert player.has_secret_for("on_minion_played")
+        assert not player.has_secret_for("on_spell_played")
+
+        clone = game.clone()
+        player.remove_secret(snipe)
+        assert player.secret_triggers == {"on_minion_played": 1}
+        assert clone.players[1].secret_triggers == {"on_minion_played": 2}
+
+        player.remove_secret(mirror)
+        assert player.secret_triggers == {}
+        assert not game._secrets_listen("on_minion_played")
+
+    def test_triggered_secret_is_removed(self):
+        """A secret that fires leaves play and the index."""
+        from card_effects.secrets import check_secrets
+
+        game = _small_game()
+        game.current_player_idx = 0
+        opponent = game.players[1]
+        opponent.add_secret(self._secret("EX1_289", game))  # Ice Barrier
+        assert game._secrets_listen("on_hero_attacked")
+
+        check_secrets(game, "on_hero_attacked", {})
+        assert opponent.hero.armor == 8
+        assert opponent.secrets == []
+        assert not game._secrets_listen("on_hero_attacked")
+
+
+class TestHeadlessConfig:
+    """Tests for the headless GameConfig profile."""
+
+    @staticmethod
+    def _play(config, seed):
+        """Play a seeded game of random attacks and end turns to the end."""
+        import random
+        from simulator import Player, Hero, Minion, CardData, CardType
+
+        random.seed(seed)
+        game = Game(config)
+        p1, p2 = Player("Player1"), Player("Player2")
+        for player in (p1, p2):
+            player.hero = Hero(CardData("HERO_08", "Hero", health=30, card_type=CardType.HERO))
+            player.hero.controller = player
+        game.setup(p1, p2)
+        for player in game.players:
+            for i in range(20):
+                player.add_to_deck(Minion(CardData(f"M{i}", cost=i % 5, attack=i % 4 + 1, health=i % 3 + 1,
+                                                   card_type=CardType.MINION), game))
+        game.skip_mulligan()
+
+        while not game.ended:
+            player = game.current_player
+            playable = [c for c in player.hand if player.can_play_card(c)]
+            if playable and random.random() < 0.7:
+                game.play_card(random.choice(playable))
+                continue
+            attackers = [m for m in player.board if m.can_attack()]
+            if attackers:
+                attacker = random.choice(attackers)
+                game.attack(attacker, random.choice(player.get_valid_attack_targets(attacker)))
+                continue
+            game.end_turn()
+        return game
+
+    def test_headless_profile(self):
+        """headless() turns diagnostics off and keeps other overrides."""
+        config = GameConfig.headless(max_turns=40)
+        assert not config.log_actions and not config.verbose
+        assert config.max_turns == 40
+
+    def test_same_games_without_logging(self):
+        """Seeded games play out identically; only the action log differs."""
+        for seed in range(3):
+            logged = self._play(None, seed)
+            headless = self._play(GameConfig.headless(), seed)
+            assert logged.action_history and not headless.action_history
+            assert logged.turn == headless.turn and logged.winner is not None
+            for a, b in zip(logged.players, headless.players):
+                assert a.hero.health == b.hero.health
+                assert [m.card_id for m in a.board] == [m.card_id for m in b.board]
+                assert a.cards_played_this_game == b.cards_played_this_game
+                assert a.dead_minions == b.dead_minions
+
+
+class TestSerialization:
+    """Tests for Game.to_bytes / Game.from_bytes."""
+
+    def test_round_trip(self):
+        """Zones, stats, enchantments and references survive a round trip."""
+        from simulator.zobrist import game_hash
+
+        game = _small_game()
+        game.players[1].board[0].damage = 2
+        restored = Game.from_bytes(game.to_bytes())
+
+        assert game_hash(restored) == game_hash(game)
+        for player, new_player in zip(game.players, restored.players):
+            assert new_player.game is restored
+            assert [c.card_id for c in new_player.deck] == [c.card_id for c in player.deck]
+            minion, new_minion = player.board[0], new_player.board[0]
+            assert new_minion.entity_id == minion.entity_id
+            assert (new_minion.attack, new_minion.health) == (minion.attack, minion.health)
+            assert new_minion.enchantments == minion.enchantments
+            assert new_minion.controller is new_player and new_minion.game is restored
+        assert restored.players[0].opponent is restored.players[1]
+        assert restored.players[0].hero.weapon.durability == 2
+
+    def test_round_trip_clone_with_shared_deck(self):
+        """A clone whose deck is still shared stores its own players, not the original's."""
+        game = _small_game()
+        clone = game.clone()
+        data = clone.to_bytes()
+        restored = Game.from_bytes(data)
+
+        assert len(data) <= len(game.to_bytes())
+        for player in restored.players:
+            assert [card.controller for card in player.deck] == [player] * 5
+        player = restored.players[0]
+        card, = player.draw()
+        assert card.controller is player and card in player.hand
+        assert [c.card_id for c in game.players[0].peek_deck()] == [f"DECK_{i}" for i in range(5)]
+
+    def test_restore_keeps_id_counter(self):
+        """Restoring an older buffer does not rewind the entity id counter."""
+        from simulator import Minion
+        from simulator.entities import Entity
+
+        game = _small_game()
+        data = game.to_bytes()
+        game.players[0].board.append(Minion(game.players[0].board[0].data, game))
+        next_id = Entity._next_id
+        Game.from_bytes(data)
+
+        assert Entity._next_id == next_id
+        assert game.players[0].board[-1].entity_id < next_id
+
+    def test_triggers_rebuilt_from_setup(self):
+        """Triggers come back by re-running card setup; bare callbacks are dropped."""
+        from simulator import Minion, CardData, CardType, GameConfig, Zone
+        from simulator.card_loader import load_card_effects
+
+        game = _small_game()
+        player = game.players[0]
+        acolyte = Minion(CardData("CORE_EX1_007", "Acolyte of Pain", card_set="CORE", attack=1,
+                                  health=3, card_type=CardType.MINION), game)
+        acolyte.controller = player
+        acolyte.zone = Zone.PLAY
+        player.board.append(acolyte)
+        load_card_effects(acolyte, game)
+        game.register_trigger("on_turn_end", player.board[0], _noop)
+
+        restored = Game.from_bytes(game.to_bytes(), GameConfig.headless())
+        new_acolyte = restored.players[0].board[1]
+        assert restored._triggers.describe() == [(new_acolyte, [("on_damage_taken", False)])]
+
+        hand_size = len(restored.players[0].hand)
+        restored.deal_damage(new_acolyte, 1)
+        assert len(restored.players[0].hand) == hand_size + 1
+
+    def test_rejects_other_buffers(self):
+        """Foreign buffers, other format versions and mid-choice games raise ValueError."""
+        import pickle
+        from simulator.serialization import FORMAT_VERSION, MAGIC
+
+        game = _small_game()
+        data = game.to_bytes()
+        assert data.startswith(MAGIC + bytes((FORMAT_VERSION,)))
+        with pytest.raises(ValueError):
+            Game.from_bytes(b"not a game")
+        with pytest.raises(ValueError):
+            Game.from_bytes(MAGIC + bytes((FORMAT_VERSION + 1,)) + data[len(MAGIC) + 1:])
+        with pytest.raises(ValueError):
+            # Buffers may not import anything when loaded
+            Game.from_bytes(MAGIC + bytes((FORMAT_VERSION,)) + pickle.dumps(Game))
+
+        game.start_discover(game.players[0], [], _noop)
+        with pytest.raises(ValueError):
+            game.to_bytes()
@@ -16,11 +16,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ai.model import HearthstoneModel
 from ai.encoder import FeatureEncoder
-from ai.mcts import MCTS
+from ai.mcts import MCTS, MCTSSession, TranspositionTable
 from ai.game_wrapper import HearthstoneGame
 from ai.replay_buffer import ReplayBuffer
 from ai.actions import Action
-from simulator.game import Game
+from simulator.game import Game, GameConfig
 from simulator.enums import GamePhase
 
 
@@ -33,7 +33,12 @@ def _play_game_worker(args):
     model.load_state_dict(model_state_dict)
     model.eval()
     
-    env = HearthstoneGame()
+    return _play_game(model, encoder, mcts_sims)
+
+
+def _play_game(model: HearthstoneModel, encoder: FeatureEncoder, mcts_sims: int) -> Tuple[List, int, float]:
+    """Play one self-play game; returns (trajectory, winner, TT hit rate)."""
+    env = HearthstoneGame(config=GameConfig.headless())
     # Use meta decks with proper mulligan for realistic training
     state = env.reset(randomize_first=True, use_meta_decks=True, do_mulligan=True)
     
@@ -41,10 +46,15 @@ def _play_game_worker(args):
     step_count = 0
     max_steps = 150
     
+    # One tree for the whole game: each move reuses the chosen subtree,
+    # and transposed positions share one network evaluation
+    table = TranspositionTable()
+    session = MCTSSession(MCTS(model, encoder, env.game, num_simulations=mcts_sims,
+                               transpositions=table))
+    
     while not env.is_game_over and step_count < max_steps:
         root_game_state = env.game.clone()
-        mcts = MCTS(model, encoder, root_game_state, num_simulations=mcts_sims)
-        mcts_probs = mcts.search(root_game_state)
+        mcts_probs = session.search(root_game_state)
         
         encoded_state = encoder.encode(env.get_state())
         p_id = 1 if env.current_player == env.game.players[0] else 2
@@ -52,22 +62,12 @@ def _play_game_worker(args):
         
         action_idx = np.random.choice(len(mcts_probs), p=mcts_probs)
         
-        # Apply action
-        action_obj = Action.from_index(action_idx)
-        game = env.game
-        player = env.current_player
-        
+        # Apply the action exactly as the search simulated it
         try:
-            if action_obj.action_type.name == "END_TURN":
-                game.end_turn()
-            elif action_obj.action_type.name == "PLAY_CARD":
-                if action_obj.card_index is not None and action_obj.card_index < len(player.hand):
-                    card = player.hand[action_obj.card_index]
-                    game.play_card(card, None)
-            elif action_obj.action_type.name == "HERO_POWER":
-                game.use_hero_power()
-        except:
+            env.execute_index(action_idx)
+        except Exception:
             pass
+        session.advance(action_idx, env.game)
         
         step_count += 1
     
@@ -75,13 +75,83 @@ def _play_game_worker(args):
     if env.game.winner:
         winner = 1 if env.game.winner == env.game.players[0] else 2
     
-    return trajectory, winner
+    return trajectory, winner, table.hit_rate
+
+
+class WeightStore:
+    """
+    Versioned model weights, published by the learner and picked up by actors.
+    
+    The weights are one file, replaced atomically on publish; the version
+    number is in shared memory, so actors poll it without reading the file.
+    """
+    
+    def __init__(self, path: str, ctx=None):
+        """
+        Args:
+            path: Weights file (its directory is created)
+            ctx: multiprocessing context the actors are started with
+        """
+        import multiprocessing as mp
+        self.path = path
+        self._version = (ctx or mp.get_context()).Value('i', -1)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    
+    @property
+    def version(self) -> int:
+        """Latest published version (-1 before the first publish)."""
+        return self._version.value
+    
+    def publish(self, state_dict) -> int:
+        """Write new weights (moved to CPU); returns their version."""
+        version = self._version.value + 1
+        weights = {k: v.detach().cpu() for k, v in state_dict.items()}
+        tmp_path = self.path + ".tmp"
+        torch.save({'version': version, 'state_dict': weights}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._version.value = version
+        return version
+    
+    def load(self) -> Tuple[dict, int]:
+        """(state_dict, version) of the latest weights."""
+        data = torch.load(self.path, map_location='cpu')
+        return data['state_dict'], data['version']
+
+
+def run_actor(actor_id: int, buffer: ReplayBuffer, weights: WeightStore, stats, stop,
+              mcts_sims: int, input_dim: int, action_dim: int):
+    """
+    Actor process: play self-play games into a shared replay buffer until
+    `stop` is set, switching to the latest weights between games.
+    
+    After each game, (actor_id, weights version, samples, seconds, winner)
+    is put on the `stats` queue.
+    """
+    np.random.seed()  # Actors must not share the parent's random stream
+    torch.set_num_threads(1)  # One core per actor
+    
+    model = HearthstoneModel(input_dim=input_dim, action_dim=action_dim)
+    model.eval()
+    encoder = FeatureEncoder()
+    version = -1
+    
+    while not stop.is_set():
+        if weights.version != version:
+            state_dict, version = weights.load()
+            model.load_state_dict(state_dict)
+        
+        start_time = time.time()
+        trajectory, winner, _ = _play_game(model, encoder, mcts_sims)
+        buffer.add_game(trajectory, winner)
+        stats.put((actor_id, version, len(trajectory), time.time() - start_time, winner))
+
 
 class DataCollector:
     def __init__(self, model: HearthstoneModel, buffer: ReplayBuffer):
         self.model = model
         self.buffer = buffer
         self.encoder = FeatureEncoder()
+        self.last_tt_hit_rate = 0.0
         
     def collect_games(self, num_games: int, mcts_sims: int = 25, num_workers: int = None):
         """
@@ -106,12 +176,12 @@ class DataCollector:
                 results = []
                 
                 for i, result in enumerate(pool.imap_unordered(_play_game_worker, args)):
-                    trajectory, winner = result
+                    trajectory, winner, tt_hit_rate = result
                     self.buffer.add_game(trajectory, winner)
                     
                     elapsed = time.time() - start_time
                     avg_time = elapsed / (i + 1)
-                    print(f"Game {i+1}/{num_games} completed. Winner: Player {winner}. Buffer size: {len(self.buffer)}. Avg Time/Game: {avg_time:.2f}s")
+                    print(f"Game {i+1}/{num_games} completed. Winner: Player {winner}. Buffer size: {len(self.buffer)}. Avg Time/Game: {avg_time:.2f}s. TT hit rate: {tt_hit_rate:.1%}")
         else:
             # Sequential fallback
             for g in range(num_games):
@@ -120,11 +190,11 @@ class DataCollector:
                 
                 elapsed = time.time() - start_time
                 avg_time = elapsed / (g + 1)
-                print(f"Game {g+1}/{num_games} completed. Winner: Player {winner}. Buffer size: {len(self.buffer)}. Avg Time/Game: {avg_time:.2f}s")
+                print(f"Game {g+1}/{num_games} completed. Winner: Player {winner}. Buffer size: {len(self.buffer)}. Avg Time/Game: {avg_time:.2f}s. TT hit rate: {self.last_tt_hit_rate:.1%}")
             
     def _play_single_game(self, mcts_sims: int, game_idx: int) -> Tuple[List, int]:
         """Plays one game returning (trajectory, winner_id)."""
-        env = HearthstoneGame()
+        env = HearthstoneGame(config=GameConfig.headless())
         # Use meta decks with proper mulligan for realistic training
         state = env.reset(randomize_first=True, use_meta_decks=True, do_mulligan=True)
         
@@ -134,17 +204,21 @@ class DataCollector:
         step_count = 0
         max_steps = 150 # Prevent infinite loops
         
+        # One tree for the whole game: each move reuses the chosen subtree,
+        # and transposed positions share one network evaluation
+        table = TranspositionTable()
+        session = MCTSSession(MCTS(self.model, self.encoder, env.game, num_simulations=mcts_sims,
+                                   transpositions=table))
+        
         while not env.is_game_over and step_count < max_steps:
             # Prepare MCTS
             # Helper to clone the exact underlying game state properly for MCTS root
             # Note: MCTS expects `game` object as root state currently per my tests
             root_game_state = env.game.clone()
             
-            mcts = MCTS(self.model, self.encoder, root_game_state, num_simulations=mcts_sims)
-            
             # Run MCTS to get policy
-            # Note: mcts.search() expects the root state (Game object)
-            mcts_probs = mcts.search(root_game_state)
+            # Note: search() expects the root state (Game object)
+            mcts_probs = session.search(root_game_state)
             
             # Store data
             # We want to store the ENCODED state for training later
@@ -166,6 +240,7 @@ class DataCollector:
             
             # Execute action
             self._apply_action_to_env(env, action_idx)
+            session.advance(action_idx, env.game)
             
             step_count += 1
             
@@ -173,28 +248,15 @@ class DataCollector:
         winner = 0
         if env.game.winner:
             winner = 1 if env.game.winner == env.game.players[0] else 2
-            
+        
+        self.last_tt_hit_rate = table.hit_rate
         return trajectory, winner
     
     def _apply_action_to_env(self, env: HearthstoneGame, action_idx: int):
         """Translates index to execution on the real environment."""
-        action_obj = Action.from_index(action_idx)
-        game = env.game
-        player = env.current_player
-        
-        # Logic similar to MCTS._apply_action but on real game
+        # Same action (card, attacker and target) as MCTS._apply_action
         try:
-            if action_obj.action_type.name == "END_TURN":
-                game.end_turn()
-            elif action_obj.action_type.name == "PLAY_CARD":
-                if action_obj.card_index is not None and action_obj.card_index < len(player.hand):
-                    card = player.hand[action_obj.card_index]
-                    target = None
-                    # TODO: Target resolution (simplified for now)
-                    game.play_card(card, target)
-            elif action_obj.action_type.name == "HERO_POWER":
-                game.use_hero_power()
-            # Attack logic...
+            env.execute_index(action_idx)
         except Exception as e:
             # Fallback if action fails (illegal move selected despite masking? or logic error)
             # print(f"Action failed: {e}")
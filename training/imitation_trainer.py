@@ -14,7 +14,7 @@ os.environ['PYTORCH_ENABLE_MPS_FALLBACK'] = '1'
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset, DataLoader, BatchSampler, RandomSampler, SequentialSampler
 import numpy as np
 from typing import List, Tuple, Optional
 import time
@@ -28,6 +28,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ai.transformer_model import CardTransformer, SequenceEncoder
 from ai.device import get_best_device
+from training.shards import ShardReader, is_shard_dir
 
 
 class ReplayDataset(Dataset):
@@ -133,6 +134,90 @@ class ReplayDataset(Dataset):
         return card_ids, card_features, attention_mask, action_label, game_outcome
 
 
+class MemmapReplayDataset(Dataset):
+    """
+    Disk-backed dataset over binary training data, served a batch at a time.
+    
+    Reads either the directory written by scripts/convert_to_binary.py
+    (metadata.json + card_ids/card_features/labels/outcomes.npy memmaps) or
+    a sharded dataset (training/shards.py). Samples are never loaded as a
+    whole: `dataset[batch_indices]` gathers one batch with a single fancy
+    index per column, so a DataLoader over `batch_sampler` collates nothing
+    and datasets larger than RAM train at disk speed.
+    
+    The memmaps are opened lazily in each process, so DataLoader workers
+    prefetch batches without copying the data.
+    """
+    
+    def __init__(self, data_dir: str, indices: Optional[np.ndarray] = None):
+        """
+        Args:
+            data_dir: Binary dataset directory
+            indices: Rows of the dataset to use (default: all), e.g. a split
+        """
+        self.data_dir = data_dir
+        self._arrays = None
+        self.num_rows = self._open()[2].shape[0]
+        self.indices = np.arange(self.num_rows) if indices is None else np.asarray(indices)
+    
+    def _open(self):
+        """(card_ids, card_features, labels, outcomes) arrays, opened once per process."""
+        if self._arrays is None:
+            if is_shard_dir(self.data_dir):
+                self._arrays = ShardReader(self.data_dir).arrays()
+            else:
+                with open(os.path.join(self.data_dir, "metadata.json")) as f:
+                    meta = json.load(f)
+                shapes = meta['shapes']
+                self._arrays = tuple(
+                    np.memmap(os.path.join(self.data_dir, f"{name}.npy"), dtype=dtype, mode='r',
+                              shape=tuple(shapes[name]))
+                    for name, dtype in (('card_ids', np.int32), ('card_features', np.float32),
+                                        ('labels', np.int32), ('outcomes', np.float32))
+                )
+        return self._arrays
+    
+    def __getstate__(self):
+        # Workers reopen the memmaps instead of receiving pickled copies
+        state = self.__dict__.copy()
+        state['_arrays'] = None
+        return state
+    
+    def split(self, fraction: float = 0.9) -> Tuple['MemmapReplayDataset', 'MemmapReplayDataset']:
+        """(first fraction, rest) of the rows, as two datasets."""
+        cut = int(len(self.indices) * fraction)
+        return (MemmapReplayDataset(self.data_dir, self.indices[:cut]),
+                MemmapReplayDataset(self.data_dir, self.indices[cut:]))
+    
+    def __len__(self):
+        return len(self.indices)
+    
+    def __getitem__(self, batch) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        # Sorted rows read the memmaps front to back; order within a batch does not matter
+        rows = np.sort(self.indices[np.asarray(batch)])
+        card_ids, card_features, labels, outcomes = self._open()
+        card_ids = torch.from_numpy(np.asarray(card_ids[rows], dtype=np.int64))
+        return (card_ids,
+                torch.from_numpy(np.asarray(card_features[rows])),
+                card_ids != 0,
+                torch.from_numpy(np.asarray(labels[rows], dtype=np.int64)),
+                torch.from_numpy(np.asarray(outcomes[rows], dtype=np.float32).reshape(-1)))
+    
+    def loader(self, batch_size: int, shuffle: bool = True, num_workers: int = 4,
+               pin_memory: bool = False) -> DataLoader:
+        """DataLoader yielding whole batches (one dataset read per batch)."""
+        sampler = RandomSampler(self) if shuffle else SequentialSampler(self)
+        return DataLoader(
+            self,
+            sampler=BatchSampler(sampler, batch_size, drop_last=False),
+            batch_size=None,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=num_workers > 0,
+            prefetch_factor=4 if num_workers > 0 else None,
+        )
+
+
 class ImitationTrainer:
     """
     Trains CardTransformer using behavior cloning.
@@ -268,33 +353,44 @@ class ImitationTrainer:
         return avg_loss, accuracy
     
     def train(self,
-              train_data: List[dict],
-              val_data: List[dict] = None,
+              train_data,
+              val_data = None,
               num_epochs: int = 50,
               save_path: str = "models/transformer_model.pt",
-              gpu_cache: bool = False):
+              gpu_cache: bool = False,
+              num_workers: int = 4):
         """
         Full training loop.
         
         Args:
-            train_data: List of training samples
-            val_data: Optional validation samples
+            train_data: List of training samples, or a MemmapReplayDataset
+            val_data: Optional validation samples (same kind)
             num_epochs: Number of training epochs
             save_path: Path to save best model
             gpu_cache: Whether to cache dataset in VRAM
+            num_workers: DataLoader workers for a MemmapReplayDataset
         """
         # Set instance flag for train_epoch
         self.gpu_cache = gpu_cache
         
-        train_dataset = ReplayDataset(data=train_data, device=self.device, gpu_cache=self.gpu_cache)
-        # If caching on GPU, num_workers MUST be 0
-        workers = 0 if self.gpu_cache else 4
-        train_loader = DataLoader(train_dataset, batch_size=self.batch_size, shuffle=True, num_workers=workers)
-        
-        val_loader = None
-        if val_data:
-            val_dataset = ReplayDataset(data=val_data, device=self.device, gpu_cache=self.gpu_cache)
-            val_loader = DataLoader(val_dataset, batch_size=self.batch_size, num_workers=workers)
+        if isinstance(train_data, MemmapReplayDataset):
+            # Disk-backed: whole batches per read, prefetched by workers
+            self.gpu_cache = False
+            pin = self.device.type == 'cuda'
+            train_loader = train_data.loader(self.batch_size, shuffle=True, num_workers=num_workers, pin_memory=pin)
+            val_loader = None
+            if val_data is not None and len(val_data):
+                val_loader = val_data.loader(self.batch_size, shuffle=False, num_workers=num_workers, pin_memory=pin)
+        else:
+            train_dataset = ReplayDataset(data=train_data, device=self.device, gpu_cache=self.gpu_cache)
+            # If caching on GPU, num_workers MUST be 0
+            workers = 0 if self.gpu_cache else 4
+            train_loader = DataLoader(train_dataset, batch_size=self.batch_size, shuffle=True, num_workers=workers)
+            
+            val_loader = None
+            if val_data:
+                val_dataset = ReplayDataset(data=val_data, device=self.device, gpu_cache=self.gpu_cache)
+                val_loader = DataLoader(val_dataset, batch_size=self.batch_size, num_workers=workers)
         
         best_val_loss = float('inf')
         best_val_acc = 0.0
@@ -385,7 +481,8 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='Train Transformer with Imitation Learning')
-    parser.add_argument('--data', type=str, help='Path to training data JSON')
+    parser.add_argument('--data', type=str, help='Path to training data JSON, or a binary/sharded dataset directory')
+    parser.add_argument('--workers', type=int, default=4, help='Batch prefetch workers for binary datasets')
     parser.add_argument('--epochs', type=int, default=50, help='Training epochs')
     parser.add_argument('--batch-size', type=int, default=32, help='Batch size')
     parser.add_argument('--lr', type=float, default=1e-4, help='Learning rate')
@@ -403,6 +500,9 @@ if __name__ == "__main__":
         print("Using dummy data for testing...")
         train_data = create_dummy_training_data(1000)
         val_data = create_dummy_training_data(200)
+    elif args.data and os.path.isdir(args.data):
+        train_data, val_data = MemmapReplayDataset(args.data).split(0.9)
+        print(f"Memory-mapped {len(train_data) + len(val_data)} samples from {args.data}")
     elif args.data:
         with open(args.data, 'r') as f:
             content = json.load(f)
@@ -432,4 +532,5 @@ if __name__ == "__main__":
         model = CardTransformer()
     
     trainer = ImitationTrainer(model, learning_rate=args.lr, batch_size=args.batch_size)
-    trainer.train(train_data, val_data, num_epochs=args.epochs, save_path=args.output, gpu_cache=args.gpu_cache)
+    trainer.train(train_data, val_data, num_epochs=args.epochs, save_path=args.output, gpu_cache=args.gpu_cache,
+                  num_workers=args.workers)
@@ -20,67 +20,14 @@ import ijson
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ai.mlx_transformer_model import CardTransformer
+from training.shards import MANIFEST_FILE, ShardReader, ShardedArray, convert_json, is_shard_dir
 
 
 def convert_json_to_binary(input_path, output_dir, seq_len=24):
-    """Convert JSON dataset to binary memmap format (inline version)."""
-    os.makedirs(output_dir, exist_ok=True)
-    
+    """Convert JSON dataset to a sharded binary dataset (single streaming pass)."""
     print(f"Converting JSON to binary format...")
-    num_samples = 0
-    has_samples_key = False
-    
-    with open(input_path, 'rb') as f:
-        chunk = f.read(2048)
-        if b'"samples":' in chunk:
-            has_samples_key = True
-    
-    prefix = "samples.item" if has_samples_key else "item"
-    
-    # Count samples
-    with open(input_path, 'rb') as f:
-        for _ in ijson.items(f, prefix):
-            num_samples += 1
-    print(f"  Found {num_samples} samples")
-    
-    # Create memmaps
-    mm_ids = np.memmap(os.path.join(output_dir, "card_ids.npy"), dtype='int32', mode='w+', shape=(num_samples, seq_len))
-    mm_feats = np.memmap(os.path.join(output_dir, "card_features.npy"), dtype='float32', mode='w+', shape=(num_samples, seq_len, 11))
-    mm_lbls = np.memmap(os.path.join(output_dir, "labels.npy"), dtype='int32', mode='w+', shape=(num_samples,))
-    mm_outs = np.memmap(os.path.join(output_dir, "outcomes.npy"), dtype='float32', mode='w+', shape=(num_samples, 1))
-    
-    # Stream data
-    with open(input_path, 'rb') as f:
-        idx = 0
-        for s in ijson.items(f, prefix):
-            c_ids = s.get('card_ids', [])
-            ln = min(len(c_ids), seq_len)
-            if ln > 0:
-                mm_ids[idx, :ln] = c_ids[:ln]
-            
-            c_feats = s.get('card_features', [])
-            if c_feats:
-                feat_arr = np.array(c_feats, dtype=np.float32)
-                ln = min(feat_arr.shape[0], seq_len)
-                if ln > 0:
-                    mm_feats[idx, :ln] = feat_arr[:ln]
-            
-            mm_lbls[idx] = s.get('action_label', 0)
-            mm_outs[idx] = s.get('game_outcome', 0.0)
-            idx += 1
-            
-            if idx % 10000 == 0:
-                sys.stdout.write(f"\r  Processed {idx}/{num_samples}...")
-                sys.stdout.flush()
-    
-    # Flush and save metadata
-    mm_ids.flush(); mm_feats.flush(); mm_lbls.flush(); mm_outs.flush()
-    
-    meta = {'num_samples': num_samples, 'seq_len': seq_len, 'feature_dim': 11}
-    with open(os.path.join(output_dir, "metadata.json"), 'w') as f:
-        json.dump(meta, f)
-    
-    print(f"\n  Conversion complete ({num_samples} samples)")
+    num_samples = convert_json([input_path], output_dir, seq_len=seq_len)
+    print(f"  Conversion complete ({num_samples} samples)")
     return output_dir
 
 
@@ -126,7 +73,7 @@ def batch_iterate(batch_size, *args):
     perm = np.random.permutation(num_samples)
     for i in range(0, num_samples, batch_size):
         ids = perm[i : i + batch_size]
-        yield tuple(arg[ids] if isinstance(arg, (np.ndarray, np.generic)) else arg[mx.array(ids)] for arg in args)
+        yield tuple(arg[ids] if isinstance(arg, (np.ndarray, np.generic, ShardedArray)) else arg[mx.array(ids)] for arg in args)
 
 class MLXImitationTrainer:
     def __init__(self, model, learning_rate=1e-4):
@@ -220,7 +167,12 @@ class MLXImitationTrainer:
 
         # ... loading logic ...
         use_memmap = False
-        if os.path.isdir(data_path) and os.path.exists(os.path.join(data_path, "metadata.json")):
+        if is_shard_dir(data_path):
+            print("Detected Sharded Binary Dataset (Disk-Based Training)")
+            t_ids, t_feats, t_lbls, t_outs = ShardReader(data_path).arrays()
+            t_mask = None
+            use_memmap = True
+        elif os.path.isdir(data_path) and os.path.exists(os.path.join(data_path, "metadata.json")):
             print("Detected Binary Memmap Dataset (Disk-Based Training)")
             t_ids, t_feats, t_lbls, t_outs = self.load_memmap_dataset(data_path)
             t_mask = None 
@@ -315,6 +267,8 @@ class MLXImitationTrainer:
             for i in range(0, len(v_ids), batch_size):
                 end = min(i + batch_size, len(v_ids))
                 vb_ids, vb_feats, vb_lbls = v_ids[i:end], v_feats[i:end], v_lbls[i:end]
+                if use_memmap:
+                    vb_ids, vb_feats, vb_lbls = np.asarray(vb_ids), np.asarray(vb_feats), np.asarray(vb_lbls)
                 vb_ids, vb_feats, vb_lbls = mx.array(vb_ids), mx.array(vb_feats), mx.array(vb_lbls)
                 vb_mask = (vb_ids != 0)
                 
@@ -342,7 +296,7 @@ class MLXImitationTrainer:
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="MLX Imitation Trainer (Apple Silicon)")
-    parser.add_argument('--data', type=str, required=True, help="JSON or binary data path")
+    parser.add_argument('--data', type=str, required=True, help="JSON, binary or sharded dataset path")
     parser.add_argument('--epochs', type=int, default=100)
     parser.add_argument('--batch-size', type=int, default=1024)
     parser.add_argument('--large', action='store_true')
@@ -363,7 +317,7 @@ if __name__ == "__main__":
         cache_dir = data_path.replace('.json', '_mlx_cache')
         
         # Check if cache exists and is up-to-date
-        meta_path = os.path.join(cache_dir, "metadata.json")
+        meta_path = os.path.join(cache_dir, MANIFEST_FILE)
         json_mtime = os.path.getmtime(data_path) if os.path.exists(data_path) else 0
         cache_mtime = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0
         
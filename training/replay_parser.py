@@ -3,13 +3,19 @@ HSReplay Parser for HearthstoneOne AI.
 
 Parses HSReplay XML files to extract (GameState, Action) pairs
 for imitation learning (behavior cloning).
+
+StreamingReplayParser reads replays incrementally (iterparse) and records
+per-turn state deltas; parse_replays_to_shards fans a directory of replays
+out over worker processes and writes the samples to binary shards.
 """
 
 import os
 import xml.etree.ElementTree as ET
-from typing import List, Tuple, Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional, Dict, Any, Iterator, Sequence
 from dataclasses import dataclass, field
 import json
+import numpy as np
 
 # Path setup
 import sys
@@ -41,6 +47,8 @@ class ReplayTurn:
     actions: List[ReplayAction] = field(default_factory=list)
     # Game state at start of turn (for training)
     state_snapshot: Optional[Dict] = None
+    # Or, from StreamingReplayParser: entities changed since the previous turn
+    state_delta: Optional[Dict] = None
 
 
 @dataclass 
@@ -53,6 +61,23 @@ class ParsedReplay:
     player2_deck: List[str]
     winner: int  # 1 or 2
     turns: List[ReplayTurn] = field(default_factory=list)
+    
+    def iter_snapshots(self) -> Iterator[Tuple[ReplayTurn, Dict]]:
+        """
+        (turn, state at start of turn) for every turn with a state.
+        
+        Deltas are applied to one running state, which is yielded as is:
+        use it before advancing the iterator, or copy it.
+        """
+        state = {'entities': {}, 'players': {}, 'current_player': 1}
+        for turn in self.turns:
+            if turn.state_snapshot is not None:
+                yield turn, turn.state_snapshot
+            elif turn.state_delta is not None:
+                state['entities'].update(turn.state_delta['entities'])
+                state['players'] = turn.state_delta['players']
+                state['current_player'] = turn.state_delta['current_player']
+                yield turn, state
 
 
 class HSReplayParser:
@@ -318,6 +343,186 @@ class HSReplayParser:
                 self.entities[entity_id]['controller'] = value
 
 
+# GameTag -> entity key, for tags tracked in parser state
+_ENTITY_TAGS = {
+    49: 'zone',        # ZONE
+    50: 'controller',  # CONTROLLER
+    48: 'cost',        # COST
+    47: 'attack',      # ATK
+    45: 'health',      # HEALTH
+    202: 'card_type',  # CARDTYPE
+}
+
+
+class StreamingReplayParser(HSReplayParser):
+    """
+    HSReplay parser that streams the XML instead of loading the tree.
+    
+    Elements are handled as iterparse reaches them and top-level elements
+    are cleared once processed, so memory stays flat however long the
+    replay is. Tag changes are applied at any depth (turn changes and
+    deaths happen inside blocks), and revealed entities (ShowEntity) get
+    their card IDs.
+    
+    Instead of a full state copy per turn, each ReplayTurn gets a
+    state_delta with copies of only the entities changed since the
+    previous turn; ParsedReplay.iter_snapshots rebuilds the states.
+    """
+    
+    def parse_file(self, filepath: str) -> Optional[ParsedReplay]:
+        """Parse an HSReplay XML file."""
+        try:
+            with open(filepath, 'rb') as f:
+                replay = self._parse_stream(f, filepath)
+            if replay is None:
+                print(f"No Game element in {filepath}")
+            return replay
+        except ET.ParseError as e:
+            print(f"XML parse error in {filepath}: {e}")
+            return None
+        except Exception as e:
+            print(f"Error parsing {filepath}: {e}")
+            return None
+    
+    def _parse_stream(self, source, filepath: str) -> Optional[ParsedReplay]:
+        self.entities = {}
+        self.players = {}
+        self.current_turn = 0
+        self.current_player = 1
+        self._dirty = set()
+        
+        replay = ParsedReplay(
+            game_id=os.path.basename(filepath),
+            player1_class="Unknown",
+            player2_class="Unknown",
+            player1_deck=[],
+            player2_deck=[],
+            winner=0,
+            turns=[]
+        )
+        current_turn = self._new_turn(0, {})
+        
+        game_elem = None
+        depth = 0
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if game_elem is None:
+                    if elem.tag == 'Game':
+                        game_elem, game_depth = elem, depth
+                elif elem.tag == 'TagChange':
+                    current_turn = self._stream_tag_change(elem, replay, current_turn)
+                elif elem.tag == 'Block' or elem.tag == 'Action':
+                    self._parse_block_start(elem, current_turn)
+                continue
+            
+            depth -= 1
+            if game_elem is None:
+                continue
+            if elem is game_elem:
+                break
+            tag = elem.tag
+            if tag == 'FullEntity':
+                self._parse_entity(elem)
+                self._dirty.add(int(elem.get('id', 0)))
+            elif tag == 'ShowEntity' or tag == 'ChangeEntity':
+                self._reveal_entity(elem)
+            elif tag == 'Player' and depth == game_depth:
+                self._parse_player(elem, replay)
+            if depth == game_depth:
+                # Top-level element done: drop it (and its subtree)
+                game_elem.clear()
+        
+        if game_elem is None:
+            return None
+        if current_turn.actions:
+            replay.turns.append(current_turn)
+        return replay
+    
+    def _new_turn(self, turn_number: int, entities: Dict[int, Dict]) -> ReplayTurn:
+        """Start a turn, adding copies of the entities changed since the last delta."""
+        for entity_id in self._dirty:
+            entities[entity_id] = self.entities[entity_id].copy()
+        self._dirty.clear()
+        self.current_turn = turn_number
+        return ReplayTurn(
+            turn_number=turn_number,
+            player=self.current_player,
+            state_delta={
+                'entities': entities,
+                'players': {k: v.copy() for k, v in self.players.items()},
+                'current_player': self.current_player,
+            }
+        )
+    
+    def _stream_tag_change(self, elem: ET.Element, replay: ParsedReplay,
+                           current_turn: ReplayTurn) -> ReplayTurn:
+        """Apply a TagChange; returns the (possibly new) current turn."""
+        try:
+            entity_id = int(elem.get('entity', 0))
+            tag_id = int(elem.get('tag', 0))
+            value = int(elem.get('value', 0))
+        except ValueError:
+            return current_turn
+        
+        if tag_id == 20:  # GameTag.TURN
+            if current_turn.actions:
+                replay.turns.append(current_turn)
+                carried = {}
+            else:
+                # Turns without actions are dropped; keep their changes
+                carried = current_turn.state_delta['entities']
+            current_turn = self._new_turn(value, carried)
+        elif tag_id == 23 and value == 1:  # GameTag.CURRENT_PLAYER
+            for pid, pdata in self.players.items():
+                if pdata['entity_id'] == entity_id:
+                    self.current_player = pid
+                    current_turn.player = pid
+                    current_turn.state_delta['current_player'] = pid
+        elif tag_id == 17 and value == 4:  # GameTag.PLAYSTATE (WON)
+            for pid, pdata in self.players.items():
+                if pdata['entity_id'] == entity_id:
+                    replay.winner = pid
+        
+        key = _ENTITY_TAGS.get(tag_id)
+        if key is not None and entity_id in self.entities:
+            self.entities[entity_id][key] = value
+            self._dirty.add(entity_id)
+        return current_turn
+    
+    def _parse_block_start(self, elem: ET.Element, current_turn: ReplayTurn):
+        """Record a PLAY block (its children are handled as they stream in)."""
+        action_entity_id = elem.get('entity')
+        if elem.get('type') != '7' or not action_entity_id or not action_entity_id.isdigit():
+            return
+        entity = self.entities.get(int(action_entity_id))
+        if entity and entity.get('card_id'):
+            current_turn.actions.append(ReplayAction(
+                action_type="PLAY_CARD",
+                card_id=entity['card_id'],
+                player=self.current_player
+            ))
+    
+    def _reveal_entity(self, elem: ET.Element):
+        """ShowEntity / ChangeEntity: card ID and tags of a known entity."""
+        try:
+            entity_id = int(elem.get('entity', 0))
+        except ValueError:
+            return
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            return
+        entity['card_id'] = elem.get('cardID') or entity['card_id']
+        for tag in elem.findall('Tag'):
+            key = _ENTITY_TAGS.get(int(tag.get('tag', 0)))
+            if key is not None:
+                try:
+                    entity[key] = int(tag.get('value', 0))
+                except ValueError:
+                    continue
+        self._dirty.add(entity_id)
+
+
 class MockCard:
     """Mock Card object for SequenceEncoder."""
     def __init__(self, data):
@@ -358,6 +563,35 @@ class MockGameState:
         self.enemy_player = MockPlayer(snapshot['entities'], enemy_id)
 
 
+def encode_replay(replay: ParsedReplay, encoder) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Encode the card plays of a replay with a SequenceEncoder.
+    
+    Returns:
+        (card_ids [n, seq_len], card_features [n, seq_len, 11], outcomes [n])
+    """
+    states = []
+    outcomes = []
+    if replay.winner != 0:
+        for turn, snapshot in replay.iter_snapshots():
+            views = {}  # One encoded view per player and turn
+            for action in turn.actions:
+                if action.action_type == "PLAY_CARD" and action.card_id:
+                    pid = action.player
+                    if pid not in views:
+                        views[pid] = MockGameState(snapshot, pid)
+                    states.append(views[pid])
+                    outcomes.append(1.0 if replay.winner == pid else -1.0)
+    
+    if not states:
+        seq_len = encoder.seq_len
+        return (np.zeros((0, seq_len), dtype=np.int64),
+                np.zeros((0, seq_len, encoder.NUM_FEATURES), dtype=np.float32),
+                np.zeros(0, dtype=np.float32))
+    card_ids, features, _ = encoder.encode_many(states)
+    return card_ids.numpy(), features.numpy(), np.array(outcomes, dtype=np.float32)
+
+
 def extract_training_pairs(replays: List[ParsedReplay]) -> List[Dict]:
     """
     Extract processed training samples with tensors.
@@ -366,49 +600,96 @@ def extract_training_pairs(replays: List[ParsedReplay]) -> List[Dict]:
     encoder = SequenceEncoder()
     samples = []
     
-    # 1=PLAY, 2=DECK, 3=HAND, 4=GRAVEYARD
-    
     for replay in replays:
-        if replay.winner == 0: continue
-        
-        for turn in replay.turns:
-            if not turn.state_snapshot: continue
-            
-            for action in turn.actions:
-                if action.action_type == "PLAY_CARD" and action.card_id:
-                    # Create MockGameState from snapshot
-                    try:
-                        # Find player ID from snapshot or action
-                        pid = action.player
-                        
-                        # Reconstruct state
-                        game_state = MockGameState(turn.state_snapshot, pid)
-                        
-                        # Encode
-                        card_ids, features, mask = encoder.encode(game_state)
-                        
-                        # Create sample
-                        sample = {
-                            'card_ids': card_ids.tolist(),
-                            'card_features': features.tolist(),
-                            'action_label': 0, # Should map action.card_id to index 
-                            'game_outcome': 1.0 if replay.winner == pid else -1.0
-                        }
-                        samples.append(sample)
-                    except Exception as e:
-                        # print(f"Error encoding sample: {e}")
-                        pass
+        try:
+            card_ids, features, outcomes = encode_replay(replay, encoder)
+        except Exception as e:
+            # Skip the replay rather than failing the whole run
+            print(f"Error encoding {replay.game_id}: {e}")
+            continue
+        for i in range(len(outcomes)):
+            samples.append({
+                'card_ids': card_ids[i].tolist(),
+                'card_features': features[i].tolist(),
+                'action_label': 0,  # Should map action.card_id to index
+                'game_outcome': float(outcomes[i])
+            })
     
     return samples
 
 
+# SequenceEncoder of a worker process (built on first use)
+_worker_encoder = None
+
+
+def _parse_replay_file(filepath: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Parse and encode one replay (runs in a worker process)."""
+    global _worker_encoder
+    if _worker_encoder is None:
+        from ai.transformer_model import SequenceEncoder
+        _worker_encoder = SequenceEncoder()
+    replay = StreamingReplayParser().parse_file(filepath)
+    if replay is None:
+        return None
+    try:
+        return encode_replay(replay, _worker_encoder)
+    except Exception as e:
+        # Skip the replay like an unparseable one, rather than failing the run
+        print(f"Error encoding {filepath}: {e}")
+        return None
+
+
+def parse_replays_to_shards(paths: Sequence[str], output_dir: str, workers: Optional[int] = None,
+                            shard_size: int = 65536) -> Tuple[int, int]:
+    """
+    Parse replay files in parallel and write their samples to a sharded dataset.
+    
+    Workers parse and encode whole replays; the samples are written in
+    input order by this process.
+    
+    Args:
+        paths: HSReplay XML files
+        output_dir: Dataset directory (see training/shards.py)
+        workers: Worker processes (default: CPU count; 1 parses in-process)
+        shard_size: Samples per shard
+    
+    Returns:
+        (replays parsed, samples written)
+    """
+    from training.shards import ShardWriter
+    
+    parsed = 0
+    with ShardWriter(output_dir, shard_size=shard_size) as writer:
+        if workers == 1:
+            results = map(_parse_replay_file, paths)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, min(64, len(paths) // (4 * (workers or os.cpu_count() or 1))))
+            results = pool.map(_parse_replay_file, paths, chunksize=chunksize)
+        try:
+            for result in results:
+                if result is None:
+                    continue
+                parsed += 1
+                card_ids, features, outcomes = result
+                for i in range(len(outcomes)):
+                    writer.add(card_ids[i], features[i], 0, outcomes[i])
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        writer.metadata['num_replays'] = parsed
+    return parsed, len(writer)
+
+
 if __name__ == "__main__":
     import argparse
+    import time
     from pathlib import Path
     
     def parse_replay_directory(directory: str, max_files: int) -> List[ParsedReplay]:
         """Parse all XML files in a directory."""
-        parser = HSReplayParser()
+        parser = StreamingReplayParser()
         replays = []
         
         xml_files = list(Path(directory).glob('*.xml'))[:max_files]
@@ -427,24 +708,39 @@ if __name__ == "__main__":
     
     arg_parser = argparse.ArgumentParser(description='Parse HSReplay files')
     arg_parser.add_argument('directory', help='Directory containing .xml replay files')
-    arg_parser.add_argument('--max-files', type=int, default=100, help='Max files to parse')
-    arg_parser.add_argument('--output', type=str, default='replay_data.json', help='Output file')
+    arg_parser.add_argument('--max-files', type=int, default=100, help='Max files to parse (0 = all)')
+    arg_parser.add_argument('--output', type=str, default='data/replay_data',
+                            help='Output dataset directory (binary shards), or a .json file')
+    arg_parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    arg_parser.add_argument('--shard-size', type=int, default=65536, help='Samples per shard')
     
     args = arg_parser.parse_args()
+    max_files = args.max_files or None
     
-    replays = parse_replay_directory(args.directory, args.max_files)
-    pairs = extract_training_pairs(replays)
-    
-    print(f"\nExtracted {len(pairs)} training pairs")
-    
-    # Save summary
-    summary = {
-        'num_replays': len(replays),
-        'num_pairs': len(pairs),
-        'pairs': pairs  # Save actual pairs for training
-    }
-    
-    with open(args.output, 'w') as f:
-        json.dump(summary, f, indent=2)
+    if args.output.endswith('.json'):
+        replays = parse_replay_directory(args.directory, max_files)
+        pairs = extract_training_pairs(replays)
+        
+        print(f"\nExtracted {len(pairs)} training pairs")
+        
+        # Save summary
+        summary = {
+            'num_replays': len(replays),
+            'num_pairs': len(pairs),
+            'pairs': pairs  # Save actual pairs for training
+        }
+        
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+    else:
+        xml_files = sorted(str(p) for p in Path(args.directory).glob('*.xml'))[:max_files]
+        print(f"Found {len(xml_files)} XML files in {args.directory}")
+        
+        start_time = time.time()
+        num_replays, num_samples = parse_replays_to_shards(
+            xml_files, args.output, workers=args.workers, shard_size=args.shard_size)
+        elapsed = time.time() - start_time
+        print(f"\nParsed {num_replays} replays into {num_samples} samples "
+              f"in {elapsed:.1f}s ({num_replays / max(elapsed, 1e-9):.1f} replays/s)")
     
     print(f"Data saved to {args.output}")
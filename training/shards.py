@@ -0,0 +1,386 @@
+"""
+Sharded binary datasets for HearthstoneOne imitation / self-play training.
+
+A dataset is a directory of fixed-size shards plus a manifest:
+
+    manifest.json
+    shard_00000/card_ids.npy        int32   [n, seq_len]
+    shard_00000/card_features.npy   float32 [n, seq_len, feature_dim]
+    shard_00000/labels.npy          int32   [n]
+    shard_00000/outcomes.npy        float32 [n, 1]
+    shard_00001/...
+
+ShardWriter fills one shard in memory and writes it out when it is full,
+so memory stays bounded however many games are generated, and a crash
+loses at most the shard being filled: the manifest is rewritten after every
+shard and only lists complete ones. ShardReader memory-maps the shards, so
+training reads samples straight from disk.
+
+Shard directories are self-contained, so datasets are combined by moving
+shards (append_shards) and trimmed by deleting old ones (drop_oldest_shards)
+rather than rewriting samples.
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+MANIFEST_FILE = "manifest.json"
+
+# Bump whenever the shard layout changes
+SHARD_FORMAT = 1
+
+# SequenceEncoder layout (MAX_SEQUENCE_LENGTH, card feature size)
+SEQ_LEN = 24
+FEATURE_DIM = 11
+
+# Column -> dtype; each shard holds one .npy file per column
+COLUMNS = {
+    "card_ids": np.int32,
+    "card_features": np.float32,
+    "labels": np.int32,
+    "outcomes": np.float32,
+}
+
+
+def is_shard_dir(path: str) -> bool:
+    """True if path is a sharded dataset directory."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    """Write JSON atomically (readers never see a half-written file)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _shard_index(name: str) -> int:
+    """Number of a shard directory (shard_00042 -> 42)."""
+    return int(name.split("_")[1])
+
+
+def read_manifest(data_dir: str) -> Dict[str, Any]:
+    """Manifest of a sharded dataset directory."""
+    with open(os.path.join(data_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def save_manifest(data_dir: str, manifest: Dict[str, Any]):
+    """Write a manifest (atomically), recounting num_samples from its shards."""
+    manifest["num_samples"] = sum(entry["num_samples"] for entry in manifest["shards"])
+    _write_json(os.path.join(data_dir, MANIFEST_FILE), manifest)
+
+
+class ShardWriter:
+    """
+    Appends samples to a sharded dataset directory.
+
+    Usage:
+        with ShardWriter("data/self_play") as writer:
+            writer.add(card_ids, card_features, label, outcome)
+            writer.metadata["games_played"] = 10
+    """
+
+    def __init__(self, output_dir: str, shard_size: int = 65536,
+                 seq_len: int = SEQ_LEN, feature_dim: int = FEATURE_DIM,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            output_dir: Dataset directory (created; existing shards are replaced)
+            shard_size: Samples per shard
+            seq_len: Card sequence length
+            feature_dim: Features per card
+            metadata: Extra manifest entries (e.g. games_played)
+        """
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.seq_len = seq_len
+        self.feature_dim = feature_dim
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+        self.shards: List[Dict[str, Any]] = []
+        self.num_samples = 0
+
+        if os.path.isdir(output_dir):
+            for name in os.listdir(output_dir):
+                if name.startswith("shard_"):
+                    shutil.rmtree(os.path.join(output_dir, name))
+        os.makedirs(output_dir, exist_ok=True)
+        self._new_shard()
+        self.write_manifest(complete=False)
+
+    def _new_shard(self):
+        self._count = 0
+        self._card_ids = np.zeros((self.shard_size, self.seq_len), dtype=np.int32)
+        self._card_features = np.zeros((self.shard_size, self.seq_len, self.feature_dim), dtype=np.float32)
+        self._labels = np.zeros(self.shard_size, dtype=np.int32)
+        self._outcomes = np.zeros((self.shard_size, 1), dtype=np.float32)
+
+    def add(self, card_ids, card_features, label: int, outcome: float = 0.0):
+        """Append one sample; sequences are truncated or zero-padded to seq_len."""
+        i = self._count
+        card_ids = np.asarray(card_ids)[:self.seq_len]
+        self._card_ids[i, :len(card_ids)] = card_ids
+        if len(card_features):
+            card_features = np.asarray(card_features, dtype=np.float32)[:self.seq_len]
+            self._card_features[i, :len(card_features)] = card_features
+        self._labels[i] = label
+        self._outcomes[i, 0] = outcome
+
+        self._count += 1
+        if self._count == self.shard_size:
+            self.flush_shard()
+
+    def flush_shard(self):
+        """Write the samples added so far as a shard (even if not full)."""
+        count = self._count
+        if count == 0:
+            return
+        name = f"shard_{len(self.shards):05d}"
+        path = os.path.join(self.output_dir, name)
+        tmp_path = path + ".tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for column in COLUMNS:
+            np.save(os.path.join(tmp_path, f"{column}.npy"), getattr(self, f"_{column}")[:count])
+        os.replace(tmp_path, path)
+
+        self.shards.append({"name": name, "num_samples": count})
+        self.num_samples += count
+        self._new_shard()
+        self.write_manifest(complete=False)
+
+    def write_manifest(self, complete: bool = True):
+        manifest = {
+            "format": SHARD_FORMAT,
+            "complete": complete,
+            "num_samples": self.num_samples,
+            "seq_len": self.seq_len,
+            "feature_dim": self.feature_dim,
+            "shards": self.shards,
+        }
+        manifest.update(self.metadata)
+        _write_json(os.path.join(self.output_dir, MANIFEST_FILE), manifest)
+
+    def close(self):
+        """Write the last (partial) shard and mark the dataset complete."""
+        self.flush_shard()
+        self.write_manifest(complete=True)
+
+    def __len__(self) -> int:
+        return self.num_samples + self._count
+
+    def __enter__(self) -> 'ShardWriter':
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            # Keep what was written, but leave the dataset marked incomplete
+            self.flush_shard()
+
+
+class ShardedArray:
+    """
+    One column of a sharded dataset, indexed like a NumPy array without
+    loading it: slices stay lazy, integer arrays gather rows from the
+    shards' memory maps.
+    """
+
+    def __init__(self, parts: List[np.ndarray], offsets: np.ndarray, start: int = 0, stop: Optional[int] = None):
+        self.parts = parts
+        self.offsets = offsets  # Global index of the first row of each part (+ total)
+        self.start = start
+        self.stop = int(offsets[-1]) if stop is None else stop
+        self.dtype = parts[0].dtype if parts else np.float32
+        self.row_shape: Tuple[int, ...] = parts[0].shape[1:] if parts else ()
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (len(self),) + self.row_shape
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return ShardedArray(self.parts, self.offsets, self.start + start, self.start + max(start, stop))
+            key = np.arange(start, stop, step)
+        if isinstance(key, (int, np.integer)):
+            return self[np.array([key])][0]
+
+        n = len(self)
+        indices = np.asarray(key, dtype=np.int64)
+        if np.any((indices < -n) | (indices >= n)):
+            raise IndexError(f"index out of range for ShardedArray of length {n}")
+        indices = np.where(indices < 0, indices + n, indices) + self.start
+        shard = np.searchsorted(self.offsets, indices, side='right') - 1
+        out = np.empty((len(indices),) + self.row_shape, dtype=self.dtype)
+        for s in np.unique(shard):
+            selected = shard == s
+            out[selected] = self.parts[s][indices[selected] - self.offsets[s]]
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        out = self[np.arange(len(self))]
+        return out if dtype is None else out.astype(dtype)
+
+
+class ShardReader:
+    """Memory-mapped view of a sharded dataset directory."""
+
+    def __init__(self, data_dir: str):
+        self.manifest: Dict[str, Any] = read_manifest(data_dir)
+        if self.manifest.get("format") != SHARD_FORMAT:
+            raise ValueError(f"Unsupported shard format {self.manifest.get('format')} in {data_dir}")
+        if not self.manifest.get("complete", True):
+            print(f"Warning: {data_dir} is incomplete (writer did not finish); using its complete shards")
+
+        self.data_dir = data_dir
+        self.seq_len = self.manifest["seq_len"]
+        self.feature_dim = self.manifest["feature_dim"]
+        sizes = [entry["num_samples"] for entry in self.manifest["shards"]]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.columns: Dict[str, ShardedArray] = {}
+        for column in COLUMNS:
+            parts = [np.load(os.path.join(data_dir, entry["name"], f"{column}.npy"), mmap_mode='r')
+                     for entry in self.manifest["shards"]]
+            self.columns[column] = ShardedArray(parts, self.offsets)
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self, column: str) -> ShardedArray:
+        return self.columns[column]
+
+    def arrays(self) -> Tuple[ShardedArray, ShardedArray, ShardedArray, ShardedArray]:
+        """(card_ids, card_features, labels, outcomes) columns."""
+        return tuple(self.columns[column] for column in COLUMNS)
+
+
+def append_shards(data_dir: str, source_dirs: Sequence[str], move: bool = False) -> int:
+    """
+    Add the shards of other sharded datasets to a dataset (created if missing).
+
+    Shards are renamed to follow the dataset's last shard and moved (or
+    copied) as whole directories; the manifest is updated after each one.
+
+    Returns:
+        Number of samples added
+    """
+    if is_shard_dir(data_dir):
+        manifest = read_manifest(data_dir)
+    else:
+        os.makedirs(data_dir, exist_ok=True)
+        manifest = {"format": SHARD_FORMAT, "complete": True, "num_samples": 0,
+                    "seq_len": SEQ_LEN, "feature_dim": FEATURE_DIM, "shards": []}
+    next_index = max((_shard_index(e["name"]) + 1 for e in manifest["shards"]), default=0)
+
+    added = 0
+    for source_dir in source_dirs:
+        source = read_manifest(source_dir)
+        if manifest["shards"] and (source["seq_len"], source["feature_dim"]) != (manifest["seq_len"], manifest["feature_dim"]):
+            raise ValueError(f"{source_dir} has a different sample layout than {data_dir}")
+        manifest["seq_len"], manifest["feature_dim"] = source["seq_len"], source["feature_dim"]
+        for entry in source["shards"]:
+            name = f"shard_{next_index:05d}"
+            src, dst = os.path.join(source_dir, entry["name"]), os.path.join(data_dir, name)
+            if move:
+                os.replace(src, dst)
+            else:
+                shutil.copytree(src, dst + ".tmp")
+                os.replace(dst + ".tmp", dst)
+            manifest["shards"].append({"name": name, "num_samples": entry["num_samples"]})
+            save_manifest(data_dir, manifest)
+            next_index += 1
+            added += entry["num_samples"]
+    return added
+
+
+def drop_oldest_shards(data_dir: str, max_samples: int) -> int:
+    """
+    Rolling window: delete the oldest whole shards of a dataset while the
+    rest still holds at least max_samples. Retained shards are untouched,
+    so up to one shard's worth of samples beyond max_samples may remain.
+
+    Returns:
+        Number of samples dropped
+    """
+    manifest = read_manifest(data_dir)
+    total = sum(entry["num_samples"] for entry in manifest["shards"])
+    dropped = []
+    while manifest["shards"] and total - manifest["shards"][0]["num_samples"] >= max_samples:
+        entry = manifest["shards"].pop(0)
+        total -= entry["num_samples"]
+        dropped.append(entry)
+    if not dropped:
+        return 0
+
+    # Manifest first, so a crash leaves orphaned directories, not missing shards
+    save_manifest(data_dir, manifest)
+    for entry in dropped:
+        shutil.rmtree(os.path.join(data_dir, entry["name"]), ignore_errors=True)
+    return sum(entry["num_samples"] for entry in dropped)
+
+
+def clear_shards(data_dir: str):
+    """Delete the shards and manifest of a dataset directory (other files are kept)."""
+    if not os.path.isdir(data_dir):
+        return
+    for name in os.listdir(data_dir):
+        if name.startswith("shard_") or name == MANIFEST_FILE:
+            path = os.path.join(data_dir, name)
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+
+
+def _json_prefix(input_path: str) -> str:
+    """ijson prefix of the samples: {"samples": [...]} files or bare lists."""
+    with open(input_path, 'rb') as f:
+        return "samples.item" if b'"samples":' in f.read(2048) else "item"
+
+
+def _convert_json_file(args: Tuple[str, str, int, int]) -> int:
+    """Stream one JSON file into a new sharded dataset, in a single pass."""
+    import ijson
+
+    input_path, output_dir, seq_len, shard_size = args
+    with ShardWriter(output_dir, shard_size=shard_size, seq_len=seq_len) as writer:
+        with open(input_path, 'rb') as f:
+            for s in ijson.items(f, _json_prefix(input_path), use_float=True):
+                writer.add(s.get('card_ids', ()), s.get('card_features', ()),
+                           s.get('action_label', 0), s.get('game_outcome', 0.0))
+        return len(writer)
+
+
+def convert_json(input_paths: Sequence[str], output_dir: str, seq_len: int = SEQ_LEN,
+                 shard_size: int = 65536, workers: Optional[int] = None) -> int:
+    """
+    Convert JSON sample files into one sharded dataset.
+
+    Each file is streamed once (no counting pass). With several files they
+    are converted in parallel, one process per file, then their shards are
+    moved into output_dir in input order.
+
+    Returns:
+        Number of samples converted
+    """
+    if len(input_paths) == 1:
+        return _convert_json_file((input_paths[0], output_dir, seq_len, shard_size))
+
+    parts_dir = os.path.join(output_dir, ".parts")
+    part_dirs = [os.path.join(parts_dir, f"{i:05d}") for i in range(len(input_paths))]
+    jobs = [(path, part, seq_len, shard_size) for path, part in zip(input_paths, part_dirs)]
+    with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+        list(pool.map(_convert_json_file, jobs))
+
+    clear_shards(output_dir)
+    total = append_shards(output_dir, part_dirs, move=True)
+    shutil.rmtree(parts_dir)
+    return total
@@ -5,11 +5,17 @@ Implements the AlphaZero training loop:
 1. Self-Play Data Collection (using MCTS)
 2. Neural Network Training (Policy + Value Loss)
 3. Evaluation / Checkpointing
+
+With num_actors > 0 the phases overlap instead: actor processes play games
+into a shared replay buffer while the learner trains and publishes new
+weights (see Trainer._train_pipelined).
 """
 
 import sys
 import os
 import argparse
+import multiprocessing as mp
+import queue
 import time
 from datetime import datetime
 import torch
@@ -21,9 +27,9 @@ from torch.utils.data import DataLoader, TensorDataset
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ai.model import HearthstoneModel
-from ai.replay_buffer import ReplayBuffer
+from ai.replay_buffer import ReplayBuffer, SharedReplayBuffer
 from ai.device import get_best_device, print_device_info
-from training.data_collector import DataCollector
+from training.data_collector import DataCollector, WeightStore, run_actor
 
 
 class Trainer:
@@ -40,7 +46,11 @@ class Trainer:
         self.games_per_iter = config.get('games_per_iter', 5)
         self.mcts_sims = config.get('mcts_sims', 20)
         self.buffer_capacity = config.get('buffer_capacity', 10000)
+        self.buffer_path = config.get('buffer_path')  # Disk-backed replay buffer directory
+        self.prioritized_replay = config.get('prioritized_replay', False)
+        self.priority_beta = config.get('priority_beta', 0.4)  # Annealed to 1 over the run
         self.eval_games = config.get('eval_games', 10)
+        self.num_actors = config.get('num_actors', 0)  # > 0: pipelined self-play
         self.device = get_best_device()  # Supports CUDA, MPS (Metal), and CPU
         
         # Model directory with timestamp
@@ -50,7 +60,15 @@ class Trainer:
         
         # Components
         self.model = HearthstoneModel(self.input_dim, self.action_dim).to(self.device)
-        self.buffer = ReplayBuffer(self.buffer_capacity)
+        if self.num_actors:
+            # Actors are spawned (not forked) so the learner may use CUDA
+            self._mp = mp.get_context('spawn')
+            self.buffer = SharedReplayBuffer(self.buffer_capacity, self.input_dim, self.action_dim,
+                                             prioritized=self.prioritized_replay,
+                                             path=self.buffer_path, ctx=self._mp)
+        else:
+            self.buffer = ReplayBuffer(self.buffer_capacity, prioritized=self.prioritized_replay,
+                                       path=self.buffer_path)
         self.collector = DataCollector(self.model, self.buffer)
         self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
         
@@ -88,6 +106,9 @@ class Trainer:
         
     def train(self):
         """Main training loop."""
+        if self.num_actors:
+            return self._train_pipelined()
+        
         print(f"Starting training on {self.device}...")
         print(f"Model directory: {self.model_dir}")
         print(f"Config: iterations={self.num_iterations}, games/iter={self.games_per_iter}, mcts_sims={self.mcts_sims}")
@@ -116,32 +137,9 @@ class Trainer:
             print("\n[Phase 2] Neural Network Training...")
             self.model.to(self.device)
             self.model.train()
-            avg_loss = self._train_epochs()
-            
-            # 3. Evaluation
-            print("\n[Phase 3] Evaluation...")
-            win_rate = self._evaluate()
-            
-            # 4. Checkpointing
-            self.save_checkpoint(f"checkpoint_iter_{iteration+1}.pt")
-            
-            if win_rate > self.best_win_rate:
-                self.best_win_rate = win_rate
-                self.save_checkpoint("best_model.pt")
-                print(f"  New best model! Win rate: {win_rate:.1%}")
+            avg_loss = self._train_epochs(iteration)
             
-            # Record history
-            iter_time = time.time() - iter_start
-            self.training_history.append({
-                'iteration': iteration + 1,
-                'loss': avg_loss,
-                'win_rate': win_rate,
-                'buffer_size': len(self.buffer),
-                'time': iter_time
-            })
-            
-            print(f"\nIteration {iteration + 1} complete in {iter_time:.1f}s")
-            print(f"  Loss: {avg_loss:.4f}, Win Rate: {win_rate:.1%}, Buffer: {len(self.buffer)}")
+            self._finish_iteration(iteration, avg_loss, iter_start)
         
         total_time = time.time() - start_time
         print(f"\n{'='*50}")
@@ -152,31 +150,183 @@ class Trainer:
         # Save training history
         self._save_history()
         
-    def _train_epochs(self):
+    def _train_pipelined(self):
+        """
+        Pipelined training loop: actor processes play games continuously
+        while the learner trains.
+        
+        Each iteration waits until games_per_iter new games have arrived,
+        trains on the shared buffer and publishes new weights, which the
+        actors load before their next game. Staleness is how many versions
+        behind the learner's latest weights a game was played with.
+        """
+        print(f"Starting pipelined training on {self.device} with {self.num_actors} actors...")
+        print(f"Model directory: {self.model_dir}")
+        print(f"Config: iterations={self.num_iterations}, games/iter={self.games_per_iter}, mcts_sims={self.mcts_sims}")
+        
+        weights = WeightStore(os.path.join(self.model_dir, "actor_weights.pt"), ctx=self._mp)
+        weights.publish(self.model.state_dict())
+        stats = self._mp.Queue()
+        stop = self._mp.Event()
+        actors = [
+            self._mp.Process(target=run_actor, daemon=True,
+                             args=(i, self.buffer, weights, stats, stop,
+                                   self.mcts_sims, self.input_dim, self.action_dim))
+            for i in range(self.num_actors)
+        ]
+        for actor in actors:
+            actor.start()
+        
+        start_time = time.time()
+        try:
+            for iteration in range(self.start_iteration, self.start_iteration + self.num_iterations):
+                iter_start = time.time()
+                print(f"\n{'='*50}")
+                print(f"Iteration {iteration + 1}/{self.start_iteration + self.num_iterations}")
+                print(f"{'='*50}")
+                
+                # 1. Collect the games finished since the last iteration
+                games = self._drain(stats)
+                while len(games) < self.games_per_iter or len(self.buffer) < self.batch_size:
+                    try:
+                        games.append(stats.get(timeout=1.0))
+                    except queue.Empty:
+                        if not any(actor.is_alive() for actor in actors):
+                            print("All actors have exited, stopping training")
+                            return
+                games += self._drain(stats)
+                wait_time = time.time() - iter_start
+                
+                # 2. Training (actors keep playing), then new weights for the actors
+                train_start = time.time()
+                self.model.train()
+                avg_loss = self._train_epochs(iteration)
+                train_time = time.time() - train_start
+                
+                staleness = [weights.version - version for _, version, _, _, _ in games]
+                version = weights.publish(self.model.state_dict())
+                
+                iter_time = time.time() - iter_start
+                samples = sum(num_samples for _, _, num_samples, _, _ in games)
+                avg_staleness = sum(staleness) / len(staleness)
+                print(f"  Actors: {len(games)} games, {samples} samples ({samples / iter_time:.1f} samples/s, "
+                      f"{len(games) / iter_time:.2f} games/s)")
+                print(f"  Staleness: avg {avg_staleness:.2f}, max {max(staleness)} versions")
+                print(f"  Learner: waited {wait_time:.1f}s, trained {train_time:.1f}s, published weights v{version}")
+                
+                self._finish_iteration(iteration, avg_loss, iter_start, {
+                    'games': len(games),
+                    'samples_per_sec': samples / iter_time,
+                    'games_per_sec': len(games) / iter_time,
+                    'staleness_avg': avg_staleness,
+                    'staleness_max': max(staleness),
+                    'learner_wait': wait_time,
+                    'weights_version': version,
+                })
+        finally:
+            self._stop_actors(actors, stats, stop)
+            self.buffer.close()
+        
+        total_time = time.time() - start_time
+        print(f"\n{'='*50}")
+        print(f"Training complete in {total_time:.1f}s")
+        print(f"Best win rate: {self.best_win_rate:.1%}")
+        print(f"Models saved to: {self.model_dir}")
+        
+        self._save_history()
+    
+    @staticmethod
+    def _drain(stats) -> list:
+        """Game records waiting on the stats queue (without blocking)."""
+        games = []
+        while True:
+            try:
+                games.append(stats.get_nowait())
+            except queue.Empty:
+                return games
+    
+    def _stop_actors(self, actors, stats, stop, timeout: float = 60.0):
+        """Let actors finish their current game, then terminate any still running."""
+        stop.set()
+        deadline = time.time() + timeout
+        for actor in actors:
+            while actor.is_alive() and time.time() < deadline:
+                self._drain(stats)  # Actors cannot exit with unsent records
+                actor.join(timeout=0.5)
+            if actor.is_alive():
+                actor.terminate()
+                actor.join()
+    
+    def _finish_iteration(self, iteration: int, avg_loss: float, iter_start: float, extra: dict = None):
+        """Evaluate, checkpoint and record an iteration."""
+        # 3. Evaluation
+        print("\n[Phase 3] Evaluation...")
+        win_rate = self._evaluate()
+        
+        # 4. Checkpointing
+        self.save_checkpoint(f"checkpoint_iter_{iteration+1}.pt")
+        
+        if win_rate > self.best_win_rate:
+            self.best_win_rate = win_rate
+            self.save_checkpoint("best_model.pt")
+            print(f"  New best model! Win rate: {win_rate:.1%}")
+        
+        # Record history
+        iter_time = time.time() - iter_start
+        self.training_history.append({
+            'iteration': iteration + 1,
+            'loss': avg_loss,
+            'win_rate': win_rate,
+            'buffer_size': len(self.buffer),
+            'time': iter_time,
+            **(extra or {}),
+        })
+        
+        print(f"\nIteration {iteration + 1} complete in {iter_time:.1f}s")
+        print(f"  Loss: {avg_loss:.4f}, Win Rate: {win_rate:.1%}, Buffer: {len(self.buffer)}")
+    
+    def _priority_beta(self, iteration: int) -> float:
+        """Importance sampling exponent: priority_beta at the start, 1 at the last iteration."""
+        done = iteration - self.start_iteration
+        progress = done / max(self.num_iterations - 1, 1)
+        return self.priority_beta + (1.0 - self.priority_beta) * min(progress, 1.0)
+    
+    def _train_epochs(self, iteration: int = 0):
         """Train on buffer data for several epochs."""
         total_loss = 0
         num_batches = 0
         num_updates = 20
+        beta = self._priority_beta(iteration)
         
         for _ in range(num_updates):
-            states, target_pis, target_vs = self.buffer.sample(self.batch_size)
+            indices, weights = self.buffer.sample_indices(self.batch_size, beta)
+            states, target_pis, target_vs = self.buffer.get_batch(indices)
             
             states = states.to(self.device)
             target_pis = target_pis.to(self.device)
             target_vs = target_vs.to(self.device)
+            # Importance sampling weights (all 1 without prioritized replay)
+            weights = torch.from_numpy(weights).to(self.device)
             
             # Forward
             pred_pis, pred_vs = self.model(states)
             
             # Policy Loss: Cross Entropy
             pred_pis = torch.clamp(pred_pis, 1e-8, 1.0)
-            policy_loss = -torch.sum(target_pis * torch.log(pred_pis)) / target_pis.size(0)
+            sample_policy_loss = -torch.sum(target_pis * torch.log(pred_pis), dim=1)
+            policy_loss = (weights * sample_policy_loss).mean()
             
             # Value Loss: MSE
-            value_loss = F.mse_loss(pred_vs, target_vs)
+            sample_value_loss = F.mse_loss(pred_vs, target_vs, reduction='none').squeeze(1)
+            value_loss = (weights * sample_value_loss).mean()
             
             loss = policy_loss + value_loss
             
+            if self.prioritized_replay:
+                # Replay the worst-predicted positions more often
+                sample_loss = (sample_policy_loss + sample_value_loss).detach().cpu().numpy()
+                self.buffer.update_priorities(indices, sample_loss)
+            
             # Backward
             self.optimizer.zero_grad()
             loss.backward()
@@ -210,6 +360,7 @@ class Trainer:
     def save_checkpoint(self, filename: str):
         """Save model checkpoint."""
         path = os.path.join(self.model_dir, filename)
+        self.buffer.flush()
         torch.save({
             'model_state_dict': self.model.state_dict(),
             'optimizer_state_dict': self.optimizer.state_dict(),
@@ -235,6 +386,12 @@ def parse_args():
     parser.add_argument('--batch-size', type=int, default=64, help='Training batch size')
     parser.add_argument('--learning-rate', type=float, default=1e-3, help='Learning rate')
     parser.add_argument('--buffer-capacity', type=int, default=10000, help='Replay buffer capacity')
+    parser.add_argument('--buffer-path', type=str, help='Directory for a disk-backed replay buffer (kept across restarts)')
+    parser.add_argument('--prioritized-replay', action='store_true', help='Sample replay by training loss')
+    parser.add_argument('--priority-beta', type=float, default=0.4,
+                        help='Initial importance sampling exponent for prioritized replay (annealed to 1)')
+    parser.add_argument('--actors', type=int, default=0,
+                        help='Actor processes playing games while the learner trains (0 = alternate phases)')
     parser.add_argument('--resume-checkpoint', type=str, help='Path to checkpoint to resume from')
     return parser.parse_args()
 
@@ -249,6 +406,10 @@ if __name__ == "__main__":
         'batch_size': args.batch_size,
         'learning_rate': args.learning_rate,
         'buffer_capacity': args.buffer_capacity,
+        'buffer_path': args.buffer_path,
+        'prioritized_replay': args.prioritized_replay,
+        'priority_beta': args.priority_beta,
+        'num_actors': args.actors,
         'resume_checkpoint': args.resume_checkpoint,
     }
     